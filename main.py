@@ -13,9 +13,16 @@ Este script executa toda a pipeline de processamento:
 """
 
 import sys
+import argparse
+import contextlib
+import itertools
+import json
 import logging
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Optional, Set
 import io
 import warnings
 
@@ -34,6 +41,19 @@ if sys.platform == "win32":
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 
+# Códigos de saída (usados pelos agendadores no modo --batch)
+EXIT_OK = 0
+EXIT_STEP_FAILED = 1
+EXIT_INVALID_INPUT = 2
+EXIT_INTERRUPTED = 130
+
+# Resumo JSON do modo --batch (bases/outputs)
+BATCH_SUMMARY_FILE = "_batch_summary.json"
+
+# Módulos importados antes da primeira etapa (medidos por --import-profile)
+STARTUP_MODULES = ["main", "pipeline.checkpoints", "pipeline.dag", "pipeline.profiling", "pipeline.steps"]
+
+
 def print_progress_bar(current: int, total: int, step_name: str, bar_length: int = 40):
     """
     Exibe uma barra de progresso visual no console.
@@ -74,7 +94,8 @@ def setup_logging():
 
 def validate_directories():
     """Valida a existência das pastas necessárias"""
-    base_dir = Path(__file__).parent
+    from pipeline import get_base_dir
+    base_dir = get_base_dir()
 
     required_dirs = [
         base_dir / "bases" / "inputs" / "scouts_base",
@@ -94,12 +115,12 @@ def validate_directories():
         print("\nVerifique a estrutura de arquivos e tente novamente.")
         return False
 
-    # Verificar se há arquivos Excel
+    # Verificar se há arquivos de scouts (Excel ou parquet)
     scouts_dir = base_dir / "bases" / "inputs" / "scouts_base"
-    xlsx_files = list(scouts_dir.glob("*.xlsx"))
+    scout_files = list(scouts_dir.glob("*.xlsx")) + list(scouts_dir.glob("*.parquet"))
 
-    if not xlsx_files:
-        print(f"\n✗ ERRO: Nenhum arquivo .xlsx encontrado em:\n  {scouts_dir}")
+    if not scout_files:
+        print(f"\n✗ ERRO: Nenhum arquivo .xlsx/.parquet encontrado em:\n  {scouts_dir}")
         print("\nAdicione os arquivos de scouts e tente novamente.")
         return False
 
@@ -112,10 +133,114 @@ def validate_directories():
     return True
 
 
-def main():
-    """Função principal"""
-    logger = setup_logging()
+def parse_args(argv=None):
+    """Lê os argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(
+        description="Processador de Scouts - Botafogo",
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Gravar um dump cProfile por etapa em bases/outputs/_profiles/'
+    )
+
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Modo não interativo (agendadores): sem pausa no final, saída das etapas só no log.txt '
+             'e resumo JSON no stdout e em bases/outputs/_batch_summary.json. Códigos de saída: '
+             '0 = sucesso, 1 = falha em uma etapa, 2 = entradas/argumentos inválidos, 130 = interrompido'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Após a execução, observar as entradas (scouts, pesos, nacionalidades, configurações) '
+             'e reexecutar só as etapas afetadas a cada mudança (Ctrl+C para sair)'
+    )
+
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='Iniciar o worker local (http://127.0.0.1, porta worker.port do config.yaml) que mantém os '
+             'dados em memória e atende rescore/reload/export (cliente: scripts/utils/worker_client.py)'
+    )
+
+    parser.add_argument(
+        '--import-profile',
+        action='store_true',
+        help='Medir o custo de importação da inicialização e de cada etapa (python -X importtime) '
+             'e gravar bases/outputs/_import_profile.json, sem executar a pipeline'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        metavar='N',
+        help='Estágios independentes executados em paralelo (padrão: performance.workers do config.yaml)'
+    )
+
+    selection = parser.add_argument_group(
+        'seleção de etapas',
+        'Etapa (ex: normalize_indicators, export), número da etapa (ex: 4) ou id de um '
+        'estágio (ex: export_context). Dependências com checkpoint válido são reaproveitadas.'
+    )
+    selection.add_argument('--from', dest='from_step', metavar='ETAPA',
+                           help='Executar esta etapa e tudo que depende dela')
+    selection.add_argument('--to', dest='to_step', metavar='ETAPA',
+                           help='Executar até esta etapa (inclusive)')
+    selection.add_argument('--only', dest='only_step', metavar='ETAPA',
+                           help='Executar somente esta etapa')
+
+    args = parser.parse_args(argv)
+    modes = [f"--{name}" for name in ("batch", "watch", "worker") if getattr(args, name)]
+    if len(modes) > 1:
+        parser.error(f"{' e '.join(modes)} não podem ser usados juntos")
+    return args
+
+
+def print_plan(plan):
+    """Exibe o plano de execução (etapas executadas e reaproveitadas)"""
+    print("Plano de execução:")
+    for step, action, reason in plan:
+        marker = "▶" if action == "run" else "✓"
+        label = "executar" if action == "run" else "reaproveitar"
+        print(f"  {marker} {step.id:<22} {label:<13} ({reason})")
+    print()
+
+
+def run_import_profile() -> int:
+    """Exibe e grava o custo de importação (--import-profile)"""
+    from pipeline import get_base_dir
+    from pipeline.profiling import IMPORT_REPORT_FILE, print_import_profile, profile_imports
+    from pipeline.steps import get_steps, stage_modules
+
+    print("Custo de importação (python -X importtime, processo novo):\n")
+    output_dir = get_base_dir() / "bases" / "outputs"
+    report = profile_imports(output_dir, STARTUP_MODULES, stage_modules(get_steps()))
+    print_import_profile(report)
+    print(f"\nRelatório salvo em: bases/outputs/{IMPORT_REPORT_FILE}")
+    return 0
+
+
+def read_pending_nationalities(output_dir: Path) -> int:
+    """Quantidade de códigos de país PENDENTE (gravada por load_scouts)"""
+    pending_file = output_dir / "_pending_nationalities.txt"
+    if not pending_file.exists():
+        return 0
+    with open(pending_file, "r") as f:
+        return int(f.read().strip() or 0)
+
+
+def run_pipeline(args, logger, summary: dict, selected: Optional[Set[str]] = None) -> int:
+    """
+    Executa a pipeline e retorna o código de saída.
 
+    summary recebe o plano, o relatório de desempenho e o erro (se houver),
+    usados no resumo JSON do modo --batch. selected (ids de estágios)
+    substitui --from/--to/--only (usado pelo modo --watch).
+    """
     print("=" * 70)
     print("PROCESSADOR DE SCOUTS - BOTAFOGO")
     print("=" * 70)
@@ -123,64 +248,117 @@ def main():
     print()
 
     try:
+        if args.import_profile:
+            return run_import_profile()
+
         # Validar estrutura de pastas
         if not validate_directories():
-            return 1
+            summary["error"] = "Pastas ou arquivos de entrada não encontrados (detalhes no log)"
+            return EXIT_INVALID_INPUT
 
         # Importar módulos da pipeline
-        from pipeline import (
-            load_data,
-            prepare_positions,
-            consolidate_players,
-            normalize_indicators,
-            calculate_overall,
-            calculate_trends,
-            export
-        )
-
-        # Definir etapas
-        steps = [
-            ("Carregamento de Dados", load_data.run),
-            ("Mapeamento de Posições", prepare_positions.run),
-            ("Consolidação de Jogadores", consolidate_players.run),
-            ("Normalização de Indicadores", normalize_indicators.run),
-            ("Cálculo de Scores", calculate_overall.run),
-            ("Cálculo de Tendências", calculate_trends.run),
-            ("Exportação Final", export.run),
-        ]
-
-        # Executar pipeline
-        total_steps = len(steps)
-        for step_num, (name, func) in enumerate(steps, 1):
+        from pipeline import get_base_dir, load_settings
+        from pipeline.checkpoints import CheckpointStore, plan_steps
+        from pipeline.dag import buffered_stdout, run_dag
+        from pipeline.profiling import PipelineProfiler
+        from pipeline.publish import discard_staging
+        from pipeline.steps import build_dependencies, get_steps, select_steps
+
+        # Definir estágios (id, nome, função, entradas, arquivos gerados, etapa)
+        steps = get_steps()
+        try:
+            if selected is None:
+                selected = select_steps(steps, args.from_step, args.to_step, args.only_step)
+        except ValueError as e:
+            print(f"\n✗ ERRO: {e}")
+            summary["error"] = str(e)
+            return EXIT_INVALID_INPUT
+
+        workers = args.workers or load_settings("performance", {"workers": 1})["workers"]
+        if args.profile and workers > 1:
+            # cProfile mede uma thread por vez; com --profile os estágios rodam em sequência
+            print("⚠ --profile ativo: executando estágios em sequência (workers = 1)\n")
+            workers = 1
+
+        # Decidir quais etapas executar (checkpoints válidos são reaproveitados)
+        base_dir = get_base_dir()
+        output_dir = base_dir / "bases" / "outputs"
+        summary["output_dir"] = output_dir
+        checkpoints = CheckpointStore(base_dir)
+        plan = plan_steps(steps, selected, checkpoints)
+        summary["plan"] = [(step.id, action, reason) for step, action, reason in plan]
+        print_plan(plan)
+        to_run = [step for step, action, _ in plan if action == "run"]
+
+        # Executar pipeline em DAG (com medição de tempo/memória por estágio)
+        dependencies = build_dependencies(steps)
+        total_steps = len(to_run)
+        step_counter = itertools.count(1)
+
+        def execute(step):
+            if args.batch:
+                print(f"Etapa {next(step_counter)}/{total_steps}: {step.name}")
+            else:
+                print_progress_bar(next(step_counter), total_steps, step.name)
+            with profiler.stage(step.id, step.name) as stage:
+                result = step.run()
+                stage.record_outputs(output_dir / f for f in step.outputs)
+            return result
+
+        def on_start(step):
+            if workers > 1:
+                print(f"  ▶ Iniciando: {step.name}")
+
+        status = "failed"
+        with buffered_stdout() as stream, PipelineProfiler(output_dir, cprofile=args.profile) as profiler:
             try:
-                print_progress_bar(step_num, total_steps, name)
-                result = func()
-                if not result:
-                    print(f"\n✗ ERRO: Etapa '{name}' retornou False")
-                    return 1
-            except Exception as e:
-                logger.error(f"Erro na etapa '{name}': {str(e)}", exc_info=True)
-                print(f"\n✗ ERRO na etapa '{name}':")
-                print(f"  {type(e).__name__}: {str(e)}")
-                print("\nVerifique o arquivo log.txt para mais detalhes.")
-                return 1
+                result = run_dag(
+                    to_run, dependencies, execute,
+                    workers=workers,
+                    on_start=on_start,
+                    on_success=checkpoints.record,
+                    stream=stream if workers > 1 else None,
+                )
+                if not result.success:
+                    step = result.failed_step
+                    checkpoints.invalidate(step)
+                    if result.error is None:
+                        print(f"\n✗ ERRO: Etapa '{step.name}' retornou False")
+                        summary["error"] = f"Etapa '{step.id}' retornou False"
+                    else:
+                        e = result.error
+                        logger.error(f"Erro na etapa '{step.name}': {str(e)}", exc_info=e)
+                        print(f"\n✗ ERRO na etapa '{step.name}':")
+                        print(f"  {type(e).__name__}: {str(e)}")
+                        print("\nVerifique o arquivo log.txt para mais detalhes.")
+                        summary["error"] = f"{step.id}: {type(e).__name__}: {e}"
+                    return EXIT_STEP_FAILED
+                status = "success"
+                # Sem o publish (ex: --only export_weights), o staging desta execução não seria publicado
+                if not any(step.id == "publish" for step in to_run) and discard_staging(output_dir):
+                    print("  Arquivos preparados descartados (a execução não inclui o estágio publish)\n")
+            finally:
+                report_file = profiler.write_report(status)
+                summary["report"] = profiler.to_dict(status)
+                logger.info(f"Relatório de execução salvo em {report_file}")
 
         # Sucesso!
         print("=" * 70)
         print("✓ PROCESSAMENTO CONCLUÍDO COM SUCESSO!")
         print("=" * 70)
         print(f"\nArquivos gerados em: bases/outputs/")
-        print("  - consolidated_overall.parquet")
-        print("  - consolidated_weights.parquet")
-        print("  - consolidated_context.parquet")
-        print("  - consolidated_normalized.parquet")
+        for step in to_run:
+            for output in step.outputs:
+                if output.startswith("consolidated_"):
+                    print(f"  - {output}")
+
+        # Tempo e memória por etapa
+        print("\nDesempenho por etapa (detalhes em bases/outputs/_run_report.json):")
+        profiler.print_summary()
 
         # Verificar se há nacionalidades pendentes
-        base_dir = Path(__file__).parent
-        pending_file = base_dir / "bases" / "outputs" / "_pending_nationalities.txt"
-        if pending_file.exists():
-            with open(pending_file, "r") as f:
-                pending_count = int(f.read().strip())
+        pending_count = read_pending_nationalities(output_dir)
+        if pending_count:
             print()
             print("!" * 70)
             print("⚠ ATENÇÃO: NACIONALIDADES PENDENTES")
@@ -194,27 +372,204 @@ def main():
         print(f"Fim: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 70)
 
-        return 0
+        return EXIT_OK
 
     except KeyboardInterrupt:
         print("\n\n✗ Processamento interrompido pelo usuário")
-        return 1
+        summary["error"] = "Interrompido (KeyboardInterrupt)"
+        return EXIT_INTERRUPTED
     except Exception as e:
         logger.error(f"Erro inesperado: {str(e)}", exc_info=True)
         print(f"\n✗ ERRO INESPERADO:")
         print(f"  {type(e).__name__}: {str(e)}")
         print("\nVerifique o arquivo log.txt para mais detalhes.")
-        return 1
+        summary["error"] = f"{type(e).__name__}: {e}"
+        return EXIT_STEP_FAILED
 
 
-if __name__ == "__main__":
-    exit_code = main()
+def run_watch(args, logger) -> int:
+    """
+    Modo --watch: executa a pipeline e, a cada mudança nas entradas,
+    reexecuta só os estágios afetados (pipeline/watch.py), no mesmo processo.
+    """
+    from pipeline import get_base_dir, load_data, new_run_id
+    from pipeline.checkpoints import CheckpointStore
+    from pipeline.steps import get_steps
+    from pipeline.watch import InputWatcher, affected_steps, get_watch_settings
+
+    load_data.enable_warm_cache()
+    settings = get_watch_settings()
+    base_dir = get_base_dir()
+    steps = get_steps()
+
+    # Instantâneo antes da execução: o que for salvo enquanto ela roda dispara outra
+    watcher = InputWatcher(base_dir, steps, settings["poll_interval_s"], settings["debounce_s"])
+    exit_code = run_pipeline(args, logger, {})
+    try:
+        while exit_code != EXIT_INTERRUPTED:
+            edited = watcher.settle(CheckpointStore(base_dir))
+            if edited:
+                print(f"\nArquivos alterados durante a execução: {', '.join(edited)}")
+            print(f"\n👀 Observando {len(watcher.current)} arquivo(s) de entrada "
+                  f"(a cada {settings['poll_interval_s']:g}s; Ctrl+C para sair)...")
+            changed = watcher.wait_for_change()
+
+            print(f"\nAlterações detectadas ({datetime.now().strftime('%H:%M:%S')}):")
+            for path in changed:
+                print(f"  - {path}")
+            stale, selected = affected_steps(steps, changed, CheckpointStore(base_dir))
+            if not selected:
+                print("  ✓ Conteúdo igual ao do último checkpoint: nada a reexecutar")
+                continue
+            print(f"  Etapas afetadas: {', '.join(sorted(stale))} (+ {len(selected) - len(stale)} dependente(s))\n")
+
+            # Cada reexecução é uma execução nova (rodapés, manifesto, relatório, staging)
+            new_run_id()
+            exit_code = run_pipeline(args, logger, {}, selected=selected)
+    except KeyboardInterrupt:
+        pass
+
+    print("\n✓ Modo watch encerrado")
+    return exit_code
+
+
+class LogStream(io.TextIOBase):
+    """Texto impresso pelas etapas → log.txt, uma linha por registro (modo --batch)"""
 
-    # Pausar para ver resultado (útil quando executado via .bat)
+    def __init__(self, logger):
+        self.logger = logger
+        self._pending = ""
+        self._lock = threading.Lock()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        with self._lock:
+            lines = (self._pending + text).split("\n")
+            self._pending = lines.pop()
+        for line in lines:
+            line = line.split("\r")[-1].rstrip()
+            if line.strip():
+                self.logger.info(line)
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, ""
+        if pending.strip():
+            self.logger.info(pending.rstrip())
+
+
+def build_batch_summary(exit_code: int, summary: dict, started_at: datetime, wall_s: float) -> dict:
+    """
+    Resumo do modo --batch: status e código de saída, tempo total, linhas
+    processadas (e linhas/s), tempo e linhas de cada etapa executada,
+    etapas reaproveitadas e nacionalidades pendentes.
+    """
+    report = summary.get("report") or {}
+    output_dir = summary.get("output_dir")
+
+    steps = []
+    ran = {step["id"]: step for step in report.get("steps", [])}
+    for step_id, action, reason in summary.get("plan", []):
+        if step_id not in ran:
+            steps.append({"id": step_id, "status": "reused" if action != "run" else "not_run", "reason": reason})
+            continue
+        step = ran[step_id]
+        rows = [output["rows"] for output in step["outputs"] if "rows" in output]
+        steps.append({
+            "id": step_id,
+            "status": step["status"],
+            "wall_s": step["wall_s"],
+            "cpu_s": step["cpu_s"],
+            "peak_rss_mb": step["peak_rss_mb"],
+            "rss_shared": step.get("rss_shared", False),
+            "rows": max(rows) if rows else None,
+        })
+
+    # Linhas processadas = jogadores da base carregada (mesmo se load_scouts foi reaproveitado)
+    rows_processed = None
+    raw_file = output_dir / "_temp_scouts_raw.parquet" if output_dir is not None else None
+    if raw_file is not None and raw_file.exists():
+        import pyarrow.parquet as pq
+        rows_processed = pq.read_metadata(raw_file).num_rows
+
+    statuses = {EXIT_OK: "success", EXIT_INVALID_INPUT: "invalid_input", EXIT_INTERRUPTED: "interrupted"}
+    return {
+        "run_id": report.get("run_id"),
+        "status": statuses.get(exit_code, "failed"),
+        "exit_code": exit_code,
+        "error": summary.get("error"),
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "wall_s": round(wall_s, 3),
+        "rows_processed": rows_processed,
+        "rows_per_s": round(rows_processed / wall_s, 1) if rows_processed and wall_s > 0 else None,
+        "steps_run": sum(1 for step in steps if step["status"] not in ("reused", "not_run")),
+        "steps_reused": sum(1 for step in steps if step["status"] == "reused"),
+        "pending_nationalities": read_pending_nationalities(output_dir) if output_dir is not None else None,
+        "steps": steps,
+    }
+
+
+def main(argv=None):
+    """
+    Função principal.
+
+    Com --batch (agendadores): sem pausa no final, a saída das etapas vai só
+    para o log.txt e o stdout recebe apenas o resumo JSON da execução
+    (também gravado em bases/outputs/_batch_summary.json).
+
+    Returns:
+        código de saída (EXIT_*)
+    """
+    args = parse_args(argv)
+    logger = setup_logging()
+
+    if args.worker:
+        from pipeline.worker import serve
+        serve()
+        return EXIT_OK
+
+    if args.watch:
+        return run_watch(args, logger)
+
+    if not args.batch:
+        exit_code = run_pipeline(args, logger, {})
+        pause_before_exit()
+        return exit_code
+
+    from pipeline import get_base_dir
+
+    summary = {}
+    started_at = datetime.now()
+    wall_start = time.perf_counter()
+    stream = LogStream(logger)
+    with contextlib.redirect_stdout(stream):
+        try:
+            exit_code = run_pipeline(args, logger, summary)
+        finally:
+            stream.flush()
+
+    batch_summary = build_batch_summary(exit_code, summary, started_at, time.perf_counter() - wall_start)
+    # Gravado sempre, inclusive quando a execução para antes do plano (entradas inválidas)
+    output_dir = get_base_dir() / "bases" / "outputs"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / BATCH_SUMMARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(batch_summary, f, indent=2, ensure_ascii=False)
+    print(json.dumps(batch_summary, ensure_ascii=False))
+    return exit_code
+
+
+def pause_before_exit():
+    """Pausar para ver resultado (útil quando executado via .bat)"""
     print("\nPressione Enter para sair...")
     try:
         input()
     except:
         pass
 
-    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,22 @@ permitindo empacotamento como executável standalone.
 """
 
 from pathlib import Path
+from datetime import datetime
+import os
 import sys
 
+# Variável de ambiente que sobrescreve o diretório base (ex: benchmarks)
+BASE_DIR_ENV = "SCOUTS_BASE_DIR"
+
+# Variável de ambiente que sobrescreve performance.engine do config.yaml
+ENGINE_ENV = "SCOUTS_ENGINE"
+ENGINES = ("reference", "fast", "duckdb")
+
+# Variável de ambiente com o identificador da execução (gravado nos arquivos finais)
+RUN_ID_ENV = "SCOUTS_RUN_ID"
+
+_run_id = None
+
 
 def get_base_dir() -> Path:
     """
@@ -16,6 +30,9 @@ def get_base_dir() -> Path:
     Funciona tanto quando rodando como script Python normal quanto quando
     empacotado como executável (PyInstaller ou Python Embeddable).
 
+    Se a variável de ambiente SCOUTS_BASE_DIR estiver definida, ela tem
+    prioridade (usado para rodar a pipeline sobre bases sintéticas).
+
     Returns:
         Path: Diretório base do projeto
 
@@ -24,7 +41,9 @@ def get_base_dir() -> Path:
         >>> config_dir = base / "config"
         >>> inputs_dir = base / "bases" / "inputs"
     """
-    if getattr(sys, 'frozen', False):
+    if os.environ.get(BASE_DIR_ENV):
+        return Path(os.environ[BASE_DIR_ENV])
+    elif getattr(sys, 'frozen', False):
         # Rodando como executável empacotado (PyInstaller)
         # sys.executable aponta para o .exe
         return Path(sys.executable).parent
@@ -35,4 +54,89 @@ def get_base_dir() -> Path:
         return Path(__file__).parent.parent
 
 
-__all__ = ['get_base_dir']
+def load_settings(section: str, defaults: dict = None) -> dict:
+    """
+    Carrega uma seção do config/config.yaml, completando com valores padrão.
+
+    Args:
+        section: nome da seção (ex: "trends", "performance")
+        defaults: valores usados quando a chave não existe no arquivo
+
+    Returns:
+        dict com as configurações da seção
+    """
+    import yaml
+
+    settings = dict(defaults or {})
+    config_file = get_base_dir() / "config" / "config.yaml"
+
+    if config_file.exists():
+        with open(config_file, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        settings.update(config.get(section) or {})
+
+    return settings
+
+
+def get_engine() -> str:
+    """
+    Retorna a implementação de cálculo a usar nas etapas pesadas.
+
+    - "reference": implementação original (linha a linha), usada como referência
+    - "fast": implementação vetorizada, validada contra a referência por
+      scripts/tests/check_equivalence.py
+    - "duckdb": a vetorizada, com as estatísticas por grupo (normalização,
+      rankings, máximos da exportação) em SQL no DuckDB (pacote opcional;
+      ver pipeline/sql_engine.py)
+
+    A variável de ambiente SCOUTS_ENGINE tem prioridade sobre o config.yaml.
+
+    Returns:
+        str: nome da engine
+    """
+    engine = os.environ.get(ENGINE_ENV) or load_settings("performance", {"engine": "reference"})["engine"]
+    if engine not in ENGINES:
+        raise ValueError(f"Engine inválida: {engine} (opções: {', '.join(ENGINES)})")
+    return engine
+
+
+def get_run_id() -> str:
+    """
+    Identificador da execução atual (ex: "20250110T143000").
+
+    Gerado uma vez por execução e compartilhado por todas as etapas
+    (new_run_id() inicia outra execução no mesmo processo); a variável de
+    ambiente SCOUTS_RUN_ID tem prioridade.
+
+    Returns:
+        str: identificador da execução
+    """
+    global _run_id
+    if os.environ.get(RUN_ID_ENV):
+        return os.environ[RUN_ID_ENV]
+    if _run_id is None:
+        _run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    return _run_id
+
+
+def new_run_id() -> str:
+    """
+    Inicia uma nova execução no mesmo processo (modo --watch, worker): as
+    próximas chamadas de get_run_id() retornam um identificador novo.
+
+    Duas execuções no mesmo segundo recebem um sufixo ("20250110T143000-2").
+    Com SCOUTS_RUN_ID definida, o identificador continua sendo o dela.
+
+    Returns:
+        str: identificador da nova execução
+    """
+    global _run_id
+    previous = _run_id
+    _run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    if previous is not None and previous.split("-")[0] == _run_id:
+        suffix = int(previous.split("-")[1]) + 1 if "-" in previous else 2
+        _run_id = f"{_run_id}-{suffix}"
+    return get_run_id()
+
+
+__all__ = ['get_base_dir', 'load_settings', 'get_engine', 'get_run_id', 'new_run_id']
@@ -5,6 +5,12 @@ Este módulo realiza:
 1. Cálculo do score ponderado por posição
 2. Cálculo de scores por categoria (CLASSIFICACAO RANKING)
 3. Geração de rankings (geral e por posição)
+4. Score e ranking globais (overall_score_global / rank_global), quando a
+   normalização entre competições está habilitada (colunas _norm_global)
+5. Perfis de peso alternativos (bases/inputs/business/profiles/*.xlsx):
+   overall_score__<perfil>, rank_position__<perfil> e rank_overall__<perfil>,
+   todos os perfis calculados de uma vez (uma multiplicação de matrizes por
+   posição)
 
 Converte: 05_calculate_overall.ipynb → calculate_overall.py
 """
@@ -12,13 +18,22 @@ Converte: 05_calculate_overall.ipynb → calculate_overall.py
 import pandas as pd
 import numpy as np
 import json
+import re
 from pathlib import Path
+from typing import Dict
 
-from . import get_base_dir
+from . import get_base_dir, get_engine
+from .groups import GroupIndex
+from .sql_engine import connect, window_ranks
+from .steps import PROFILES_DIR
+from .streaming import ChunkWriter, batch_rows, get_streaming_settings, read_batches
 
 
 POSITIONS = ["GK", "RCB", "LCB", "CB", "RB", "LB", "DM", "CM", "AM", "LW", "RW", "CF"]
 
+# Perfis de peso alternativos: um .xlsx por perfil (em PROFILES_DIR), no mesmo layout de base_peso.xlsx
+PROFILE_SEPARATOR = "__"
+
 
 def calculate_overall_score(row, weights_dict, position):
     """
@@ -103,6 +118,323 @@ def calculate_category_score(row, indicadores, weights_dict, position):
     return weighted_sum / total_weight
 
 
+def build_weight_matrix(weights_dict, indicadores):
+    """
+    Monta a matriz de pesos (posição x indicador).
+
+    Args:
+        weights_dict: dicionário com pesos por indicador e posição
+        indicadores: lista ordenada de indicadores (colunas da matriz)
+
+    Returns:
+        np.ndarray de shape (len(POSITIONS), len(indicadores)), 0 onde não há peso
+    """
+    return np.array(
+        [[weights_dict.get(ind, {}).get(pos, 0) for ind in indicadores] for pos in POSITIONS],
+        dtype=float
+    ).reshape(len(POSITIONS), len(indicadores))
+
+
+def calculate_scores_fast(df, indicadores, weights_dict, suffix="_norm"):
+    """
+    Versão vetorizada de calculate_overall_score / calculate_category_score
+    para todas as linhas de uma vez.
+
+    Acumula indicador a indicador, na mesma ordem da implementação de
+    referência, de modo que o resultado é idêntico (inclusive empates de ranking).
+
+    Args:
+        df: DataFrame com as colunas <indicador>_norm e mapped_position
+        indicadores: lista ordenada de indicadores a considerar
+        weights_dict: dicionário com pesos por indicador e posição
+        suffix: sufixo das colunas normalizadas (ex: "_norm_global")
+
+    Returns:
+        np.ndarray com o score ponderado (0-100) de cada linha, NaN se não houver peso
+    """
+    indicadores = [ind for ind in indicadores if f"{ind}{suffix}" in df.columns]
+    position_index = df["mapped_position"].map({pos: i for i, pos in enumerate(POSITIONS)})
+    valid_position = position_index.notna().to_numpy()
+    position_index = position_index.fillna(0).astype(int).to_numpy()
+
+    weight_matrix = build_weight_matrix(weights_dict, indicadores)
+    weighted_sum = np.zeros(len(df))
+    total_weight = np.zeros(len(df))
+
+    for j, indicador in enumerate(indicadores):
+        values = df[f"{indicador}{suffix}"].to_numpy(dtype=float)
+        weights = weight_matrix[position_index, j]
+
+        # Mesmo critério da referência: ignora valor nulo e peso zero
+        use = ~np.isnan(values) & (weights != 0)
+        weighted_sum += np.where(use, values * weights, 0.0)
+        total_weight += np.where(use, weights, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = weighted_sum / total_weight
+    scores[(total_weight == 0) | ~valid_position] = np.nan
+
+    return scores
+
+
+def load_profiles(profiles_dir: Path) -> Dict[str, pd.DataFrame]:
+    """
+    Carrega os perfis de peso alternativos.
+
+    Cada arquivo .xlsx da pasta é um perfil (nome = nome do arquivo, com
+    caracteres fora de [A-Za-z0-9_] trocados por _), com as mesmas colunas de
+    base_peso.xlsx; só INDICADOR, CONSIDERAR? e as colunas de posição são usadas.
+
+    Returns:
+        dict perfil → linhas ativas (CONSIDERAR? = SIM), na ordem dos nomes
+    """
+    profiles = {}
+    if not profiles_dir.is_dir():
+        return profiles
+
+    for path in sorted(profiles_dir.glob("*.xlsx")):
+        if path.name.startswith("~$"):  # arquivo temporário do Excel aberto
+            continue
+        name = re.sub(r"[^A-Za-z0-9_]", "_", path.stem)
+        if name in profiles:
+            raise ValueError(f"Perfil duplicado: {name} ({path.name})")
+        df_profile = pd.read_excel(path)
+        profiles[name] = df_profile[df_profile["CONSIDERAR?"] == "SIM"]
+    return profiles
+
+
+def build_profile_weights(profiles: Dict[str, pd.DataFrame], indicadores) -> np.ndarray:
+    """
+    Tensor de pesos dos perfis.
+
+    Returns:
+        np.ndarray de shape (len(POSITIONS), len(indicadores), len(profiles)),
+        0 onde o perfil não dá peso ao indicador na posição
+    """
+    column = {ind: j for j, ind in enumerate(indicadores)}
+    weights = np.zeros((len(POSITIONS), len(indicadores), len(profiles)))
+
+    for p, df_profile in enumerate(profiles.values()):
+        positions = [(i, pos) for i, pos in enumerate(POSITIONS) if pos in df_profile.columns]
+        for _, row in df_profile.iterrows():
+            j = column.get(str(row["INDICADOR"]).strip())
+            if j is None:
+                continue
+            for i, pos in positions:
+                weights[i, j, p] = row[pos] if pd.notna(row[pos]) else 0
+
+    return weights
+
+
+def calculate_profile_scores(df, indicadores, weights: np.ndarray) -> np.ndarray:
+    """
+    overall_score de todos os perfis de uma vez.
+
+    Mesmo critério de calculate_overall_score (valor nulo e peso zero não
+    entram; NaN sem peso), mas, para as linhas de cada posição, soma
+    ponderada e soma dos pesos saem de uma multiplicação de matrizes
+    (registros x indicadores) @ (indicadores x perfis): o custo por perfil
+    extra é uma coluna a mais no produto.
+
+    Args:
+        df: DataFrame com as colunas <indicador>_norm e mapped_position
+        indicadores: indicadores na ordem das linhas de weights
+        weights: tensor de build_profile_weights
+
+    Returns:
+        np.ndarray (registros x perfis) com o score ponderado (0-100)
+    """
+    values = df[[f"{ind}_norm" for ind in indicadores]].to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    values = np.where(present, values, 0.0)
+
+    position_index = df["mapped_position"].map({pos: i for i, pos in enumerate(POSITIONS)})
+    position_index = position_index.fillna(-1).astype(int).to_numpy()
+
+    scores = np.full((len(df), weights.shape[2]), np.nan)
+    for i in range(len(POSITIONS)):
+        rows = np.flatnonzero(position_index == i)
+        if len(rows) == 0:
+            continue
+        weighted_sum = values[rows] @ weights[i]
+        total_weight = present[rows].astype(float) @ weights[i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            position_scores = weighted_sum / total_weight
+        position_scores[total_weight == 0] = np.nan
+        scores[rows] = position_scores
+
+    return scores
+
+
+def group_indicators(df_weights, indicadores_disponiveis):
+    """
+    Indicadores de cada categoria (CLASSIFICACAO RANKING) e subcategoria
+    (SUBCLASSIFICACAO RANKING), na ordem de indicadores_disponiveis.
+
+    Returns:
+        (categorias_indicadores, subcategorias_indicadores)
+    """
+    # Criar mapeamentos indicador -> categoria e subcategoria
+    indicador_categoria = dict(zip(
+        df_weights["INDICADOR"].str.strip(),
+        df_weights["CLASSIFICACAO RANKING"]
+    ))
+
+    indicador_subcategoria = dict(zip(
+        df_weights["INDICADOR"].str.strip(),
+        df_weights["SUBCLASSIFICACAO RANKING"]
+    ))
+
+    # Agrupar indicadores por categoria (CLASSIFICACAO)
+    categorias_indicadores = {}
+    for indicador in indicadores_disponiveis:
+        categoria = indicador_categoria.get(indicador)
+        if categoria:
+            if categoria not in categorias_indicadores:
+                categorias_indicadores[categoria] = []
+            categorias_indicadores[categoria].append(indicador)
+
+    # Agrupar indicadores por subcategoria (SUBCLASSIFICACAO)
+    subcategorias_indicadores = {}
+    for indicador in indicadores_disponiveis:
+        subcategoria = indicador_subcategoria.get(indicador)
+        if subcategoria and pd.notna(subcategoria):
+            if subcategoria not in subcategorias_indicadores:
+                subcategorias_indicadores[subcategoria] = []
+            subcategorias_indicadores[subcategoria].append(indicador)
+
+    return categorias_indicadores, subcategorias_indicadores
+
+
+def run_streaming(weights_dict, indicadores_disponiveis, df_weights) -> bool:
+    """
+    Cálculo de scores em lotes (streaming.enabled), com o mesmo resultado da
+    versão em memória (engine "fast"):
+
+    A. Scores (overall, categorias, global e perfis) lote a lote, gravados em
+       um parquet temporário
+    B. Rankings a partir só das colunas de grupo e de score
+    C. Regravação lote a lote com os rankings, na ordem de colunas da versão
+       em memória
+    """
+    import pyarrow.parquet as pq
+
+    BASE_DIR = get_base_dir()
+    OUTPUT_DIR = BASE_DIR / "bases" / "outputs"
+    source = OUTPUT_DIR / "_temp_scouts_normalized.parquet"
+    staged = OUTPUT_DIR / "_temp_scouts_scored_unranked.parquet"
+    target = OUTPUT_DIR / "_temp_scouts_scored.parquet"
+    schema = pq.read_schema(source)
+    rows = batch_rows(source, get_streaming_settings())
+
+    categorias_indicadores, subcategorias_indicadores = group_indicators(df_weights, indicadores_disponiveis)
+    has_global = any(c.endswith("_norm_global") for c in schema.names)
+    profiles = load_profiles(BASE_DIR / PROFILES_DIR)
+    profile_indicadores = [ind for ind in indicadores_disponiveis if f"{ind}_norm" in schema.names]
+    profile_weights = build_profile_weights(profiles, profile_indicadores) if profiles else None
+
+    print(f"  ✓ Jogadores: {pq.ParquetFile(source).metadata.num_rows}")
+    print(f"  ✓ Indicadores com pesos: {len(weights_dict)}")
+    print(f"  ✓ Streaming: lotes de até {rows} linhas")
+
+    try:
+        # A. Scores lote a lote
+        print("\n[2/4] Calculando scores por lote...")
+        total = valid_scores = 0
+        with ChunkWriter(staged, schema) as writer:
+            for df in read_batches(source, rows):
+                columns = {"overall_score": calculate_scores_fast(df, list(weights_dict), weights_dict)}
+                for categoria, indicadores in categorias_indicadores.items():
+                    columns[f"score_{categoria}"] = calculate_scores_fast(df, indicadores, weights_dict)
+                for subcategoria, indicadores in subcategorias_indicadores.items():
+                    columns[f"sub_score_{subcategoria}"] = calculate_scores_fast(df, indicadores, weights_dict)
+                if has_global:
+                    columns["overall_score_global"] = calculate_scores_fast(
+                        df, list(weights_dict), weights_dict, suffix="_norm_global"
+                    )
+                if profiles:
+                    profile_scores = calculate_profile_scores(df, profile_indicadores, profile_weights)
+                    for p, name in enumerate(profiles):
+                        columns[f"overall_score{PROFILE_SEPARATOR}{name}"] = profile_scores[:, p]
+
+                total += len(df)
+                valid_scores += int(np.count_nonzero(~np.isnan(columns["overall_score"])))
+                writer.write(df.assign(**columns))
+        print(f"  ✓ Scores calculados: {valid_scores} válidos de {total}")
+        print(f"  ✓ Scores por categoria (CLASSIFICACAO): {len(categorias_indicadores)} categorias")
+        print(f"  ✓ Scores por subcategoria (SUBCLASSIFICACAO): {len(subcategorias_indicadores)} subcategorias")
+
+        # B. Rankings (só colunas de grupo e score)
+        print("\n[3/4] Gerando rankings...")
+        profile_score_cols = [f"overall_score{PROFILE_SEPARATOR}{name}" for name in profiles]
+        key_cols = ["mapped_position", "competition_id", "position_group", "overall_score"]
+        keys = pd.read_parquet(staged, columns=key_cols + (["overall_score_global"] if has_global else []) + profile_score_cols)
+
+        position_groups = GroupIndex(keys, "mapped_position")
+        overall_groups = GroupIndex(keys, ["competition_id", "position_group"])
+        scores = keys["overall_score"].to_numpy(dtype=float)
+        ranks = {
+            "rank_position": position_groups.rank(scores, ascending=False),
+            "rank_overall": overall_groups.rank(scores, ascending=False),
+        }
+        if has_global:
+            ranks["rank_global"] = GroupIndex(keys, "position_group").rank(
+                keys["overall_score_global"].to_numpy(dtype=float), ascending=False
+            )
+        for name, score_col in zip(profiles, profile_score_cols):
+            scores_p = keys[score_col].to_numpy(dtype=float)
+            ranks[f"rank_position{PROFILE_SEPARATOR}{name}"] = position_groups.rank(scores_p, ascending=False)
+            ranks[f"rank_overall{PROFILE_SEPARATOR}{name}"] = overall_groups.rank(scores_p, ascending=False)
+        del keys
+        print(f"  ✓ Ranking por posição calculado (rank_position)")
+        print(f"  ✓ Ranking overall por competição e grupo calculado (rank_overall)")
+        if has_global:
+            print(f"  ✓ Ranking global por grupo entre competições calculado (rank_global)")
+        if profiles:
+            print(f"  ✓ Perfis de peso: {len(profiles)} ({', '.join(profiles)})")
+            for name, df_profile in profiles.items():
+                missing = set(df_profile["INDICADOR"].astype(str).str.strip()) - set(profile_indicadores)
+                if missing:
+                    print(f"  ⚠ Perfil {name}: {len(missing)} indicadores ativos sem valor normalizado "
+                          f"(fora da base_peso.xlsx ativa) ignorados")
+
+        # C. Mesma ordem de colunas da versão em memória
+        print("\n[4/4] Gravando scores e rankings...")
+        late = (["overall_score_global"] if has_global else []) + profile_score_cols
+        final_columns = [c for c in pq.read_schema(staged).names if c not in late]
+        final_columns += ["rank_position", "rank_overall"]
+        if has_global:
+            final_columns += ["overall_score_global", "rank_global"]
+        for name in profiles:
+            final_columns += [f"{prefix}{PROFILE_SEPARATOR}{name}"
+                              for prefix in ("overall_score", "rank_position", "rank_overall")]
+
+        with ChunkWriter(target) as writer:
+            for df in read_batches(staged, rows):
+                for name, values in ranks.items():
+                    df[name] = values[df.index]
+                writer.write(df[final_columns])
+        print(f"  ✓ Dados salvos: _temp_scouts_scored.parquet")
+    finally:
+        if staged.exists():
+            staged.unlink()
+
+    score_cols = [c for c in final_columns if c.startswith("score_") or c == "overall_score"]
+    sub_score_cols = [c for c in final_columns if c.startswith("sub_score_")]
+    print("\n" + "=" * 70)
+    print("RESUMO")
+    print("=" * 70)
+    print(f"Total de jogadores: {total}")
+    print(f"Jogadores com score válido: {valid_scores}")
+    print(f"Colunas de score (CLASSIFICACAO): {len(score_cols)}")
+    print(f"Colunas de sub_score (SUBCLASSIFICACAO): {len(sub_score_cols)}")
+    print(f"Total de colunas de score: {len(score_cols) + len(sub_score_cols)}")
+    print("=" * 70)
+    print()
+
+    return True
+
+
 def run() -> bool:
     """
     Executa o cálculo de scores.
@@ -122,8 +454,6 @@ def run() -> bool:
 
         # 1. Carregar Dados
         print("[1/4] Carregando dados...")
-        df = pd.read_parquet(OUTPUT_DIR / "_temp_scouts_normalized.parquet")
-
         with open(OUTPUT_DIR / "_temp_weights_map.json", "r") as f:
             weights_dict = json.load(f)
 
@@ -132,19 +462,30 @@ def run() -> bool:
 
         df_weights = pd.read_parquet(OUTPUT_DIR / "_temp_weights_active.parquet")
 
+        if get_streaming_settings()["enabled"]:
+            return run_streaming(weights_dict, indicadores_disponiveis, df_weights)
+
+        df = pd.read_parquet(OUTPUT_DIR / "_temp_scouts_normalized.parquet")
+
+        engine = get_engine()
+
         print(f"  ✓ Jogadores: {len(df)}")
         print(f"  ✓ Indicadores com pesos: {len(weights_dict)}")
+        print(f"  ✓ Engine: {engine}")
 
         # 2. Calcular Score Overall
         print("\n[2/4] Calculando scores overall...")
-        scores = []
-        for idx, row in df.iterrows():
-            if (idx + 1) % 1000 == 0:
-                print(f"    {idx + 1}/{len(df)}...", end="\r")
+        if engine != "reference":
+            scores = calculate_scores_fast(df, list(weights_dict), weights_dict)
+        else:
+            scores = []
+            for idx, row in df.iterrows():
+                if (idx + 1) % 1000 == 0:
+                    print(f"    {idx + 1}/{len(df)}...", end="\r")
 
-            position = row["mapped_position"]
-            score = calculate_overall_score(row, weights_dict, position)
-            scores.append(score)
+                position = row["mapped_position"]
+                score = calculate_overall_score(row, weights_dict, position)
+                scores.append(score)
 
         df["overall_score"] = scores
         valid_scores = df["overall_score"].notna().sum()
@@ -153,45 +494,21 @@ def run() -> bool:
         # 3. Calcular Scores por Categoria e Subcategoria
         print("\n[3/4] Calculando scores por categoria e subcategoria...")
 
-        # Criar mapeamentos indicador -> categoria e subcategoria
-        indicador_categoria = dict(zip(
-            df_weights["INDICADOR"].str.strip(),
-            df_weights["CLASSIFICACAO RANKING"]
-        ))
-
-        indicador_subcategoria = dict(zip(
-            df_weights["INDICADOR"].str.strip(),
-            df_weights["SUBCLASSIFICACAO RANKING"]
-        ))
-
-        # Agrupar indicadores por categoria (CLASSIFICACAO)
-        categorias_indicadores = {}
-        for indicador in indicadores_disponiveis:
-            categoria = indicador_categoria.get(indicador)
-            if categoria:
-                if categoria not in categorias_indicadores:
-                    categorias_indicadores[categoria] = []
-                categorias_indicadores[categoria].append(indicador)
-
-        # Agrupar indicadores por subcategoria (SUBCLASSIFICACAO)
-        subcategorias_indicadores = {}
-        for indicador in indicadores_disponiveis:
-            subcategoria = indicador_subcategoria.get(indicador)
-            if subcategoria and pd.notna(subcategoria):
-                if subcategoria not in subcategorias_indicadores:
-                    subcategorias_indicadores[subcategoria] = []
-                subcategorias_indicadores[subcategoria].append(indicador)
+        categorias_indicadores, subcategorias_indicadores = group_indicators(df_weights, indicadores_disponiveis)
 
         # Calcular score por categoria (CLASSIFICACAO)
         for categoria, indicadores in categorias_indicadores.items():
             col_name = f"score_{categoria}"
             print(f"    {col_name}...", end="\r")
 
-            scores_cat = []
-            for idx, row in df.iterrows():
-                position = row["mapped_position"]
-                score = calculate_category_score(row, indicadores, weights_dict, position)
-                scores_cat.append(score)
+            if engine != "reference":
+                scores_cat = calculate_scores_fast(df, indicadores, weights_dict)
+            else:
+                scores_cat = []
+                for idx, row in df.iterrows():
+                    position = row["mapped_position"]
+                    score = calculate_category_score(row, indicadores, weights_dict, position)
+                    scores_cat.append(score)
 
             df[col_name] = scores_cat
 
@@ -202,11 +519,14 @@ def run() -> bool:
             col_name = f"sub_score_{subcategoria}"
             print(f"    {col_name}...", end="\r")
 
-            scores_subcat = []
-            for idx, row in df.iterrows():
-                position = row["mapped_position"]
-                score = calculate_category_score(row, indicadores, weights_dict, position)
-                scores_subcat.append(score)
+            if engine != "reference":
+                scores_subcat = calculate_scores_fast(df, indicadores, weights_dict)
+            else:
+                scores_subcat = []
+                for idx, row in df.iterrows():
+                    position = row["mapped_position"]
+                    score = calculate_category_score(row, indicadores, weights_dict, position)
+                    scores_subcat.append(score)
 
             df[col_name] = scores_subcat
 
@@ -215,15 +535,77 @@ def run() -> bool:
         # 4. Gerar Rankings
         print("\n[4/4] Gerando rankings...")
 
-        # rank_position: ranking por posição (mapped_position)
-        df["rank_position"] = df.groupby("mapped_position")["overall_score"].rank(ascending=False, method="min")
-
-        # rank_overall: ranking por competition_id + position_group
-        df["rank_overall"] = df.groupby(["competition_id", "position_group"])["overall_score"].rank(ascending=False, method="min")
+        if engine == "duckdb":
+            # Funções de janela no DuckDB: rank() OVER (PARTITION BY ...) = method="min"
+            with connect() as con:
+                ranks = window_ranks(con, df, {
+                    "rank_position": (["mapped_position"], "overall_score"),
+                    "rank_overall": (["competition_id", "position_group"], "overall_score"),
+                })
+            df["rank_position"] = ranks["rank_position"]
+            df["rank_overall"] = ranks["rank_overall"]
+        elif engine == "fast":
+            # Chaves de grupo fatoradas uma única vez (códigos inteiros) por agrupamento
+            scores = df["overall_score"].to_numpy(dtype=float)
+            df["rank_position"] = GroupIndex(df, "mapped_position").rank(scores, ascending=False)
+            df["rank_overall"] = GroupIndex(df, ["competition_id", "position_group"]).rank(scores, ascending=False)
+        else:
+            # rank_position: ranking por posição (mapped_position)
+            df["rank_position"] = df.groupby("mapped_position")["overall_score"].rank(ascending=False, method="min")
+
+            # rank_overall: ranking por competition_id + position_group
+            df["rank_overall"] = df.groupby(["competition_id", "position_group"])["overall_score"].rank(ascending=False, method="min")
 
         print(f"  ✓ Ranking por posição calculado (rank_position)")
         print(f"  ✓ Ranking overall por competição e grupo calculado (rank_overall)")
 
+        # Score e ranking entre competições (normalização global por força da liga)
+        if any(c.endswith("_norm_global") for c in df.columns):
+            df["overall_score_global"] = calculate_scores_fast(
+                df, list(weights_dict), weights_dict, suffix="_norm_global"
+            )
+            # rank_global: ranking por position_group entre todas as competições
+            if engine == "duckdb":
+                with connect() as con:
+                    df["rank_global"] = window_ranks(
+                        con, df, {"rank_global": (["position_group"], "overall_score_global")}
+                    )["rank_global"]
+            elif engine == "fast":
+                df["rank_global"] = GroupIndex(df, "position_group").rank(
+                    df["overall_score_global"].to_numpy(dtype=float), ascending=False
+                )
+            else:
+                df["rank_global"] = df.groupby("position_group")["overall_score_global"].rank(
+                    ascending=False, method="min"
+                )
+            print(f"  ✓ Ranking global por grupo entre competições calculado (rank_global)")
+
+        # Perfis de peso alternativos (cenários)
+        profiles = load_profiles(BASE_DIR / PROFILES_DIR)
+        if profiles:
+            indicadores = [ind for ind in indicadores_disponiveis if f"{ind}_norm" in df.columns]
+            ignored = {
+                name: sorted(set(df_profile["INDICADOR"].astype(str).str.strip()) - set(indicadores))
+                for name, df_profile in profiles.items()
+            }
+            profile_scores = calculate_profile_scores(df, indicadores, build_profile_weights(profiles, indicadores))
+
+            position_groups = GroupIndex(df, "mapped_position")
+            overall_groups = GroupIndex(df, ["competition_id", "position_group"])
+            profile_columns = {}
+            for p, name in enumerate(profiles):
+                scores_p = profile_scores[:, p]
+                profile_columns[f"overall_score{PROFILE_SEPARATOR}{name}"] = scores_p
+                profile_columns[f"rank_position{PROFILE_SEPARATOR}{name}"] = position_groups.rank(scores_p, ascending=False)
+                profile_columns[f"rank_overall{PROFILE_SEPARATOR}{name}"] = overall_groups.rank(scores_p, ascending=False)
+            df = pd.concat([df, pd.DataFrame(profile_columns, index=df.index)], axis=1)
+
+            print(f"  ✓ Perfis de peso: {len(profiles)} ({', '.join(profiles)})")
+            for name, missing in ignored.items():
+                if missing:
+                    print(f"  ⚠ Perfil {name}: {len(missing)} indicadores ativos sem valor normalizado "
+                          f"(fora da base_peso.xlsx ativa) ignorados")
+
         # Salvar
         df.to_parquet(OUTPUT_DIR / "_temp_scouts_scored.parquet", index=False)
         print(f"  ✓ Dados salvos: _temp_scouts_scored.parquet")
@@ -14,7 +14,7 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import yaml
 
-from . import get_base_dir
+from . import get_base_dir, get_engine
 
 
 def load_config():
@@ -226,6 +226,52 @@ def calculate_trend_for_player(player_records, config):
     return result
 
 
+def calculate_trends_fast(df, config, trend_columns):
+    """
+    Calcula as tendências com um único groupby por unique_key.
+
+    Usa a mesma calculate_trend_for_player da referência, mas evita o
+    filtro df[df['unique_key'] == key] (uma varredura completa por jogador).
+
+    Args:
+        df: DataFrame com todos os registros (histórico + atual)
+        config: Dict com configurações de tendência
+        trend_columns: colunas de tendência (já inicializadas com None)
+
+    Returns:
+        tuple (processed, with_trends)
+    """
+    processed = 0
+    with_trends = 0
+    current_index = []
+    current_values = []
+
+    for key, player_records in df.groupby('unique_key', sort=False):
+        trends = calculate_trend_for_player(player_records, config)
+
+        # Atualizar APENAS o registro atual (v_current = True)
+        current_rows = player_records.index[player_records['v_current'] == True]
+        if len(current_rows) > 0:
+            for row_index in current_rows:
+                current_index.append(row_index)
+                current_values.append([trends[col] for col in trend_columns])
+
+            if trends['trend_overall_periods_used'] > 0:
+                with_trends += 1
+
+        processed += 1
+        if processed % 1000 == 0:
+            print(f"    {processed}...", end='\r')
+
+    if current_index:
+        values = np.empty((len(current_index), len(trend_columns)), dtype=object)
+        values[:] = current_values
+        for j, col in enumerate(trend_columns):
+            df.loc[current_index, col] = values[:, j]
+
+    return processed, with_trends
+
+
 def run() -> bool:
     """
     Executa o cálculo de tendências.
@@ -254,8 +300,10 @@ def run() -> bool:
 
         time_window = config.get('time_window_months', 3)
         min_periods = config.get('min_periods_required', 2)
+        engine = get_engine()
         print(f"  ✓ Time window: {time_window} meses")
         print(f"  ✓ Mínimo de períodos para regressão: {min_periods}")
+        print(f"  ✓ Engine: {engine}")
 
         # Carregar dados scored
         print("\n[2/4] Carregando dados...")
@@ -283,31 +331,34 @@ def run() -> bool:
             df[col] = None
 
         # Processar por unique_key
-        unique_keys = df['unique_key'].unique()
-        processed = 0
-        with_trends = 0
-
-        for key in unique_keys:
-            # Filtrar todos os registros deste jogador (histórico + atual)
-            player_records = df[df['unique_key'] == key].copy()
-
-            # Calcular tendências
-            trends = calculate_trend_for_player(player_records, config)
-
-            # Atualizar APENAS o registro atual (v_current = True)
-            current_mask = (df['unique_key'] == key) & (df['v_current'] == True)
-
-            if current_mask.any():
-                for col, value in trends.items():
-                    df.loc[current_mask, col] = value
-
-                # Contar quantos têm tendências calculadas
-                if trends['trend_overall_periods_used'] > 0:
-                    with_trends += 1
-
-            processed += 1
-            if processed % 1000 == 0:
-                print(f"    {processed}/{len(unique_keys)}...", end='\r')
+        if engine != "reference":
+            processed, with_trends = calculate_trends_fast(df, config, trend_columns)
+        else:
+            unique_keys = df['unique_key'].unique()
+            processed = 0
+            with_trends = 0
+
+            for key in unique_keys:
+                # Filtrar todos os registros deste jogador (histórico + atual)
+                player_records = df[df['unique_key'] == key].copy()
+
+                # Calcular tendências
+                trends = calculate_trend_for_player(player_records, config)
+
+                # Atualizar APENAS o registro atual (v_current = True)
+                current_mask = (df['unique_key'] == key) & (df['v_current'] == True)
+
+                if current_mask.any():
+                    for col, value in trends.items():
+                        df.loc[current_mask, col] = value
+
+                    # Contar quantos têm tendências calculadas
+                    if trends['trend_overall_periods_used'] > 0:
+                        with_trends += 1
+
+                processed += 1
+                if processed % 1000 == 0:
+                    print(f"    {processed}/{len(unique_keys)}...", end='\r')
 
         print(f"  ✓ Tendências calculadas: {processed} jogadores")
         print(f"  ✓ Jogadores com dados históricos: {with_trends}")
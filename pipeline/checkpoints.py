@@ -0,0 +1,209 @@
+"""
+Validação de Checkpoints
+
+Cada etapa da pipeline já grava seus resultados em bases/outputs/
+(_temp_*.parquet e consolidated_*.parquet). Este módulo registra, ao final
+de cada etapa, a impressão digital (hash) das entradas e das saídas em
+bases/outputs/_checkpoints.json, permitindo:
+
+1. Saber se o checkpoint de uma etapa ainda corresponde às entradas atuais
+2. Retomar a pipeline a partir de uma etapa (--from/--to/--only no main.py)
+3. Reexecutar automaticamente somente os estágios dependentes desatualizados
+"""
+
+import glob
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import get_base_dir
+from .steps import ancestors, build_dependencies
+
+
+CHECKPOINTS_FILE = "_checkpoints.json"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """Calcula o hash (blake2b) do conteúdo de um arquivo"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Registro das impressões digitais de entradas/saídas por etapa.
+
+    Os hashes por arquivo ficam em cache (chave: tamanho + mtime), então
+    arquivos grandes que não mudaram não são relidos a cada validação.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = Path(base_dir) if base_dir else get_base_dir()
+        self.output_dir = self.base_dir / "bases" / "outputs"
+        self.state_file = self.output_dir / CHECKPOINTS_FILE
+        self.state = self._load()
+
+    def _load(self) -> Dict:
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                state.setdefault("steps", {})
+                state.setdefault("file_hashes", {})
+                return state
+            except (OSError, ValueError):
+                pass
+        return {"steps": {}, "file_hashes": {}}
+
+    def save(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        tmp_file.replace(self.state_file)
+
+    def _file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path.resolve())
+        cached = self.state["file_hashes"].get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["hash"]
+
+        file_hash = hash_file(path)
+        self.state["file_hashes"][key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_hash,
+        }
+        return file_hash
+
+    def expand_inputs(self, patterns: Iterable[str]) -> List[Path]:
+        """Expande os padrões glob de entrada (relativos ao diretório base)"""
+        paths = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(str(self.base_dir / pattern)))
+            paths.extend(Path(m) for m in matches)
+        return paths
+
+    def fingerprint(self, paths: Iterable[Path]) -> str:
+        """
+        Impressão digital combinada de um conjunto de arquivos.
+
+        Arquivos inexistentes entram como "missing", de modo que a remoção
+        de um arquivo também invalida o checkpoint.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for path in paths:
+            path = Path(path)
+            try:
+                name = str(path.relative_to(self.base_dir))
+            except ValueError:
+                name = str(path)
+            file_hash = self._file_hash(path) if path.exists() else "missing"
+            digest.update(f"{name}={file_hash};".encode("utf-8"))
+        return digest.hexdigest()
+
+    def file_hashes(self, patterns: Iterable[str]) -> Dict[str, str]:
+        """Hash de cada arquivo que casa com os padrões (caminho relativo → hash)"""
+        return {
+            path.relative_to(self.base_dir).as_posix(): self._file_hash(path)
+            for path in self.expand_inputs(patterns)
+        }
+
+    def input_fingerprint(self, step) -> str:
+        return self.fingerprint(self.expand_inputs(step.inputs))
+
+    def output_fingerprint(self, step) -> str:
+        return self.fingerprint(self.output_dir / f for f in step.outputs)
+
+    def record(self, step):
+        """Registra o checkpoint de uma etapa recém-concluída"""
+        self.state["steps"][step.id] = {
+            "inputs": self.input_fingerprint(step),
+            "outputs": self.output_fingerprint(step),
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save()
+
+    def invalidate(self, step):
+        """Remove o checkpoint de uma etapa (ex: após falha)"""
+        if self.state["steps"].pop(step.id, None) is not None:
+            self.save()
+
+    def inputs_changed(self, step) -> bool:
+        """Se as entradas da etapa mudaram desde o checkpoint (sem checkpoint = mudaram)"""
+        recorded = self.state["steps"].get(step.id)
+        return recorded is None or recorded["inputs"] != self.input_fingerprint(step)
+
+    def status(self, step) -> Tuple[bool, str]:
+        """
+        Verifica se o checkpoint de uma etapa está atualizado.
+
+        Returns:
+            (atualizado, motivo)
+        """
+        recorded = self.state["steps"].get(step.id)
+        if recorded is None:
+            return False, "sem checkpoint registrado"
+
+        missing = [f for f in step.outputs if not (self.output_dir / f).exists()]
+        if missing:
+            return False, f"arquivo ausente: {missing[0]}"
+
+        if recorded["inputs"] != self.input_fingerprint(step):
+            return False, "entradas alteradas"
+
+        if recorded["outputs"] != self.output_fingerprint(step):
+            return False, "saídas alteradas fora da pipeline"
+
+        return True, f"checkpoint de {recorded['completed_at']}"
+
+
+def plan_steps(steps: List, selected_ids: Set[str], store: CheckpointStore) -> List[Tuple[object, str, str]]:
+    """
+    Decide o que fazer com cada estágio necessário para os selecionados.
+
+    - Estágios selecionados sempre executam
+    - Estágios dos quais eles dependem executam se o checkpoint estiver
+      desatualizado ou se alguma de suas dependências for executada
+    - Os demais são pulados, reaproveitando o checkpoint
+    - Estágios fora da seleção e sem relação com ela não entram no plano
+
+    Args:
+        steps: lista de Step em ordem topológica (get_steps)
+        selected_ids: ids dos estágios pedidos pelo usuário
+        store: CheckpointStore
+
+    Returns:
+        lista de (step, ação, motivo), ação em {"run", "skip"}
+    """
+    dependencies = build_dependencies(steps)
+    needed = set(selected_ids) | ancestors(dependencies, selected_ids)
+
+    plan = []
+    will_run = set()
+    for step in steps:
+        if step.id not in needed:
+            continue
+
+        if step.id in selected_ids:
+            plan.append((step, "run", "selecionada"))
+        elif any(dep in will_run for dep in dependencies[step.id]):
+            plan.append((step, "run", "depende de etapa reexecutada"))
+        else:
+            fresh, reason = store.status(step)
+            if fresh:
+                plan.append((step, "skip", reason))
+                continue
+            plan.append((step, "run", f"checkpoint desatualizado ({reason})"))
+
+        will_run.add(step.id)
+
+    return plan
@@ -9,10 +9,169 @@ Este módulo realiza:
 Converte: 03_consolidate_players.ipynb → consolidate_players.py
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from . import get_base_dir
+from .streaming import ChunkWriter, batch_rows, get_streaming_settings, read_batches
+
+
+DATE_COLUMN = "player_season_most_recent_match"
+KEY_SOURCE_COLUMNS = ["player_id", "competition_id", "team_id"]
+
+
+def make_unique_key(df: pd.DataFrame) -> pd.Series:
+    """Chave única: player_id + competition_id + team_id"""
+    return (
+        df["player_id"].astype(str) + "_" +
+        df["competition_id"].astype(str) + "_" +
+        df["team_id"].astype(str)
+    )
+
+
+def resolve_player_names(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Substitui player_name pela versão final e cria competition_name se não
+    existir (local por linha: também usada lote a lote).
+    """
+    # Criar coluna auxiliar player_name com lógica de prioridade:
+    # 1. player_known_name (prioridade máxima)
+    # 2. player_name (vem do Excel original)
+    # 3. first_name + last_name (somente se AMBOS existirem)
+    # 4. somente first_name
+    # 5. somente last_name
+
+    df["player_name_final"] = None
+
+    # Prioridade 1: player_known_name
+    if "player_known_name" in df.columns:
+        mask = df["player_known_name"].notna()
+        df.loc[mask, "player_name_final"] = df.loc[mask, "player_known_name"]
+
+    # Prioridade 2: player_name (do Excel original)
+    if "player_name" in df.columns:
+        mask = df["player_name_final"].isna() & df["player_name"].notna()
+        df.loc[mask, "player_name_final"] = df.loc[mask, "player_name"]
+
+    # Prioridade 3: first_name + last_name (somente se AMBOS existirem)
+    if "player_first_name" in df.columns and "player_last_name" in df.columns:
+        mask = (
+            df["player_name_final"].isna() &
+            df["player_first_name"].notna() &
+            df["player_last_name"].notna()
+        )
+        df.loc[mask, "player_name_final"] = (
+            df.loc[mask, "player_first_name"].astype(str) + " " +
+            df.loc[mask, "player_last_name"].astype(str)
+        )
+
+    # Prioridade 4: somente first_name
+    if "player_first_name" in df.columns:
+        mask = df["player_name_final"].isna() & df["player_first_name"].notna()
+        df.loc[mask, "player_name_final"] = df.loc[mask, "player_first_name"]
+
+    # Prioridade 5: somente last_name
+    if "player_last_name" in df.columns:
+        mask = df["player_name_final"].isna() & df["player_last_name"].notna()
+        df.loc[mask, "player_name_final"] = df.loc[mask, "player_last_name"]
+
+    # Substituir a coluna player_name pela versão final
+    df["player_name"] = df["player_name_final"]
+    df.drop(columns=["player_name_final"], inplace=True)
+
+    # Criar competition_name se não existir
+    if "competition_name" not in df.columns and "source_file" in df.columns:
+        df["competition_name"] = df["source_file"].str.replace(".xlsx", "", regex=False)
+
+    return df
+
+
+def run_streaming() -> bool:
+    """
+    Consolidação em lotes (streaming.enabled), com o mesmo resultado da
+    versão em memória:
+
+    1. Só as colunas de chave e data: v_current e a ordem final (mais recente
+       primeiro, mesma ordenação da versão em memória)
+    2. Lote a lote: chave, data, v_current e nome, gravados em um arquivo
+       Arrow temporário
+    3. O arquivo temporário é mapeado em memória (sem carregar) e regravado
+       em parquet na ordem final, lote a lote
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    OUTPUT_DIR = get_base_dir() / "bases" / "outputs"
+    source = OUTPUT_DIR / "_temp_scouts_positions.parquet"
+    target = OUTPUT_DIR / "_temp_scouts_consolidated.parquet"
+    schema = pq.read_schema(source)
+    has_date = DATE_COLUMN in schema.names
+    rows = batch_rows(source, get_streaming_settings())
+
+    # 1. Chaves e ordem final
+    print(f"[1/3] Criando chave única e marcando registro atual (lotes de até {rows} linhas)...")
+    keys = pd.read_parquet(source, columns=KEY_SOURCE_COLUMNS + ([DATE_COLUMN] if has_date else []))
+    unique_key = make_unique_key(keys)
+    if has_date:
+        keys[DATE_COLUMN] = pd.to_datetime(keys[DATE_COLUMN], errors="coerce")
+        order = keys.sort_values(DATE_COLUMN, ascending=False).index.to_numpy()
+    else:
+        order = np.arange(len(keys))
+    v_current = np.empty(len(keys), dtype=bool)
+    v_current[order] = ~unique_key.iloc[order].duplicated(keep="first").to_numpy()
+    n_unique = unique_key.nunique()
+    del keys, unique_key
+
+    print(f"  ✓ Total de registros: {len(v_current)}")
+    print(f"  ✓ Chaves únicas: {n_unique}")
+    if len(v_current) > n_unique:
+        print(f"  ⚠ Registros duplicados: {len(v_current) - n_unique}")
+    print(f"  ✓ Registros atuais (v_current=True): {int(v_current.sum())}")
+    print(f"  ✓ Registros históricos (v_current=False): {int((~v_current).sum())}")
+
+    # 2. Colunas locais por linha
+    print("\n[2/3] Gerando colunas auxiliares...")
+    staged = OUTPUT_DIR / "_temp_scouts_consolidated.arrow"
+    with_name = 0
+    with ChunkWriter(staged if has_date else target, schema, fmt="ipc" if has_date else "parquet") as writer:
+        for df in read_batches(source, rows):
+            df["unique_key"] = make_unique_key(df)
+            if has_date:
+                df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN], errors="coerce")
+            df["v_current"] = v_current[df.index]
+            df = resolve_player_names(df)
+            with_name += int(df["player_name"].notna().sum())
+            writer.write(df)
+    print(f"  ✓ player_name gerado: {with_name} registros com nome")
+    if writer.rows - with_name > 0:
+        print(f"  ⚠ Registros SEM nome: {writer.rows - with_name}")
+
+    # 3. Ordem final (mais recente primeiro)
+    print("\n[3/3] Gravando na ordem final...")
+    if has_date:
+        try:
+            with pa.memory_map(str(staged)) as source_map:
+                table = pa.ipc.open_file(source_map).read_all()
+                with ChunkWriter(target) as final_writer:
+                    for start in range(0, len(order), rows):
+                        final_writer.write_table(table.take(order[start:start + rows]))
+                del table
+        finally:
+            staged.unlink()
+    print(f"  ✓ Dados salvos: _temp_scouts_consolidated.parquet")
+
+    print("\n" + "=" * 70)
+    print("RESUMO")
+    print("=" * 70)
+    print(f"Total de registros: {len(v_current)}")
+    print(f"Registros atuais (v_current=True): {int(v_current.sum())}")
+    print(f"Registros históricos: {int((~v_current).sum())}")
+    print(f"Chaves únicas: {n_unique}")
+    print("=" * 70)
+    print()
+
+    return True
 
 
 def run() -> bool:
@@ -32,6 +191,9 @@ def run() -> bool:
         BASE_DIR = get_base_dir()
         OUTPUT_DIR = BASE_DIR / "bases" / "outputs"
 
+        if get_streaming_settings()["enabled"]:
+            return run_streaming()
+
         # 1. Carregar Dados
         print("[1/4] Carregando dados...")
         df = pd.read_parquet(OUTPUT_DIR / "_temp_scouts_positions.parquet")
@@ -39,11 +201,7 @@ def run() -> bool:
 
         # 2. Criar Chave Única (player_id + competition_id + team_id)
         print("\n[2/4] Criando chave única...")
-        df["unique_key"] = (
-            df["player_id"].astype(str) + "_" +
-            df["competition_id"].astype(str) + "_" +
-            df["team_id"].astype(str)
-        )
+        df["unique_key"] = make_unique_key(df)
 
         print(f"  ✓ Total de registros: {len(df)}")
         print(f"  ✓ Chaves únicas: {df['unique_key'].nunique()}")
@@ -76,54 +234,7 @@ def run() -> bool:
         # 4. Gerar Colunas Auxiliares
         print("\n[4/4] Gerando colunas auxiliares...")
 
-        # Criar coluna auxiliar player_name com lógica de prioridade:
-        # 1. player_known_name (prioridade máxima)
-        # 2. player_name (vem do Excel original)
-        # 3. first_name + last_name (somente se AMBOS existirem)
-        # 4. somente first_name
-        # 5. somente last_name
-
-        df["player_name_final"] = None
-
-        # Prioridade 1: player_known_name
-        if "player_known_name" in df.columns:
-            mask = df["player_known_name"].notna()
-            df.loc[mask, "player_name_final"] = df.loc[mask, "player_known_name"]
-
-        # Prioridade 2: player_name (do Excel original)
-        if "player_name" in df.columns:
-            mask = df["player_name_final"].isna() & df["player_name"].notna()
-            df.loc[mask, "player_name_final"] = df.loc[mask, "player_name"]
-
-        # Prioridade 3: first_name + last_name (somente se AMBOS existirem)
-        if "player_first_name" in df.columns and "player_last_name" in df.columns:
-            mask = (
-                df["player_name_final"].isna() &
-                df["player_first_name"].notna() &
-                df["player_last_name"].notna()
-            )
-            df.loc[mask, "player_name_final"] = (
-                df.loc[mask, "player_first_name"].astype(str) + " " +
-                df.loc[mask, "player_last_name"].astype(str)
-            )
-
-        # Prioridade 4: somente first_name
-        if "player_first_name" in df.columns:
-            mask = df["player_name_final"].isna() & df["player_first_name"].notna()
-            df.loc[mask, "player_name_final"] = df.loc[mask, "player_first_name"]
-
-        # Prioridade 5: somente last_name
-        if "player_last_name" in df.columns:
-            mask = df["player_name_final"].isna() & df["player_last_name"].notna()
-            df.loc[mask, "player_name_final"] = df.loc[mask, "player_last_name"]
-
-        # Substituir a coluna player_name pela versão final
-        df["player_name"] = df["player_name_final"]
-        df.drop(columns=["player_name_final"], inplace=True)
-
-        # Criar competition_name se não existir
-        if "competition_name" not in df.columns and "source_file" in df.columns:
-            df["competition_name"] = df["source_file"].str.replace(".xlsx", "", regex=False)
+        df = resolve_player_names(df)
 
         print(f"  ✓ player_name gerado: {df['player_name'].notna().sum()} registros com nome")
         if df['player_name'].isna().sum() > 0:
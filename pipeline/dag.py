@@ -0,0 +1,157 @@
+"""
+Execução da Pipeline em DAG
+
+Este módulo realiza:
+1. Agendamento dos estágios respeitando as dependências (steps.build_dependencies)
+2. Execução concorrente dos estágios independentes em um pool de threads
+3. Saída de console por estágio: com mais de um worker, o texto de cada
+   estágio é acumulado e exibido em bloco quando ele termina, para que as
+   mensagens de estágios paralelos não se misturem
+
+pandas/pyarrow liberam o GIL na leitura/escrita de parquet e em boa parte
+das operações vetorizadas, então threads são suficientes para sobrepor
+I/O e cálculo sem o custo de serializar DataFrames entre processos.
+"""
+
+import io
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class ThreadBufferedStream:
+    """
+    Envolve sys.stdout acumulando o texto por thread enquanto um estágio roda.
+
+    Texto escrito fora de um estágio (ex: pela thread principal) vai direto
+    para o stream original.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def begin(self):
+        self._local.buffer = io.StringIO()
+
+    def end(self):
+        buffer = getattr(self._local, "buffer", None)
+        self._local.buffer = None
+        if buffer is not None:
+            with self._lock:
+                self._stream.write(buffer.getvalue())
+                self._stream.flush()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            return buffer.write(text)
+        with self._lock:
+            return self._stream.write(text)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextmanager
+def buffered_stdout():
+    """Instala um ThreadBufferedStream em sys.stdout durante o bloco"""
+    original = sys.stdout
+    stream = ThreadBufferedStream(original)
+    sys.stdout = stream
+    try:
+        yield stream
+    finally:
+        if sys.stdout is stream:
+            sys.stdout = original
+
+
+class DagResult:
+    """Resultado de uma execução: estágios concluídos e a falha (se houver)"""
+
+    def __init__(self):
+        self.completed: List[str] = []
+        self.failed_step = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def success(self) -> bool:
+        return self.failed_step is None
+
+
+def run_dag(steps: List, dependencies: Dict[str, List[str]], execute: Callable,
+            workers: int = 1, on_start: Optional[Callable] = None,
+            on_success: Optional[Callable] = None,
+            stream: Optional[ThreadBufferedStream] = None) -> DagResult:
+    """
+    Executa os estágios assim que suas dependências terminarem.
+
+    Dependências que não estão em `steps` (ex: estágios pulados por terem
+    checkpoint válido) são consideradas satisfeitas. Na primeira falha nenhum
+    estágio novo é iniciado; os que já estão rodando terminam normalmente.
+
+    Args:
+        steps: estágios a executar, em ordem topológica
+        dependencies: dict id → ids dos quais o estágio depende
+        execute: função(step) → bool, chamada na thread do worker
+        workers: quantidade máxima de estágios simultâneos
+        on_start: função(step) chamada na thread principal ao iniciar um estágio
+        on_success: função(step) chamada na thread principal ao concluir um estágio
+        stream: ThreadBufferedStream para agrupar a saída de cada estágio
+
+    Returns:
+        DagResult
+    """
+    result = DagResult()
+    pending = list(steps)
+    scheduled_ids = {step.id for step in steps}
+    done = set()
+
+    def is_ready(step) -> bool:
+        return all(dep in done or dep not in scheduled_ids for dep in dependencies[step.id])
+
+    def worker(step) -> Tuple[bool, Optional[BaseException]]:
+        if stream is not None:
+            stream.begin()
+        try:
+            return bool(execute(step)), None
+        except Exception as e:
+            return False, e
+        finally:
+            if stream is not None:
+                stream.end()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="stage") as pool:
+        running = {}
+        while pending or running:
+            if result.success:
+                for step in [s for s in pending if is_ready(s)][:max(1, workers) - len(running)]:
+                    pending.remove(step)
+                    if on_start is not None:
+                        on_start(step)
+                    running[pool.submit(worker, step)] = step
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step = running.pop(future)
+                ok, error = future.result()
+                if ok:
+                    done.add(step.id)
+                    result.completed.append(step.id)
+                    if on_success is not None:
+                        on_success(step)
+                elif result.success:
+                    result.failed_step = step
+                    result.error = error
+
+    return result
@@ -0,0 +1,325 @@
+"""
+Datasets Particionados (Hive)
+
+Este módulo realiza:
+1. Escrita dos arquivos finais como datasets particionados no formato Hive
+   (bases/outputs/datasets/<arquivo>/competition_id=<id>/part-0.parquet),
+   opcionalmente também por v_current
+2. Reescrita apenas das partições cujo conteúdo mudou (hash por partição
+   guardado em _partitions.json), para que o Power BI recarregue só o que mudou
+3. Preparação em staging (stage_partitioned, na exportação) e publicação
+   (promote_partitioned, no estágio publish, depois da verificação): cada
+   partição alterada substitui a anterior com os.replace, então um leitor
+   nunca vê um arquivo parcial nem partições de uma exportação que falhou
+4. Remoção das partições que deixaram de existir (ex: competição retirada)
+
+Como no padrão Hive, as colunas de partição ficam no caminho e não dentro
+dos arquivos; read_dataset() reconstrói essas colunas com o tipo original.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from . import load_settings
+from .parquet_io import get_write_options, write_parquet
+
+
+DATASETS_DIR = "datasets"
+PARTITIONS_FILE = "_partitions.json"
+PART_FILE = "part-0.parquet"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+DEFAULT_DATASET_SETTINGS = {
+    "enabled": False,
+    "partition_by": ["competition_id"],
+    "files": ["consolidated_overall", "consolidated_context", "consolidated_normalized"],
+}
+
+
+def get_dataset_settings() -> Dict[str, Any]:
+    """Seção export.datasets do config.yaml, completada com os valores padrão"""
+    export_settings = load_settings("export", {})
+    settings = dict(DEFAULT_DATASET_SETTINGS)
+    settings.update(export_settings.get("datasets") or {})
+    return settings
+
+
+def partition_value(value) -> str:
+    """Formata o valor de uma chave de partição para o nome do diretório"""
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA:
+        return NULL_PARTITION
+    if isinstance(value, (bool, np.bool_)):
+        return str(bool(value)).lower()
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def partition_hash(df: pd.DataFrame, schema: pa.Schema) -> str:
+    """Hash do conteúdo de uma partição (valores e schema das colunas, em qualquer ordem)"""
+    df = df[sorted(df.columns)]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(sorted((field.name, str(field.type)) for field in schema)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class DatasetStats:
+    """Resumo da escrita de um dataset particionado"""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        self.written: List[str] = []
+        self.unchanged: List[str] = []
+        self.removed: List[str] = []
+        self.size_bytes = 0
+        self.seconds = 0.0
+
+    def describe(self) -> str:
+        total = len(self.written) + len(self.unchanged)
+        return (f"{total} partições: {len(self.written)} gravadas, {len(self.unchanged)} sem alteração, "
+                f"{len(self.removed)} removidas")
+
+
+def _load_partitions(dataset_dir: Path, partition_by: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Lê o _partitions.json (vazio se não existir ou se o particionamento mudou)"""
+    state_file = dataset_dir / PARTITIONS_FILE
+    if not state_file.exists():
+        return {}
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("partition_by") != partition_by:
+        return {}
+    return state.get("partitions", {})
+
+
+def _existing_partitions(dataset_dir: Path) -> List[str]:
+    """Partições presentes em disco (diretórios com part-0.parquet)"""
+    if not dataset_dir.exists():
+        return []
+    return sorted(
+        path.parent.relative_to(dataset_dir).as_posix()
+        for path in dataset_dir.rglob(PART_FILE)
+    )
+
+
+def stage_partitioned(df: pd.DataFrame, output_dir: Path, staging: Path, name: str,
+                      partition_by: Optional[List[str]] = None) -> DatasetStats:
+    """
+    Prepara um dataset particionado em staging, gravando só as partições que mudaram.
+
+    A comparação é feita contra o dataset publicado (bases/outputs/datasets/<name>/);
+    em staging ficam as partições alteradas e o novo _partitions.json, que
+    promote_partitioned() aplica depois da verificação da publicação.
+
+    Args:
+        df: tabela final (ex: consolidated_overall)
+        output_dir: bases/outputs
+        staging: pasta de staging da execução (publish.staging_dir)
+        name: nome do dataset (ex: "consolidated_overall")
+        partition_by: colunas de partição (None = export.datasets.partition_by)
+
+    Returns:
+        DatasetStats (removed = partições publicadas que deixarão de existir)
+    """
+    start = time.perf_counter()
+    if partition_by is None:
+        partition_by = get_dataset_settings()["partition_by"]
+    partition_by = [col for col in partition_by if col in df.columns]
+    if not partition_by:
+        raise ValueError(f"Nenhuma coluna de partição disponível em {name}")
+
+    dataset_dir = Path(output_dir) / DATASETS_DIR / name
+    staged_dir = Path(staging) / DATASETS_DIR / name
+    stats = DatasetStats(name, staged_dir)
+    previous = _load_partitions(dataset_dir, partition_by)
+
+    # Estágio reexecutado na mesma execução: descartar o que já estava preparado
+    shutil.rmtree(staged_dir, ignore_errors=True)
+    options = get_write_options(name)
+
+    # Schema da tabela inteira: todas as partições ficam com os mesmos tipos
+    # (uma partição com coluna toda nula não vira tipo "null")
+    schema = pa.Schema.from_pandas(df.drop(columns=partition_by), preserve_index=False)
+
+    partitions = {}
+    for keys, part in df.groupby(partition_by, dropna=False, sort=True):
+        keys = keys if isinstance(keys, tuple) else (keys,)
+        relative = "/".join(f"{col}={partition_value(value)}" for col, value in zip(partition_by, keys))
+        data = part.drop(columns=partition_by).reset_index(drop=True)
+        content_hash = partition_hash(data, schema)
+
+        old = previous.get(relative)
+        if old and old["hash"] == content_hash and (dataset_dir / relative / PART_FILE).exists():
+            partitions[relative] = old
+            stats.unchanged.append(relative)
+            continue
+
+        target = staged_dir / relative / PART_FILE
+        target.parent.mkdir(parents=True, exist_ok=True)
+        stats.size_bytes += write_parquet(data, target, options, schema=schema).size_bytes
+        stats.written.append(relative)
+        partitions[relative] = {
+            "hash": content_hash,
+            "rows": len(data),
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    stats.removed = [relative for relative in _existing_partitions(dataset_dir) if relative not in partitions]
+
+    state = {
+        "dataset": name,
+        "partition_by": partition_by,
+        "dtypes": {col: str(df[col].dtype) for col in partition_by},
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "partitions": partitions,
+    }
+    staged_dir.mkdir(parents=True, exist_ok=True)
+    with open(staged_dir / PARTITIONS_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def staged_datasets(staging: Path) -> List[str]:
+    """Datasets preparados em staging (com _partitions.json)"""
+    root = Path(staging) / DATASETS_DIR
+    if not root.exists():
+        return []
+    return sorted(path.parent.name for path in root.glob(f"*/{PARTITIONS_FILE}"))
+
+
+def _read_state(dataset_dir: Path) -> Dict[str, Any]:
+    with open(dataset_dir / PARTITIONS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_partitioned(output_dir: Path, staging: Path, name: str,
+                       expected_rows: Optional[int] = None) -> List[str]:
+    """
+    Confere um dataset preparado antes da publicação.
+
+    Args:
+        expected_rows: linhas do arquivo consolidado correspondente (None = não conferir)
+
+    Returns:
+        lista de problemas (vazia se o dataset pode ser publicado)
+    """
+    import pyarrow.parquet as pq
+
+    dataset_dir = Path(output_dir) / DATASETS_DIR / name
+    staged_dir = Path(staging) / DATASETS_DIR / name
+    state = _read_state(staged_dir)
+
+    problems = []
+    for relative, info in state["partitions"].items():
+        staged = staged_dir / relative / PART_FILE
+        if staged.exists():
+            try:
+                rows = pq.read_metadata(staged).num_rows
+            except Exception as e:
+                problems.append(f"datasets/{name}/{relative}: parquet ilegível ({type(e).__name__}: {e})")
+                continue
+            if rows != info["rows"]:
+                problems.append(f"datasets/{name}/{relative}: {rows} linhas, esperado {info['rows']}")
+        elif not (dataset_dir / relative / PART_FILE).exists():
+            problems.append(f"datasets/{name}/{relative}: partição não preparada")
+
+    total = sum(info["rows"] for info in state["partitions"].values())
+    if expected_rows is not None and total != expected_rows:
+        problems.append(f"datasets/{name}: {total} linhas, esperado {expected_rows}")
+    return problems
+
+
+def promote_partitioned(output_dir: Path, staging: Path, name: str) -> DatasetStats:
+    """
+    Publica um dataset preparado por stage_partitioned().
+
+    Cada partição alterada substitui a publicada com os.replace (um leitor
+    nunca vê um arquivo parcial), as partições que deixaram de existir são
+    removidas e o _partitions.json é trocado por último.
+
+    Returns:
+        DatasetStats
+    """
+    start = time.perf_counter()
+    dataset_dir = Path(output_dir) / DATASETS_DIR / name
+    staged_dir = Path(staging) / DATASETS_DIR / name
+    stats = DatasetStats(name, dataset_dir)
+    state = _read_state(staged_dir)
+
+    for relative in state["partitions"]:
+        staged = staged_dir / relative / PART_FILE
+        if not staged.exists():
+            stats.unchanged.append(relative)
+            continue
+        target = dataset_dir / relative / PART_FILE
+        target.parent.mkdir(parents=True, exist_ok=True)
+        stats.size_bytes += staged.stat().st_size
+        os.replace(staged, target)
+        stats.written.append(relative)
+
+    # Remover partições que deixaram de existir (só o arquivo: ao mudar o
+    # particionamento, o diretório antigo pode conter as novas partições)
+    for relative in _existing_partitions(dataset_dir):
+        if relative not in state["partitions"]:
+            (dataset_dir / relative / PART_FILE).unlink()
+            stats.removed.append(relative)
+            _remove_empty_dirs(dataset_dir / relative, dataset_dir)
+
+    os.replace(staged_dir / PARTITIONS_FILE, dataset_dir / PARTITIONS_FILE)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _remove_empty_dirs(path: Path, stop: Path):
+    """Remove path e seus pais enquanto estiverem vazios, até (sem incluir) stop"""
+    while path != stop and path.exists() and not any(path.iterdir()):
+        path.rmdir()
+        path = path.parent
+
+
+def read_dataset(output_dir: Path, name: str, filters=None) -> pd.DataFrame:
+    """
+    Lê um dataset particionado, recriando as colunas de partição com o tipo original.
+
+    Args:
+        output_dir: bases/outputs
+        name: nome do dataset (ex: "consolidated_overall")
+        filters: filtros do pyarrow (ex: [("competition_id", "=", 43)])
+
+    Returns:
+        DataFrame com todas as partições (ou as filtradas)
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset_dir = Path(output_dir) / DATASETS_DIR / name
+    with open(dataset_dir / PARTITIONS_FILE, "r", encoding="utf-8") as f:
+        state = json.load(f)
+
+    fields = [pa.field(col, pa.from_numpy_dtype(np.dtype(state["dtypes"][col]))
+                       if state["dtypes"][col] != "object" else pa.string())
+              for col in state["partition_by"]]
+    partitioning = ds.partitioning(pa.schema(fields), flavor="hive")
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning=partitioning,
+                         exclude_invalid_files=True, ignore_prefixes=[".", "_"])
+
+    expression = pq.filters_to_expression(filters) if filters else None
+    return dataset.to_table(filter=expression).to_pandas()
@@ -0,0 +1,365 @@
+"""
+Verificação de Equivalência entre Engines
+
+Este módulo realiza:
+1. Comparação coluna a coluna de dois DataFrames/parquets de saída
+2. Alinhamento das linhas por unique_key (+ v_current e data do registro)
+3. Tolerâncias por tipo de coluna (scores, rankings, cores, tendências)
+4. Execução das etapas com duas engines sobre as mesmas entradas
+
+Usado por scripts/tests/check_equivalence.py para validar que as
+implementações vetorizadas ("fast") produzem o mesmo
+consolidated_overall.parquet que a implementação de referência.
+"""
+
+import fnmatch
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Colunas usadas para alinhar as linhas (as que existirem no arquivo)
+KEY_COLUMNS = ["unique_key", "v_current", "player_season_most_recent_match"]
+
+# Tolerância absoluta por padrão de nome de coluna (primeiro padrão que casar).
+# Rankings, cores, categorias e direções de tendência precisam ser idênticos.
+DEFAULT_TOLERANCES = [
+    ("rank_*", 0.0),
+    ("trend_*_direction", 0.0),
+    ("trend_*_change", 0.0),
+    ("highlight_color", 0.0),
+    ("max_categories", 0.0),
+    ("overall_score*", 1e-6),
+    ("score_*", 1e-6),
+    ("sub_score_*", 1e-6),
+    ("*_norm", 1e-6),
+    ("*_norm_global", 1e-6),
+    ("*_pctl", 1e-6),
+    ("trend_overall_slope", 1e-4),
+    ("trend_overall_change_pct", 1e-2),
+]
+
+# Arquivos comparados entre engines (checkpoints intermediários + saídas finais)
+COMPARED_FILES = [
+    "_temp_scouts_normalized.parquet",
+    "_temp_scouts_scored.parquet",
+    "_temp_scouts_with_trends.parquet",
+    "consolidated_overall.parquet",
+    "consolidated_normalized.parquet",
+    "consolidated_context.parquet",
+    "consolidated_weights.parquet",
+]
+
+
+def get_tolerance(column: str, tolerances=None) -> float:
+    """Retorna a tolerância absoluta para uma coluna (0.0 = igualdade exata)"""
+    for pattern, tolerance in (tolerances or DEFAULT_TOLERANCES):
+        if fnmatch.fnmatch(column, pattern):
+            return tolerance
+    return 0.0
+
+
+class ColumnMismatch:
+    """Divergências encontradas em uma coluna"""
+
+    def __init__(self, column: str, count: int, tolerance: float, max_abs_diff: Optional[float],
+                 examples: List[Tuple]):
+        self.column = column
+        self.count = count
+        self.tolerance = tolerance
+        self.max_abs_diff = max_abs_diff
+        self.examples = examples
+
+    def to_dict(self) -> Dict:
+        return {
+            "column": self.column,
+            "count": self.count,
+            "tolerance": self.tolerance,
+            "max_abs_diff": self.max_abs_diff,
+            "examples": [
+                {"key": str(key), "reference": str(ref), "candidate": str(cand)}
+                for key, ref, cand in self.examples
+            ],
+        }
+
+
+class EquivalenceReport:
+    """Resultado da comparação de duas tabelas"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows_reference = 0
+        self.rows_candidate = 0
+        self.missing_columns: List[str] = []
+        self.extra_columns: List[str] = []
+        self.dtype_changes: Dict[str, Tuple[str, str]] = {}
+        self.missing_keys: List[str] = []
+        self.extra_keys: List[str] = []
+        self.mismatches: List[ColumnMismatch] = []
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing_columns or self.extra_columns or self.missing_keys
+                    or self.extra_keys or self.mismatches)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "ok": self.ok,
+            "rows_reference": self.rows_reference,
+            "rows_candidate": self.rows_candidate,
+            "missing_columns": self.missing_columns,
+            "extra_columns": self.extra_columns,
+            "dtype_changes": {c: list(v) for c, v in self.dtype_changes.items()},
+            "missing_keys": self.missing_keys[:20],
+            "extra_keys": self.extra_keys[:20],
+            "mismatches": [m.to_dict() for m in self.mismatches],
+        }
+
+    def print_summary(self, max_examples: int = 5):
+        status = "✓" if self.ok else "✗"
+        print(f"  {status} {self.name}: {self.rows_reference} x {self.rows_candidate} linhas")
+
+        if self.missing_columns:
+            print(f"      Colunas ausentes: {self.missing_columns}")
+        if self.extra_columns:
+            print(f"      Colunas extras: {self.extra_columns}")
+        for col, (ref_dtype, cand_dtype) in self.dtype_changes.items():
+            print(f"      ⚠ Tipo diferente em {col}: {ref_dtype} -> {cand_dtype}")
+        if self.missing_keys:
+            print(f"      Chaves ausentes: {len(self.missing_keys)} (ex: {self.missing_keys[:3]})")
+        if self.extra_keys:
+            print(f"      Chaves extras: {len(self.extra_keys)} (ex: {self.extra_keys[:3]})")
+
+        for mismatch in self.mismatches:
+            diff = f", max |Δ| = {mismatch.max_abs_diff:.3g}" if mismatch.max_abs_diff is not None else ""
+            print(f"      {mismatch.column}: {mismatch.count} divergência(s) (tol={mismatch.tolerance}{diff})")
+            for key, ref, cand in mismatch.examples[:max_examples]:
+                print(f"        {key}: {ref!r} != {cand!r}")
+
+
+def _align(df: pd.DataFrame, key_columns: List[str]) -> pd.DataFrame:
+    """Indexa o DataFrame pelas colunas-chave (+ ordem de ocorrência para duplicatas)"""
+    df = df.reset_index(drop=True)
+    occurrence = df.groupby(key_columns, dropna=False, sort=False).cumcount()
+    keys = [df[c].astype(str) for c in key_columns] + [occurrence.astype(str)]
+    index = keys[0].str.cat(keys[1:], sep="|")
+    return df.set_index(index)
+
+
+def _values_equal(ref: pd.Series, cand: pd.Series, tolerance: float) -> Tuple[np.ndarray, Optional[float]]:
+    """
+    Compara duas séries alinhadas.
+
+    Returns:
+        (máscara de igualdade, maior diferença absoluta para colunas numéricas)
+    """
+    both_null = ref.isna().to_numpy() & cand.isna().to_numpy()
+
+    numeric = pd.api.types.is_numeric_dtype(ref) and pd.api.types.is_numeric_dtype(cand)
+    numeric = numeric and not pd.api.types.is_bool_dtype(ref)
+    if not numeric:
+        # Colunas object com valores numéricos (ex: tendências) também usam tolerância
+        ref_num = pd.to_numeric(ref, errors="coerce")
+        cand_num = pd.to_numeric(cand, errors="coerce")
+        if ref_num.notna().sum() == ref.notna().sum() and cand_num.notna().sum() == cand.notna().sum() \
+                and ref.notna().any() and not pd.api.types.is_datetime64_any_dtype(ref):
+            ref, cand, numeric = ref_num, cand_num, True
+
+    if numeric:
+        a = ref.to_numpy(dtype=float)
+        b = cand.to_numpy(dtype=float)
+        with np.errstate(invalid="ignore"):
+            diff = np.abs(a - b)
+        equal = (diff <= tolerance) | both_null | ((a == b) & ~np.isnan(a))
+        valid = ~np.isnan(diff)
+        max_diff = float(diff[valid].max()) if valid.any() else None
+        return equal, max_diff
+
+    equal = (ref.astype(object).to_numpy() == cand.astype(object).to_numpy()) | both_null
+    return np.asarray(equal, dtype=bool), None
+
+
+def compare_frames(reference: pd.DataFrame, candidate: pd.DataFrame, name: str = "frame",
+                   key_columns: Optional[List[str]] = None, tolerances=None,
+                   max_examples: int = 10) -> EquivalenceReport:
+    """
+    Compara duas tabelas coluna a coluna, alinhando as linhas por chave.
+
+    Args:
+        reference: tabela produzida pela implementação de referência
+        candidate: tabela produzida pela implementação candidata
+        name: nome usado no relatório
+        key_columns: colunas de alinhamento (padrão: KEY_COLUMNS disponíveis)
+        tolerances: lista (padrão, tolerância) - padrão: DEFAULT_TOLERANCES
+        max_examples: quantidade de chaves de exemplo guardadas por coluna
+
+    Returns:
+        EquivalenceReport
+    """
+    report = EquivalenceReport(name)
+    report.rows_reference = len(reference)
+    report.rows_candidate = len(candidate)
+
+    report.missing_columns = [c for c in reference.columns if c not in candidate.columns]
+    report.extra_columns = [c for c in candidate.columns if c not in reference.columns]
+
+    if key_columns is None:
+        key_columns = [c for c in KEY_COLUMNS if c in reference.columns and c in candidate.columns]
+
+    if key_columns:
+        reference = _align(reference, key_columns)
+        candidate = _align(candidate, key_columns)
+        report.missing_keys = sorted(set(reference.index) - set(candidate.index))
+        report.extra_keys = sorted(set(candidate.index) - set(reference.index))
+        common = reference.index.intersection(candidate.index, sort=False)
+        reference = reference.loc[common]
+        candidate = candidate.loc[common]
+    else:
+        # Sem chave: compara pela posição
+        n = min(len(reference), len(candidate))
+        reference = reference.iloc[:n].reset_index(drop=True)
+        candidate = candidate.iloc[:n].reset_index(drop=True)
+
+    for col in reference.columns:
+        if col not in candidate.columns:
+            continue
+
+        if str(reference[col].dtype) != str(candidate[col].dtype):
+            report.dtype_changes[col] = (str(reference[col].dtype), str(candidate[col].dtype))
+
+        tolerance = get_tolerance(col, tolerances)
+        equal, max_diff = _values_equal(reference[col], candidate[col], tolerance)
+
+        if not equal.all():
+            different = np.flatnonzero(~equal)
+            examples = [
+                (reference.index[i].split("|")[0], reference[col].iloc[i], candidate[col].iloc[i])
+                for i in different[:max_examples]
+            ]
+            report.mismatches.append(ColumnMismatch(col, len(different), tolerance, max_diff, examples))
+
+    return report
+
+
+def compare_output_dirs(reference_dir: Path, candidate_dir: Path, files: Optional[List[str]] = None,
+                        tolerances=None) -> List[EquivalenceReport]:
+    """
+    Compara os parquets de mesmo nome em dois diretórios de saída.
+
+    Args:
+        reference_dir: diretório com as saídas de referência
+        candidate_dir: diretório com as saídas candidatas
+        files: arquivos a comparar (padrão: COMPARED_FILES existentes em ambos)
+
+    Returns:
+        lista de EquivalenceReport, um por arquivo
+    """
+    reports = []
+    for filename in (files or COMPARED_FILES):
+        ref_file = Path(reference_dir) / filename
+        cand_file = Path(candidate_dir) / filename
+        if not ref_file.exists() or not cand_file.exists():
+            continue
+
+        reports.append(compare_frames(
+            pd.read_parquet(ref_file),
+            pd.read_parquet(cand_file),
+            name=filename,
+            tolerances=tolerances,
+        ))
+
+    return reports
+
+
+def run_with_engine(source_base: Path, workdir: Path, engine: str, from_step: str = "normalize_indicators",
+                    verbose: bool = False) -> Path:
+    """
+    Executa as etapas a partir de from_step com uma engine, em uma cópia isolada.
+
+    Os checkpoints _temp_* de source_base/bases/outputs são copiados para
+    workdir, de forma que todas as engines partem exatamente das mesmas entradas.
+
+    Args:
+        source_base: diretório base com config/ e os checkpoints das etapas anteriores
+        workdir: diretório base da cópia (será criado)
+        engine: nome da engine ("reference", "fast", ...)
+        from_step: primeira etapa a executar (ela e tudo que depende dela)
+        verbose: mostrar a saída das etapas
+
+    Returns:
+        Path do diretório de saídas gerado
+    """
+    from . import BASE_DIR_ENV, ENGINE_ENV
+    from .steps import STAGING, ancestors, build_dependencies, get_steps, select_steps
+
+    source_base = Path(source_base)
+    workdir = Path(workdir)
+    output_dir = workdir / "bases" / "outputs"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    shutil.copytree(source_base / "config", workdir / "config", dirs_exist_ok=True)
+    for checkpoint in (source_base / "bases" / "outputs").glob("_temp_*"):
+        shutil.copy2(checkpoint, output_dir / checkpoint.name)
+
+    previous_env = {name: os.environ.get(name) for name in (BASE_DIR_ENV, ENGINE_ENV)}
+    os.environ[BASE_DIR_ENV] = str(workdir)
+    os.environ[ENGINE_ENV] = engine
+
+    try:
+        # Estágios declarados a partir do config.yaml da cópia (arquivos opcionais inclusive)
+        steps = get_steps()
+        selected = select_steps(steps, from_step=from_step)
+        # O publish só publica o que esta execução preparou em _staging/<run id>/: as exportações
+        # das quais ele depende (ex: export_weights) executam mesmo fora de from_step
+        staged = {step.id for step in steps if any(output.startswith(f"{STAGING}/") for output in step.outputs)}
+        selected |= staged & ancestors(build_dependencies(steps), selected)
+        if any(step.group == "load_data" and step.id in selected for step in steps):
+            shutil.copytree(source_base / "bases" / "inputs", workdir / "bases" / "inputs", dirs_exist_ok=True)
+
+        for step in (step for step in steps if step.id in selected):
+            if verbose:
+                result = step.run()
+            else:
+                with redirect_stdout(io.StringIO()):
+                    result = step.run()
+            if not result:
+                raise RuntimeError(f"Etapa '{step.name}' retornou False (engine {engine})")
+    finally:
+        for env_name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(env_name, None)
+            else:
+                os.environ[env_name] = value
+
+    return output_dir
+
+
+def compare_engines(source_base: Path, reference_engine: str = "reference", candidate_engine: str = "fast",
+                    from_step: str = "normalize_indicators", workdir: Optional[Path] = None,
+                    tolerances=None, verbose: bool = False) -> List[EquivalenceReport]:
+    """
+    Executa as mesmas etapas com duas engines e compara todas as saídas.
+
+    Returns:
+        lista de EquivalenceReport, um por arquivo comparado
+    """
+    cleanup = workdir is None
+    workdir = Path(workdir) if workdir else Path(tempfile.mkdtemp(prefix="scouts_equivalence_"))
+
+    try:
+        reference_dir = run_with_engine(source_base, workdir / reference_engine, reference_engine,
+                                        from_step=from_step, verbose=verbose)
+        candidate_dir = run_with_engine(source_base, workdir / candidate_engine, candidate_engine,
+                                        from_step=from_step, verbose=verbose)
+        return compare_output_dirs(reference_dir, candidate_dir, tolerances=tolerances)
+    finally:
+        if cleanup:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -8,14 +8,401 @@ Este módulo realiza:
    - consolidated_weights.parquet (tabela de pesos)
    - consolidated_context.parquet (metadados)
    - consolidated_normalized.parquet (valores normalizados)
+   - consolidated_normalized_long.parquet (opcional: valores normalizados em
+     formato longo, export.normalized_long)
+
+Cada arquivo tem sua própria função de montagem (EXPORTS). run() grava os
+quatro arquivos em paralelo; no runner em DAG eles são estágios independentes
+(run_overall, run_weights, run_context, run_normalized), cada um lendo só as
+colunas de que precisa. Os arquivos são gravados em bases/outputs/_staging/<run id>/
+e só substituem os consolidated_*.parquet anteriores depois de verificados,
+todos juntos, pela publicação (ver publish.py). Codec, nível de compressão e
+row group de cada arquivo vêm da seção export do config.yaml (ver parquet_io.py). Com
+export.datasets habilitado, os arquivos também são preparados como datasets
+particionados por competição, publicados junto com os demais (ver datasets.py).
 
 Converte: 06_export.ipynb → export.py
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from . import get_base_dir, get_engine, get_run_id, load_settings
+from .datasets import get_dataset_settings, stage_partitioned
+from .groups import GroupIndex
+from .parquet_io import WriteStats, get_write_options, write_many, write_parquet
+from .publish import RUN_ID_KEY, publish, staging_dir
+from .sql_engine import connect, window_max_flags
+from .steps import LONG_FILE
+
+
+WITH_TRENDS_FILE = "_temp_scouts_with_trends.parquet"
+WEIGHTS_FILE = "_temp_weights_active.parquet"
+NORMALIZED_FILE = "consolidated_normalized.parquet"
+
+DEFAULT_LONG_SETTINGS = {
+    "enabled": False,
+    "drop_null": True,
+}
+
+# Colunas geradas para cada perfil de peso alternativo (calculate_overall)
+PROFILE_PREFIXES = ("overall_score__", "rank_position__", "rank_overall__")
+
+MAIN_COLUMNS = [
+    "unique_key",
+    "player_id",
+    "competition_id",
+    "player_name",
+    "competition_name",
+    "team_name",
+    "primary_position",
+    "mapped_position",
+    "position_group",
+    "position_sub_group",
+    "v_current",
+    "overall_score",
+    "rank_overall",
+    "rank_position",
+    # Score/ranking entre competições (normalization.global)
+    "overall_score_global",
+    "rank_global",
+    # Informações pessoais
+    "birth_date",
+    "player_weight",
+    "player_height",
+    "country_id",
+    "nationality",
+    # Informações de disponibilidade
+    "player_season_minutes",
+    "player_season_appearances",
+    "player_season_starting_appearances",
+    "player_season_average_minutes",
+    "player_season_most_recent_match",
+    "player_season_90s_played",
+    "player_season_360_minutes",
+    # Colunas de tendência
+    "trend_overall_slope",
+    "trend_overall_direction",
+    "trend_overall_change_pct",
+    "trend_overall_periods_used",
+    "trend_overall_months_span",
+    "trend_rank_overall_change",
+    "trend_rank_overall_direction",
+    "trend_rank_position_change",
+    "trend_rank_position_direction",
+]
+
+
+def overall_columns(columns) -> List[str]:
+    """Colunas de consolidated_overall (MAIN_COLUMNS + scores por categoria/subcategoria)"""
+    main_cols = list(MAIN_COLUMNS)
+
+    # Adicionar colunas de score por categoria (CLASSIFICACAO)
+    main_cols.extend(c for c in columns if c.startswith("score_") and not c.startswith("sub_score_"))
+
+    # Adicionar colunas de sub_score por subcategoria (SUBCLASSIFICACAO)
+    main_cols.extend(c for c in columns if c.startswith("sub_score_"))
+
+    # Perfis de peso alternativos (overall_score__<perfil>, rank_*__<perfil>)
+    main_cols.extend(c for c in columns if c.startswith(PROFILE_PREFIXES))
+
+    return main_cols
+
+
+def context_columns(columns) -> List[str]:
+    """Colunas de consolidated_context (identificadores + colunas de contexto fora do overall)"""
+    main_cols = overall_columns(columns)
+    context_cols = [
+        "player_id",
+        "competition_id",
+        "unique_key",
+        "source_file",
+        "v_current",
+        "player_season_most_recent_match",
+    ]
+
+    # Adicionar outras colunas de contexto disponíveis
+    extra_context = [c for c in columns if any([
+        "player_" in c.lower(),
+        "team_" in c.lower(),
+        "competition_" in c.lower(),
+        "season" in c.lower(),
+    ]) and not c.endswith(("_norm", "_norm_global", "_pctl")) and c not in main_cols]
+
+    context_cols.extend(extra_context)
+    # Ordem estável (sem duplicatas), para que execuções iguais gerem arquivos iguais
+    return list(dict.fromkeys(c for c in context_cols if c in columns))
+
+
+def normalized_columns(columns) -> List[str]:
+    """Colunas de consolidated_normalized (identificadores + indicadores _norm, _norm_global e _pctl)"""
+    id_cols = ["player_id", "competition_id", "unique_key", "mapped_position", "v_current"]
+    norm_cols = [c for c in columns if c.endswith("_norm")]
+    global_cols = [c for c in columns if c.endswith("_norm_global")]
+    pctl_cols = [c for c in columns if c.endswith("_pctl")]
+    return [c for c in id_cols if c in columns] + norm_cols + global_cols + pctl_cols
+
+
+def read_columns(path: Path, select: Callable) -> pd.DataFrame:
+    """Lê do parquet apenas as colunas escolhidas por select(colunas do arquivo)"""
+    names = pq.read_schema(path).names
+    columns = [c for c in dict.fromkeys(select(names)) if c in names]
+    return pd.read_parquet(path, columns=columns)
+
+
+def build_overall(df: pd.DataFrame) -> pd.DataFrame:
+    """Monta consolidated_overall (scores, cores e categorias máximas)"""
+    # Filtrar colunas disponíveis
+    available_main_cols = [c for c in overall_columns(df.columns) if c in df.columns]
+    df_overall = df[available_main_cols].copy()
+
+    # Calcular idade a partir da birth_date
+    if "birth_date" in df_overall.columns:
+        from datetime import datetime
+        current_date = datetime.now()
+        df_overall["player_age"] = df_overall["birth_date"].apply(
+            lambda x: (current_date - pd.to_datetime(x)).days // 365 if pd.notna(x) else None
+        )
+
+    # Calcular coluna de cor baseada nos máximos por competition_id + position_group
+    print("  Calculando coluna de cores...")
+
+    # Mapear nomes das colunas de score para as categorias corretas
+    score_mapping = {}
+    for col in df_overall.columns:
+        if col.startswith("score_"):
+            category = col.replace("score_", "").lower()
+            score_mapping[category] = col
+
+    # Calcular máximos por grupo (competition_id + position_group)
+    engine = get_engine()
+    fast = engine != "reference"
+    if fast:
+        # Códigos de grupo e "é o máximo do grupo" calculados uma vez por coluna,
+        # reaproveitados pelas cores e pelas categorias máximas
+        groups = GroupIndex(df_overall, ["competition_id", "position_group"])
+        is_max = {}
+        if engine == "duckdb":
+            # Máximos por grupo como funções de janela no DuckDB (todas as colunas em uma consulta)
+            max_cols = [c for c in ["overall_score"] + list(score_mapping.values()) if c in df_overall.columns]
+            with connect() as con:
+                is_max = window_max_flags(con, df_overall, ["competition_id", "position_group"], max_cols)
+
+        def group_max_flags(score_col):
+            if score_col not in is_max:
+                is_max[score_col] = groups.is_max(df_overall[score_col].to_numpy(dtype=float))
+            return is_max[score_col]
+    else:
+        grouped = df_overall.groupby(["competition_id", "position_group"])
+
+    # Definir ordem de prioridade para as cores
+    color_priority = [
+        ("overall_score", "#E6E6E6"),
+        (score_mapping.get("offensive", None), "#FECACA"),
+        (score_mapping.get("dgp", None), "#FEF3C7"),
+        (score_mapping.get("pass", None), "#DDD6FE"),
+        (score_mapping.get("defensive", None), "#BFDBFE"),
+    ]
+
+    # Filtrar apenas as colunas que existem
+    color_priority = [(col, color) for col, color in color_priority if col and col in df_overall.columns]
+
+    def get_color(row):
+        """Determina a cor baseada no score máximo do grupo"""
+        # Se position_group é None, retornar branco
+        if pd.isna(row["position_group"]):
+            return "#FFFFFF"
+
+        group_key = (row["competition_id"], row["position_group"])
+
+        # Verificar se o grupo existe
+        try:
+            group_data = grouped.get_group(group_key)
+        except KeyError:
+            return "#FFFFFF"
+
+        # Verificar cada score na ordem de prioridade
+        for score_col, color in color_priority:
+            if pd.notna(row[score_col]):
+                max_score = group_data[score_col].max()
+                if row[score_col] == max_score:
+                    return color
+
+        return "#FFFFFF"  # cor padrão se nenhuma condição for atendida
+
+    if fast:
+        # Primeira cor da ordem de prioridade em que o jogador é o máximo do grupo
+        df_overall["highlight_color"] = np.select(
+            [group_max_flags(col) for col, _ in color_priority],
+            [color for _, color in color_priority],
+            default="#FFFFFF",
+        ).astype(object)
+    else:
+        df_overall["highlight_color"] = df_overall.apply(get_color, axis=1)
+    print(f"  ✓ Coluna highlight_color adicionada")
+
+    # Calcular coluna com todas as categorias máximas
+    print("  Calculando categorias máximas...")
+
+    # Mapeamento de colunas para nomes amigáveis
+    category_names = {
+        "overall_score": "Overall",
+        score_mapping.get("offensive", None): "Offensive",
+        score_mapping.get("dgp", None): "DGP",
+        score_mapping.get("pass", None): "Pass",
+        score_mapping.get("defensive", None): "Defensive",
+    }
+
+    # Filtrar apenas as colunas que existem
+    category_names = {col: name for col, name in category_names.items() if col and col in df_overall.columns}
+
+    def get_max_categories(row):
+        """Retorna todas as categorias em que o jogador é máximo no grupo"""
+        # Se position_group é None, retornar vazio
+        if pd.isna(row["position_group"]):
+            return ""
+
+        group_key = (row["competition_id"], row["position_group"])
+
+        # Verificar se o grupo existe
+        try:
+            group_data = grouped.get_group(group_key)
+        except KeyError:
+            return ""
+
+        max_categories = []
+
+        # Verificar todas as categorias
+        for score_col, category_name in category_names.items():
+            if pd.notna(row[score_col]):
+                max_score = group_data[score_col].max()
+                if row[score_col] == max_score:
+                    max_categories.append(category_name)
+
+        return ", ".join(max_categories) if max_categories else ""
+
+    if fast:
+        max_categories = np.full(len(df_overall), "", dtype=object)
+        for score_col, category_name in category_names.items():
+            flags = group_max_flags(score_col)
+            separator = np.where(max_categories[flags] == "", "", ", ")
+            max_categories[flags] = max_categories[flags] + separator + category_name
+        df_overall["max_categories"] = max_categories
+    else:
+        df_overall["max_categories"] = df_overall.apply(get_max_categories, axis=1)
+    print(f"  ✓ Coluna max_categories adicionada")
+
+    return df_overall.sort_values("rank_overall")
+
+
+def build_weights(df_weights: pd.DataFrame) -> pd.DataFrame:
+    """Monta consolidated_weights (tabela de pesos ativa, sem alterações)"""
+    return df_weights
+
+
+def build_context(df: pd.DataFrame) -> pd.DataFrame:
+    """Monta consolidated_context (metadados)"""
+    return df[context_columns(df.columns)].copy()
+
+
+def build_normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """Monta consolidated_normalized (valores normalizados)"""
+    return df[normalized_columns(df.columns)].copy()
+
+
+# Arquivo final → (checkpoint de origem, colunas lidas, função que monta a tabela)
+EXPORTS = {
+    "consolidated_overall.parquet": (WITH_TRENDS_FILE, overall_columns, build_overall),
+    "consolidated_weights.parquet": (WEIGHTS_FILE, list, build_weights),
+    "consolidated_context.parquet": (WITH_TRENDS_FILE, context_columns, build_context),
+    NORMALIZED_FILE: (WITH_TRENDS_FILE, normalized_columns, build_normalized),
+}
+
+
+def print_write_stats(stats: WriteStats) -> None:
+    print(f"  ✓ {stats.path.name}: {stats.rows} linhas, {stats.columns} colunas ({stats.describe()})")
+
+
+def export_dataset(df_export: pd.DataFrame, output_dir: Path, filename: str) -> None:
+    """Prepara também o dataset particionado em _staging/, se habilitado em export.datasets"""
+    settings = get_dataset_settings()
+    name = Path(filename).stem
+    if not settings.get("enabled") or name not in settings.get("files", []):
+        return
+
+    stats = stage_partitioned(df_export, output_dir, staging_dir(output_dir), name, settings["partition_by"])
+    print(f"  ✓ datasets/{name}/: {stats.describe()} ({stats.seconds:.2f}s, publicação pendente)")
+
+
+def get_long_settings() -> Dict[str, Any]:
+    """Seção export.normalized_long do config.yaml, completada com os valores padrão"""
+    settings = dict(DEFAULT_LONG_SETTINGS)
+    settings.update(load_settings("export", {}).get("normalized_long") or {})
+    return settings
+
+
+def build_normalized_long(df: pd.DataFrame, drop_null: bool = True) -> pd.DataFrame:
+    """
+    Monta consolidated_normalized_long: uma linha por (registro, indicador).
+
+    Colunas: unique_key, v_current, indicator_id (nome do indicador, igual ao
+    INDICADOR de consolidated_weights, gravado com dicionário) e value. As
+    linhas saem ordenadas por indicator_id e unique_key, de modo que cada row
+    group cobre praticamente um único indicador e um filtro por indicador lê
+    só os row groups dele.
+
+    Args:
+        df: tabela larga (consolidated_normalized)
+        drop_null: descartar valores nulos (indicador não aplicável à posição)
+    """
+    norm_cols = sorted(c for c in df.columns if c.endswith("_norm"))
+    id_cols = [c for c in ("unique_key", "v_current") if c in df.columns]
+    df = df.sort_values(id_cols, kind="stable")
+
+    # Transposição em bloco: indicador a indicador, na ordem dos registros
+    n_rows, n_indicators = len(df), len(norm_cols)
+    values = df[norm_cols].to_numpy(dtype="float64").T.ravel()
+    indicators = [c[:-len("_norm")] for c in norm_cols]
+
+    df_long = pd.DataFrame({col: np.tile(df[col].to_numpy(), n_indicators) for col in id_cols})
+    df_long["indicator_id"] = pd.Categorical.from_codes(
+        np.repeat(np.arange(n_indicators, dtype=np.int32), n_rows), categories=indicators
+    )
+    df_long["value"] = values
+
+    if drop_null:
+        df_long = df_long[~np.isnan(values)].reset_index(drop=True)
+    return df_long
+
+
+def export_normalized_long(df_normalized: pd.DataFrame, output_dir: Path) -> bool:
+    """
+    Grava também consolidated_normalized_long em _staging/, se habilitado em
+    export.normalized_long (publicado junto com os demais arquivos).
+
+    Returns:
+        True se o arquivo foi gravado
+    """
+    target = staging_dir(output_dir) / LONG_FILE
+    settings = get_long_settings()
+    if not settings.get("enabled"):
+        # Não deixar uma versão antiga para a publicação
+        if target.exists():
+            target.unlink()
+        return False
+
+    df_long = build_normalized_long(df_normalized, settings.get("drop_null", True))
 
-from . import get_base_dir
+    # Padrão: row group do tamanho de um indicador (sobrescrito em export.files)
+    options = get_write_options(LONG_FILE)
+    if options["row_group_size"] is None:
+        options["row_group_size"] = max(1, len(df_normalized))
+
+    print_write_stats(write_parquet(df_long, target, options, metadata={RUN_ID_KEY: get_run_id()}))
+    return True
 
 
 def run() -> bool:
@@ -36,251 +423,100 @@ def run() -> bool:
         OUTPUT_DIR = BASE_DIR / "bases" / "outputs"
 
         # 1. Carregar Dados
-        print("[1/4] Carregando dados...")
-        df = pd.read_parquet(OUTPUT_DIR / "_temp_scouts_with_trends.parquet")
-        df_weights = pd.read_parquet(OUTPUT_DIR / "_temp_weights_active.parquet")
+        print("[1/3] Carregando dados...")
+        df = pd.read_parquet(OUTPUT_DIR / WITH_TRENDS_FILE)
+        df_weights = pd.read_parquet(OUTPUT_DIR / WEIGHTS_FILE)
 
         print(f"  ✓ Dados: {len(df)} jogadores, {len(df.columns)} colunas")
         print(f"  ✓ Pesos: {len(df_weights)} indicadores")
 
-        # 2. Exportar consolidated_overall.parquet
-        print("\n[2/4] Exportando consolidated_overall.parquet...")
-
-        main_cols = [
-            "unique_key",
-            "player_id",
-            "competition_id",
-            "player_name",
-            "competition_name",
-            "team_name",
-            "primary_position",
-            "mapped_position",
-            "position_group",
-            "position_sub_group",
-            "v_current",
-            "overall_score",
-            "rank_overall",
-            "rank_position",
-            # Informações pessoais
-            "birth_date",
-            "player_weight",
-            "player_height",
-            "country_id",
-            "nationality",
-            # Informações de disponibilidade
-            "player_season_minutes",
-            "player_season_appearances",
-            "player_season_starting_appearances",
-            "player_season_average_minutes",
-            "player_season_most_recent_match",
-            "player_season_90s_played",
-            "player_season_360_minutes",
-            # Colunas de tendência
-            "trend_overall_slope",
-            "trend_overall_direction",
-            "trend_overall_change_pct",
-            "trend_overall_periods_used",
-            "trend_overall_months_span",
-            "trend_rank_overall_change",
-            "trend_rank_overall_direction",
-            "trend_rank_position_change",
-            "trend_rank_position_direction",
-        ]
-
-        # Adicionar colunas de score por categoria (CLASSIFICACAO)
-        score_cols = [c for c in df.columns if c.startswith("score_") and not c.startswith("sub_score_")]
-        main_cols.extend(score_cols)
-
-        # Adicionar colunas de sub_score por subcategoria (SUBCLASSIFICACAO)
-        sub_score_cols = [c for c in df.columns if c.startswith("sub_score_")]
-        main_cols.extend(sub_score_cols)
-
-        # Filtrar colunas disponíveis
-        available_main_cols = [c for c in main_cols if c in df.columns]
-        df_overall = df[available_main_cols].copy()
-
-        # Calcular idade a partir da birth_date
-        if "birth_date" in df_overall.columns:
-            from datetime import datetime
-            current_date = datetime.now()
-            df_overall["player_age"] = df_overall["birth_date"].apply(
-                lambda x: (current_date - pd.to_datetime(x)).days // 365 if pd.notna(x) else None
-            )
-
-        # Calcular coluna de cor baseada nos máximos por competition_id + position_group
-        print("  Calculando coluna de cores...")
-
-        # Mapear nomes das colunas de score para as categorias corretas
-        score_mapping = {}
-        for col in df_overall.columns:
-            if col.startswith("score_"):
-                category = col.replace("score_", "").lower()
-                score_mapping[category] = col
-
-        # Calcular máximos por grupo (competition_id + position_group)
-        grouped = df_overall.groupby(["competition_id", "position_group"])
-
-        # Definir ordem de prioridade para as cores
-        color_priority = [
-            ("overall_score", "#E6E6E6"),
-            (score_mapping.get("offensive", None), "#FECACA"),
-            (score_mapping.get("dgp", None), "#FEF3C7"),
-            (score_mapping.get("pass", None), "#DDD6FE"),
-            (score_mapping.get("defensive", None), "#BFDBFE"),
-        ]
-
-        # Filtrar apenas as colunas que existem
-        color_priority = [(col, color) for col, color in color_priority if col and col in df_overall.columns]
-
-        def get_color(row):
-            """Determina a cor baseada no score máximo do grupo"""
-            # Se position_group é None, retornar branco
-            if pd.isna(row["position_group"]):
-                return "#FFFFFF"
-
-            group_key = (row["competition_id"], row["position_group"])
-
-            # Verificar se o grupo existe
-            try:
-                group_data = grouped.get_group(group_key)
-            except KeyError:
-                return "#FFFFFF"
-
-            # Verificar cada score na ordem de prioridade
-            for score_col, color in color_priority:
-                if pd.notna(row[score_col]):
-                    max_score = group_data[score_col].max()
-                    if row[score_col] == max_score:
-                        return color
-
-            return "#FFFFFF"  # cor padrão se nenhuma condição for atendida
-
-        df_overall["highlight_color"] = df_overall.apply(get_color, axis=1)
-        print(f"  ✓ Coluna highlight_color adicionada")
+        # 2. Montar tabelas finais
+        print("\n[2/3] Montando tabelas finais...")
+        STAGING_DIR = staging_dir(OUTPUT_DIR)
+        frames = {}
+        for filename, (source, _, build) in EXPORTS.items():
+            frames[STAGING_DIR / filename] = build(df_weights if source == WEIGHTS_FILE else df)
+            print(f"  ✓ {filename}: {len(frames[STAGING_DIR / filename])} linhas")
+
+        # 3. Gravar os arquivos em paralelo (compressão em threads do pyarrow)
+        # e publicar o conjunto completo de uma vez
+        print("\n[3/3] Gravando arquivos...")
+        all_stats = write_many(frames, metadata={RUN_ID_KEY: get_run_id()})
+        for stats in all_stats:
+            print_write_stats(stats)
+        published = list(EXPORTS)
+        if export_normalized_long(frames[STAGING_DIR / NORMALIZED_FILE], OUTPUT_DIR):
+            published.append(LONG_FILE)
+        for path, df_export in frames.items():
+            export_dataset(df_export, OUTPUT_DIR, path.name)
+        manifest = publish(OUTPUT_DIR, published)
+        print(f"  ✓ Publicados em bases/outputs/ (run {manifest['run_id']})")
 
-        # Calcular coluna com todas as categorias máximas
-        print("  Calculando categorias máximas...")
-
-        # Mapeamento de colunas para nomes amigáveis
-        category_names = {
-            "overall_score": "Overall",
-            score_mapping.get("offensive", None): "Offensive",
-            score_mapping.get("dgp", None): "DGP",
-            score_mapping.get("pass", None): "Pass",
-            score_mapping.get("defensive", None): "Defensive",
-        }
-
-        # Filtrar apenas as colunas que existem
-        category_names = {col: name for col, name in category_names.items() if col and col in df_overall.columns}
+        print("\n" + "=" * 70)
+        print("EXPORTAÇÃO CONCLUÍDA!")
+        print("=" * 70)
+        print("\nArquivos gerados em bases/outputs/:")
+        for stats in all_stats:
+            print(f"  ✓ {stats.path.name} ({stats.size_mb:.2f} MB)")
 
-        def get_max_categories(row):
-            """Retorna todas as categorias em que o jogador é máximo no grupo"""
-            # Se position_group é None, retornar vazio
-            if pd.isna(row["position_group"]):
-                return ""
+        print("=" * 70)
+        print()
 
-            group_key = (row["competition_id"], row["position_group"])
+        return True
 
-            # Verificar se o grupo existe
-            try:
-                group_data = grouped.get_group(group_key)
-            except KeyError:
-                return ""
+    except Exception as e:
+        print(f"\n✗ ERRO na exportação: {str(e)}")
+        raise
 
-            max_categories = []
 
-            # Verificar todas as categorias
-            for score_col, category_name in category_names.items():
-                if pd.notna(row[score_col]):
-                    max_score = group_data[score_col].max()
-                    if row[score_col] == max_score:
-                        max_categories.append(category_name)
+def _run_stage(filename: str) -> bool:
+    """Estágio de exportação de um único arquivo (usado pelo runner em DAG)"""
+    try:
+        print("=" * 70)
+        print(f"ETAPA 6/6: EXPORTAÇÃO - {filename}")
+        print("=" * 70)
+        print()
 
-            return ", ".join(max_categories) if max_categories else ""
+        OUTPUT_DIR = get_base_dir() / "bases" / "outputs"
+        source, select, build = EXPORTS[filename]
 
-        df_overall["max_categories"] = df_overall.apply(get_max_categories, axis=1)
-        print(f"  ✓ Coluna max_categories adicionada")
-
-        df_overall = df_overall.sort_values("rank_overall")
-
-        df_overall.to_parquet(OUTPUT_DIR / "consolidated_overall.parquet", index=False)
-        size_mb = (OUTPUT_DIR / "consolidated_overall.parquet").stat().st_size / (1024 * 1024)
-        print(f"  ✓ Exportado: {len(df_overall)} linhas, {len(df_overall.columns)} colunas ({size_mb:.2f} MB)")
-
-        # 3. Exportar consolidated_weights.parquet
-        print("\n[3/4] Exportando consolidated_weights.parquet...")
-        df_weights.to_parquet(OUTPUT_DIR / "consolidated_weights.parquet", index=False)
-        size_mb = (OUTPUT_DIR / "consolidated_weights.parquet").stat().st_size / (1024 * 1024)
-        print(f"  ✓ Exportado: {len(df_weights)} indicadores ({size_mb:.2f} MB)")
-
-        # 4. Exportar consolidated_context.parquet
-        print("\n[4/4] Exportando consolidated_context.parquet...")
-
-        context_cols = [
-            "player_id",
-            "competition_id",
-            "unique_key",
-            "source_file",
-            "v_current",
-            "player_season_most_recent_match",
-        ]
-
-        # Adicionar outras colunas de contexto disponíveis
-        extra_context = [c for c in df.columns if any([
-            "player_" in c.lower(),
-            "team_" in c.lower(),
-            "competition_" in c.lower(),
-            "season" in c.lower(),
-        ]) and not c.endswith("_norm") and c not in main_cols]
-
-        context_cols.extend(extra_context)
-        available_context_cols = list(set([c for c in context_cols if c in df.columns]))
-
-        df_context = df[available_context_cols].copy()
-        df_context.to_parquet(OUTPUT_DIR / "consolidated_context.parquet", index=False)
-        size_mb = (OUTPUT_DIR / "consolidated_context.parquet").stat().st_size / (1024 * 1024)
-        print(f"  ✓ Exportado: {len(df_context)} linhas, {len(df_context.columns)} colunas ({size_mb:.2f} MB)")
-
-        # 5. Exportar consolidated_normalized.parquet
-        print("\nExportando consolidated_normalized.parquet...")
-
-        id_cols = ["player_id", "competition_id", "unique_key", "mapped_position", "v_current"]
-        norm_cols = [c for c in df.columns if c.endswith("_norm")]
-
-        normalized_cols = [c for c in id_cols if c in df.columns] + norm_cols
-        df_normalized = df[normalized_cols].copy()
-
-        df_normalized.to_parquet(OUTPUT_DIR / "consolidated_normalized.parquet", index=False)
-        size_mb = (OUTPUT_DIR / "consolidated_normalized.parquet").stat().st_size / (1024 * 1024)
-        print(f"  ✓ Exportado: {len(df_normalized)} linhas, {len(norm_cols)} indicadores normalizados ({size_mb:.2f} MB)")
-
-        # Resumo final
-        final_files = [
-            "consolidated_overall.parquet",
-            "consolidated_weights.parquet",
-            "consolidated_context.parquet",
-            "consolidated_normalized.parquet",
-        ]
+        print("[1/3] Carregando dados...")
+        df = read_columns(OUTPUT_DIR / source, select)
+        print(f"  ✓ Dados: {len(df)} linhas, {len(df.columns)} colunas")
 
-        print("\n" + "=" * 70)
-        print("EXPORTAÇÃO CONCLUÍDA!")
-        print("=" * 70)
-        print("\nArquivos gerados em bases/outputs/:")
-        for filename in final_files:
-            filepath = OUTPUT_DIR / filename
-            if filepath.exists():
-                size_mb = filepath.stat().st_size / (1024 * 1024)
-                print(f"  ✓ {filename} ({size_mb:.2f} MB)")
+        print(f"\n[2/3] Montando {filename}...")
+        df_export = build(df)
 
-        print("=" * 70)
+        print(f"\n[3/3] Gravando {filename} (publicação pendente)...")
+        print_write_stats(write_parquet(df_export, staging_dir(OUTPUT_DIR) / filename,
+                                        metadata={RUN_ID_KEY: get_run_id()}))
+        if filename == NORMALIZED_FILE:
+            export_normalized_long(df_export, OUTPUT_DIR)
+        export_dataset(df_export, OUTPUT_DIR, filename)
         print()
 
         return True
 
     except Exception as e:
-        print(f"\n✗ ERRO na exportação: {str(e)}")
+        print(f"\n✗ ERRO na exportação de {filename}: {str(e)}")
         raise
 
 
+def run_overall() -> bool:
+    return _run_stage("consolidated_overall.parquet")
+
+
+def run_weights() -> bool:
+    return _run_stage("consolidated_weights.parquet")
+
+
+def run_context() -> bool:
+    return _run_stage("consolidated_context.parquet")
+
+
+def run_normalized() -> bool:
+    return _run_stage(NORMALIZED_FILE)
+
+
 if __name__ == "__main__":
     run()
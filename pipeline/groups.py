@@ -0,0 +1,94 @@
+"""
+Índice de grupos para operações agrupadas vetorizadas.
+
+Os rankings (rank_position, rank_overall, rank_global) e as colunas de
+destaque da exportação (highlight_color, max_categories) agrupam por chaves
+de texto como mapped_position ou (competition_id, position_group). GroupIndex
+converte essas chaves uma única vez em códigos inteiros (pd.factorize) e
+reaproveita os códigos em cada ranking e máximo por grupo, sem novos
+groupby sobre objetos.
+
+Mesma semântica do groupby do pandas: linhas com alguma chave nula ficam
+fora de qualquer grupo (código -1) e recebem rank/máximo nulos.
+"""
+
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+
+class GroupIndex:
+    """Códigos inteiros (0..n_groups-1, -1 = sem grupo) das chaves de agrupamento"""
+
+    def __init__(self, df: pd.DataFrame, keys: Union[str, Iterable[str]]):
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        codes = np.zeros(len(df), dtype=np.int64)
+        missing = np.zeros(len(df), dtype=bool)
+        for key in keys:
+            key_codes, uniques = pd.factorize(df[key], sort=False)
+            missing |= key_codes < 0
+            codes = codes * max(len(uniques), 1) + key_codes
+
+        codes[missing] = -1
+        valid = ~missing
+        compact = np.full(len(df), -1, dtype=np.int64)
+        compact[valid], uniques = pd.factorize(codes[valid], sort=False)
+
+        self.keys = keys
+        self.codes = compact
+        self.valid = valid
+        self.n_groups = len(uniques)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def max(self, values) -> np.ndarray:
+        """Máximo de values no grupo de cada linha (nulos ignorados; NaN se não houver)"""
+        values = np.asarray(values, dtype=np.float64)
+        group_max = np.full(self.n_groups, np.nan)
+        np.fmax.at(group_max, self.codes[self.valid], values[self.valid])
+
+        result = np.full(len(values), np.nan)
+        result[self.valid] = group_max[self.codes[self.valid]]
+        return result
+
+    def is_max(self, values) -> np.ndarray:
+        """True onde o valor (não nulo) é igual ao máximo do grupo"""
+        values = np.asarray(values, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            return self.valid & ~np.isnan(values) & (values == self.max(values))
+
+    def rank(self, values, ascending: bool = True) -> np.ndarray:
+        """
+        Ranking dentro de cada grupo, equivalente a
+        df.groupby(keys)[col].rank(ascending=..., method="min").
+
+        Returns:
+            np.ndarray float64, NaN para valores nulos e linhas sem grupo
+        """
+        values = np.asarray(values, dtype=np.float64)
+        rows = np.flatnonzero(self.valid & ~np.isnan(values))
+        ranks = np.full(len(values), np.nan)
+        if len(rows) == 0:
+            return ranks
+
+        # Ordena por valor e depois, de forma estável, pelo código do grupo
+        # (códigos pequenos: radix sort do numpy)
+        sort_values = values[rows] if ascending else -values[rows]
+        order = rows[np.argsort(sort_values, kind="stable")]
+        code_dtype = np.int16 if self.n_groups <= np.iinfo(np.int16).max else np.int64
+        order = order[np.argsort(self.codes[order].astype(code_dtype), kind="stable")]
+        sorted_codes = self.codes[order]
+        sorted_values = values[order]
+
+        positions = np.arange(len(order))
+        group_start = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+        tie_start = group_start | np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+
+        # Posição do início do grupo e do início do bloco de empate de cada linha
+        first_in_group = np.maximum.accumulate(np.where(group_start, positions, 0))
+        first_in_tie = np.maximum.accumulate(np.where(tie_start, positions, 0))
+
+        ranks[order] = first_in_tie - first_in_group + 1
+        return ranks
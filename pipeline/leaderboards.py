@@ -0,0 +1,239 @@
+"""
+Leaderboards por Competição e Posição
+
+Este módulo realiza:
+1. Top-N de cada (competition_id, mapped_position) para o overall_score e
+   para cada score de categoria (score_*), já ordenado
+   → consolidated_leaderboards.parquet
+2. Cortes de percentil (ex: p50, p75, p90) dos mesmos scores em cada
+   (competition_id, mapped_position) → consolidated_percentile_cutoffs.parquet
+
+São tabelas pequenas, ordenadas por competição, posição e score, de modo que
+consultas como "top 10 zagueiros de cada liga" (Power BI, scripts) não
+precisam varrer consolidated_overall. read_leaderboard() lê só os row groups
+do filtro pedido.
+
+Os grupos são fatorados uma única vez (GroupIndex) e reaproveitados em todos
+os scores. Empates na N-ésima posição entram todos no top-N (mesmo critério
+de rank_position: method="min").
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import get_base_dir, get_run_id, load_settings
+from .groups import GroupIndex
+from .steps import CUTOFFS_FILE, LEADERBOARDS_FILE
+
+
+SOURCE_FILE = "_temp_scouts_scored.parquet"
+GROUP_KEYS = ["competition_id", "mapped_position"]
+
+DEFAULT_LEADERBOARD_SETTINGS = {
+    "enabled": True,
+    "top_n": 10,
+    "percentiles": [50, 75, 90, 95, 99],
+    "current_only": True,
+    "include_sub_scores": False,
+}
+
+# Colunas de identificação de cada linha do top-N
+PLAYER_COLUMNS = ["unique_key", "player_id", "player_name", "team_name", "competition_name"]
+
+
+def get_leaderboard_settings() -> Dict:
+    """Seção leaderboards do config.yaml, validada"""
+    settings = load_settings("leaderboards", DEFAULT_LEADERBOARD_SETTINGS)
+    if int(settings["top_n"]) < 1:
+        raise ValueError("leaderboards.top_n deve ser maior que zero")
+    percentiles = [float(p) for p in settings["percentiles"] or []]
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise ValueError("leaderboards.percentiles devem estar entre 0 e 100")
+    settings["percentiles"] = sorted(set(percentiles))
+    return settings
+
+
+def score_columns(columns, include_sub_scores: bool = False) -> List[str]:
+    """overall_score + scores por categoria (score_*) e, opcionalmente, sub_score_*"""
+    scores = ["overall_score"] + [c for c in columns if c.startswith("score_")]
+    if include_sub_scores:
+        scores += [c for c in columns if c.startswith("sub_score_")]
+    return [c for c in scores if c in columns]
+
+
+def percentile_label(p: float) -> str:
+    """Nome da coluna do corte: 90 → p90, 97.5 → p97_5"""
+    return "p" + f"{p:g}".replace(".", "_")
+
+
+def _sorted_by_group(df: pd.DataFrame) -> pd.DataFrame:
+    """Ordena por competição, posição e score (categorias na ordem em que aparecem)"""
+    return df.sort_values(GROUP_KEYS + ["score_column"], kind="stable").reset_index(drop=True)
+
+
+def build_leaderboards(df: pd.DataFrame, scores: List[str], top_n: int,
+                       groups: Optional[GroupIndex] = None) -> pd.DataFrame:
+    """
+    Top-N de cada (competition_id, mapped_position) para cada coluna de score.
+
+    Returns:
+        DataFrame com competition_id, mapped_position, score_column, rank,
+        score e as colunas de identificação do jogador, ordenado por
+        competição, posição, score_column e rank
+    """
+    groups = groups or GroupIndex(df, GROUP_KEYS)
+    player_cols = [c for c in PLAYER_COLUMNS if c in df.columns]
+
+    frames = []
+    for score_col in scores:
+        values = df[score_col].to_numpy(dtype=float)
+        ranks = groups.rank(values, ascending=False)
+        with np.errstate(invalid="ignore"):
+            rows = np.flatnonzero(ranks <= top_n)
+        # Ordem final dentro do score: grupo, rank, unique_key
+        rows = rows[np.lexsort((df["unique_key"].to_numpy()[rows], ranks[rows], groups.codes[rows]))]
+
+        frame = df.iloc[rows][GROUP_KEYS].reset_index(drop=True)
+        frame["score_column"] = score_col
+        frame["rank"] = ranks[rows].astype(np.int32)
+        frame["score"] = values[rows]
+        for col in player_cols:
+            frame[col] = df[col].to_numpy()[rows]
+        frames.append(frame)
+
+    df_top = pd.concat(frames, ignore_index=True)
+    df_top["score_column"] = pd.Categorical(df_top["score_column"], categories=scores)
+    return _sorted_by_group(df_top)
+
+
+def build_percentile_cutoffs(df: pd.DataFrame, scores: List[str], percentiles: List[float],
+                             groups: Optional[GroupIndex] = None) -> pd.DataFrame:
+    """
+    Cortes de percentil de cada score em cada (competition_id, mapped_position).
+
+    Returns:
+        DataFrame com competition_id, mapped_position, score_column,
+        n_players (scores não nulos), mean, max e uma coluna por percentil
+        (p50, p90, ...; interpolação linear, igual a Series.quantile)
+    """
+    groups = groups or GroupIndex(df, GROUP_KEYS)
+    valid = groups.valid
+    codes = groups.codes[valid]
+
+    # Uma linha por grupo: chaves da primeira ocorrência de cada código
+    first_rows = np.flatnonzero(valid)[np.unique(codes, return_index=True)[1]]
+    keys = df.iloc[first_rows][GROUP_KEYS].reset_index(drop=True)
+
+    frames = []
+    quantiles = [p / 100 for p in percentiles]
+    for score_col in scores:
+        grouped = df[score_col].astype(float)[valid].groupby(codes, sort=True)
+        frame = keys.copy()
+        frame["score_column"] = score_col
+        frame["n_players"] = grouped.count().to_numpy().astype(np.int32)
+        frame["mean"] = grouped.mean().to_numpy()
+        frame["max"] = grouped.max().to_numpy()
+        if quantiles:
+            cutoffs = grouped.quantile(quantiles).unstack()
+            for p, q in zip(percentiles, quantiles):
+                frame[percentile_label(p)] = cutoffs[q].to_numpy()
+        frames.append(frame)
+
+    df_cutoffs = pd.concat(frames, ignore_index=True)
+    df_cutoffs["score_column"] = pd.Categorical(df_cutoffs["score_column"], categories=scores)
+    return _sorted_by_group(df_cutoffs)
+
+
+def read_leaderboard(output_dir: Optional[Path] = None, competition_id=None, position: Optional[str] = None,
+                     score: str = "overall_score", top: Optional[int] = None) -> pd.DataFrame:
+    """
+    Lê consolidated_leaderboards com filtro (só os row groups necessários).
+
+    Args:
+        output_dir: pasta de saída (padrão: bases/outputs do projeto)
+        competition_id: competição (None = todas)
+        position: mapped_position (None = todas)
+        score: coluna de score (overall_score, score_OFFENSIVE, ...)
+        top: limitar a rank <= top (padrão: o top_n gravado)
+    """
+    output_dir = Path(output_dir) if output_dir else get_base_dir() / "bases" / "outputs"
+    filters = [("score_column", "==", score)]
+    if competition_id is not None:
+        filters.append(("competition_id", "==", competition_id))
+    if position is not None:
+        filters.append(("mapped_position", "==", position))
+    if top is not None:
+        filters.append(("rank", "<=", top))
+
+    df = pq.read_table(output_dir / LEADERBOARDS_FILE, filters=filters).to_pandas()
+    return _sorted_by_group(df)
+
+
+def run() -> bool:
+    """
+    Executa a geração dos leaderboards.
+
+    Returns:
+        bool: True se sucesso, False se erro
+    """
+    try:
+        from .parquet_io import write_many
+        from .publish import RUN_ID_KEY, staging_dir
+
+        print("=" * 70)
+        print("LEADERBOARDS POR COMPETIÇÃO E POSIÇÃO")
+        print("=" * 70)
+        print()
+
+        OUTPUT_DIR = get_base_dir() / "bases" / "outputs"
+        STAGING_DIR = staging_dir(OUTPUT_DIR)
+        settings = get_leaderboard_settings()
+
+        if not settings["enabled"]:
+            # Não deixar versões antigas para a publicação
+            for filename in (LEADERBOARDS_FILE, CUTOFFS_FILE):
+                if (STAGING_DIR / filename).exists():
+                    (STAGING_DIR / filename).unlink()
+            print("  ⚠ leaderboards.enabled = false: leaderboards não serão gerados")
+            print()
+            return True
+
+        # 1. Carregar só identificação e scores
+        print("[1/3] Carregando scores...")
+        names = pq.read_schema(OUTPUT_DIR / SOURCE_FILE).names
+        scores = score_columns(names, settings["include_sub_scores"])
+        columns = list(dict.fromkeys(PLAYER_COLUMNS + GROUP_KEYS + ["v_current"] + scores))
+        df = pd.read_parquet(OUTPUT_DIR / SOURCE_FILE, columns=[c for c in columns if c in names])
+        if settings["current_only"] and "v_current" in df.columns:
+            df = df[df["v_current"] == True].reset_index(drop=True)  # noqa: E712
+        print(f"  ✓ Registros: {len(df)}{' (v_current)' if settings['current_only'] else ''}")
+        print(f"  ✓ Scores: {len(scores)}")
+
+        # 2. Montar as tabelas (grupos fatorados uma vez para todos os scores)
+        top_n = int(settings["top_n"])
+        print(f"\n[2/3] Calculando top-{top_n} e cortes de percentil...")
+        groups = GroupIndex(df, GROUP_KEYS)
+        df_top = build_leaderboards(df, scores, top_n, groups)
+        df_cutoffs = build_percentile_cutoffs(df, scores, settings["percentiles"], groups)
+        print(f"  ✓ {groups.n_groups} grupos (competição x posição)")
+
+        # 3. Gravar em _staging/ (publicados junto com os demais arquivos)
+        print("\n[3/3] Gravando arquivos (publicação pendente)...")
+        frames = {STAGING_DIR / LEADERBOARDS_FILE: df_top, STAGING_DIR / CUTOFFS_FILE: df_cutoffs}
+        for stats in write_many(frames, metadata={RUN_ID_KEY: get_run_id()}):
+            print(f"  ✓ {stats.path.name}: {stats.rows} linhas, {stats.columns} colunas ({stats.describe()})")
+        print()
+
+        return True
+
+    except Exception as e:
+        print(f"\n✗ ERRO nos leaderboards: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    run()
@@ -8,20 +8,319 @@ Este módulo realiza:
 4. Validação da estrutura dos dados
 5. Salvamento de arquivos temporários para próximas etapas
 
+No runner em DAG o carregamento é dividido em dois estágios independentes,
+que rodam em paralelo: run_scouts() (scouts + nacionalidades) e
+run_weights() (tabela de pesos). run() continua executando os dois juntos.
+
 Converte:01_load_data.ipynb → load_data.py
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 from . import get_base_dir
+from .streaming import get_streaming_settings, row_group_rows
+
+
+# Esquemas declarativos (coluna → tipo Arrow) aplicados ao gravar os parquets
+# intermediários: um cast por coluna, NaN vira nulo
+SCOUTS_SCHEMA = {
+    'season_name': pa.string(),
+    'competition_name': pa.string(),
+    'team_name': pa.string(),
+    'player_name': pa.string(),
+    'player_first_name': pa.string(),
+    'player_last_name': pa.string(),
+    'player_known_name': pa.string(),
+    'primary_position': pa.string(),
+    'source_file': pa.string(),
+    'nationality': pa.string(),
+}
+
+WEIGHTS_SCHEMA = {
+    'INDICADOR': pa.string(),
+    'CLASSIFICACAO RANKING': pa.string(),
+    'SUBCLASSIFICACAO RANKING': pa.string(),
+    'CONSIDERAR?': pa.string(),
+    'ESPECIAL?': pa.string(),
+    'Melhor para': pa.string(),
+    'tipo_agreg': pa.string(),
+    'Explicação indicador': pa.string(),
+}
+
+# Cópia em parquet de nacionalidades.xlsx (bases/outputs), válida enquanto o .xlsx não mudar
+NATIONALITY_CACHE_FILE = "_nationalities.parquet"
+NATIONALITY_SIGNATURE_KEY = b"source_signature"
+
+# Planilhas já lidas neste processo (main.py --watch): caminho → (tamanho+mtime, DataFrame)
+_warm_cache: Optional[Dict[Path, Tuple[str, pd.DataFrame]]] = None
+
+
+def _typed_array(values: pd.Series, type_: pa.DataType) -> pa.Array:
+    """
+    Coluna no tipo do esquema. Texto puro vai direto para Arrow; valores de
+    outro tipo (ex: números em team_name) passam por str(), como no Excel.
+    """
+    try:
+        return pa.array(values, type=type_, from_pandas=True)
+    except pa.ArrowException:
+        if not pa.types.is_string(type_):
+            raise
+    mask = values.notna()
+    values = values.astype(object)
+    values[mask] = values[mask].astype(str)
+    return pa.array(values, type=type_, from_pandas=True)
+
+
+def to_arrow_table(df: pd.DataFrame, schema: dict) -> pa.Table:
+    """DataFrame → Arrow com as colunas do esquema tipadas (as demais inferidas)"""
+    typed = [c for c in df.columns if c in schema]
+    table = pa.Table.from_pandas(df.drop(columns=typed), preserve_index=False)
+    for col in typed:
+        table = table.add_column(df.columns.get_loc(col), col, _typed_array(df[col], schema[col]))
+    return table
+
+
+def file_signature(path: Path) -> str:
+    """Tamanho + mtime do arquivo (mesmo critério do cache de hashes dos checkpoints)"""
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def enable_warm_cache() -> None:
+    """
+    Mantém em memória as planilhas de entrada lidas (scouts e pesos) entre
+    execuções no mesmo processo: só as que mudaram (tamanho/mtime) são relidas.
+    """
+    global _warm_cache
+    if _warm_cache is None:
+        _warm_cache = {}
+
+
+def read_input_table(path: Path) -> pd.DataFrame:
+    """Lê uma planilha (.xlsx) ou parquet de entrada, pelo cache quando ativo"""
+    if _warm_cache is None:
+        return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_excel(path)
+
+    signature = file_signature(path)
+    cached = _warm_cache.get(path)
+    if cached is None or cached[0] != signature:
+        df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_excel(path)
+        cached = _warm_cache[path] = (signature, df)
+    return cached[1].copy()
+
+
+def load_configs(config_dir: Path) -> Tuple[dict, dict]:
+    """Carrega config.yaml e positions.yaml"""
+    with open(config_dir / "config.yaml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    with open(config_dir / "positions.yaml", "r", encoding="utf-8") as f:
+        positions_config = yaml.safe_load(f)
+
+    return config, positions_config
+
+
+def load_scouts(scouts_dir: Path) -> Tuple[pd.DataFrame, int]:
+    """
+    Carrega e concatena todos os arquivos de scouts.
+
+    Returns:
+        tuple (df_scouts, quantidade de arquivos)
+    """
+    # Excel (formato padrão) ou parquet (ex: bases sintéticas de benchmark)
+    scout_files = list(scouts_dir.glob("*.xlsx")) + list(scouts_dir.glob("*.parquet"))
+    if not scout_files:
+        raise FileNotFoundError(
+            f"Nenhum arquivo .xlsx encontrado em: {scouts_dir}\n"
+            "Por favor, adicione arquivos de scouts na pasta inputs/scouts_base/"
+        )
+
+    print(f"  ✓ Arquivos encontrados: {len(scout_files)}")
+
+    dfs_scouts = []
+    for file_path in scout_files:
+        print(f"    - {file_path.name}...", end=" ")
+        df = read_input_table(file_path)
+        df["source_file"] = file_path.name
+        dfs_scouts.append(df)
+        print(f"{len(df)} jogadores")
+
+    df_scouts = pd.concat(dfs_scouts, ignore_index=True)
+    print(f"  ✓ Total: {len(df_scouts)} jogadores carregados")
+
+    return df_scouts, len(scout_files)
+
+
+def load_nationality_table(nationality_file: Path, cache_file: Path) -> pd.DataFrame:
+    """
+    Lê a tabela de nacionalidades.
+
+    nacionalidades.xlsx continua sendo o arquivo editado pelo usuário; a
+    tabela fica também em parquet (cache_file), lido no lugar do Excel
+    enquanto o .xlsx não mudar (tamanho e mtime gravados no parquet).
+    """
+    signature = file_signature(nationality_file)
+    if cache_file.exists():
+        table = pq.read_table(cache_file)
+        if (table.schema.metadata or {}).get(NATIONALITY_SIGNATURE_KEY) == signature.encode():
+            return table.to_pandas()
+
+    df_nationality = pd.read_excel(nationality_file)
+    save_nationality_cache(df_nationality, nationality_file, cache_file)
+    return df_nationality
+
+
+def save_nationality_cache(df_nationality: pd.DataFrame, nationality_file: Path, cache_file: Path) -> None:
+    """Grava a tabela em parquet com a assinatura do .xlsx de origem"""
+    table = to_arrow_table(df_nationality, {c: pa.string() for c in df_nationality.columns
+                                            if df_nationality[c].dtype == object})
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        NATIONALITY_SIGNATURE_KEY: file_signature(nationality_file),
+    })
+    tmp_file = cache_file.with_name(f".{cache_file.name}.tmp")
+    pq.write_table(table, tmp_file)
+    tmp_file.replace(cache_file)
+
+
+def new_country_rows(df_scouts: pd.DataFrame, existing_ids) -> pd.DataFrame:
+    """
+    Linhas "PENDENTE" para os country_ids dos scouts que não estão na tabela,
+    com um jogador de exemplo (primeira ocorrência) de cada um, em uma
+    única passada (drop_duplicates).
+    """
+    examples = df_scouts.dropna(subset=['country_id']).drop_duplicates('country_id')
+    examples = examples[~examples['country_id'].isin(existing_ids)]
+
+    df_new = pd.DataFrame({
+        'country_id': examples['country_id'].astype(int).to_numpy(),
+        'nationality': 'PENDENTE',
+    })
+    for column, source in (('player_example', 'player_name'), ('team_example', 'team_name')):
+        df_new[column] = examples[source].to_numpy() if source in examples.columns else ''
+    return df_new
+
+
+def add_nationalities(df_scouts: pd.DataFrame, nationality_file: Path, output_dir: Path) -> pd.DataFrame:
+    """
+    Adiciona a coluna nationality a partir de nacionalidades.xlsx.
+
+    country_ids novos são adicionados ao arquivo como "PENDENTE" e a
+    quantidade de pendências é gravada em _pending_nationalities.txt.
+    """
+    if not nationality_file.exists():
+        print(f"  ⚠ Arquivo de nacionalidades não encontrado: {nationality_file}")
+        df_scouts['nationality'] = None
+        return df_scouts
+
+    cache_file = output_dir / NATIONALITY_CACHE_FILE
+    df_nationality = load_nationality_table(nationality_file, cache_file)
+
+    # Detectar country_ids novos que não estão no arquivo
+    df_new = new_country_rows(df_scouts, df_nationality['country_id'].unique())
+
+    # Se há novos country_ids, adicionar ao arquivo com "PENDENTE"
+    if len(df_new):
+        print(f"  ⚠ Novos country_ids detectados: {sorted(df_new['country_id'].tolist())}")
+
+        # Adicionar novas linhas ao DataFrame
+        df_nationality = pd.concat([df_nationality, df_new], ignore_index=True)
+        df_nationality = df_nationality.sort_values('country_id')
+
+        # Salvar arquivo atualizado (o .xlsx para edição e o cache)
+        df_nationality.to_excel(nationality_file, index=False)
+        save_nationality_cache(df_nationality, nationality_file, cache_file)
+        print(f"  ✓ Arquivo nacionalidades.xlsx atualizado com {len(df_new)} novos códigos")
+
+    # Fazer merge com scouts para adicionar coluna nationality
+    df_scouts = df_scouts.merge(
+        df_nationality[['country_id', 'nationality']],
+        on='country_id',
+        how='left'
+    )
+
+    # Contar pendências (nationality = "PENDENTE" ou vazio)
+    pending_mask = (df_scouts['nationality'] == 'PENDENTE') | (df_scouts['nationality'].isna())
+    pending_count = pending_mask.sum()
+    pending_ids = df_scouts[pending_mask]['country_id'].unique()
+
+    if pending_count > 0:
+        print(f"  ⚠ {pending_count} jogadores com nacionalidade PENDENTE (country_ids: {sorted(pending_ids)})")
+        # Salvar arquivo de controle para aviso no final
+        with open(output_dir / "_pending_nationalities.txt", "w") as f:
+            f.write(f"{len(pending_ids)}")
+    else:
+        # Remover arquivo de controle se não há pendências
+        pending_file = output_dir / "_pending_nationalities.txt"
+        if pending_file.exists():
+            pending_file.unlink()
+
+    mapped_count = (~pending_mask).sum()
+    print(f"  ✓ Nacionalidades mapeadas: {mapped_count} de {len(df_scouts)} jogadores")
+
+    return df_scouts
+
+
+def load_weights(weights_file: Path) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Carrega a tabela de pesos.
+
+    Returns:
+        tuple (df_weights completo, df_weights_active com CONSIDERAR? = SIM)
+    """
+    if not weights_file.exists():
+        raise FileNotFoundError(
+            f"Arquivo de pesos não encontrado: {weights_file}\n"
+            "Certifique-se de que o arquivo base_peso.xlsx está em inputs/business/"
+        )
+
+    df_weights = read_input_table(weights_file)
+    df_weights_active = df_weights[df_weights["CONSIDERAR?"] == "SIM"].copy()
+
+    print(f"  ✓ Tabela de pesos carregada: {df_weights.shape}")
+    print(f"  ✓ Indicadores ativos: {len(df_weights_active)}")
+    print(f"  ✓ Indicadores ignorados: {len(df_weights) - len(df_weights_active)}")
+
+    return df_weights, df_weights_active
+
+
+def validate(df_scouts: pd.DataFrame, df_weights_active: pd.DataFrame) -> None:
+    """Compara os indicadores da tabela de pesos com as colunas dos scouts"""
+    indicadores_pesos = set(df_weights_active["INDICADOR"].str.strip())
+    colunas_scouts = set(df_scouts.columns)
+    indicadores_match = indicadores_pesos.intersection(colunas_scouts)
+    indicadores_missing = indicadores_pesos - colunas_scouts
+
+    print(f"  ✓ Indicadores na tabela de pesos: {len(indicadores_pesos)}")
+    print(f"  ✓ Indicadores encontrados nos scouts: {len(indicadores_match)}")
+
+    if indicadores_missing:
+        print(f"  ⚠ Indicadores faltantes: {len(indicadores_missing)}")
+        # Não é erro crítico, apenas aviso
+
+
+def save_scouts(df_scouts: pd.DataFrame, output_dir: Path) -> None:
+    table = to_arrow_table(df_scouts, SCOUTS_SCHEMA)
+    # Em streaming, row groups do tamanho de um lote (as etapas seguintes leem por row group)
+    settings = get_streaming_settings()
+    row_group_size = row_group_rows(df_scouts, settings) if settings["enabled"] else None
+    pq.write_table(table, output_dir / "_temp_scouts_raw.parquet", row_group_size=row_group_size)
+    print(f"  ✓ Scouts salvos: _temp_scouts_raw.parquet")
+
+
+def save_weights(df_weights_active: pd.DataFrame, output_dir: Path) -> None:
+    pq.write_table(to_arrow_table(df_weights_active, WEIGHTS_SCHEMA), output_dir / "_temp_weights_active.parquet")
+    print(f"  ✓ Pesos salvos: _temp_weights_active.parquet")
 
 
 def run() -> bool:
     """
-    Executa o carregamento de dados.
+    Executa o carregamento de dados (scouts + pesos).
 
     Returns:
         bool: True se sucesso, False se erro
@@ -42,187 +341,119 @@ def run() -> bool:
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
         # 1. Carregar Configurações
-        print("[1/5] Carregando configurações...")
-        with open(CONFIG_DIR / "config.yaml", "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-
-        with open(CONFIG_DIR / "positions.yaml", "r", encoding="utf-8") as f:
-            positions_config = yaml.safe_load(f)
-
+        print("[1/6] Carregando configurações...")
+        config, positions_config = load_configs(CONFIG_DIR)
         print(f"  ✓ Configurações carregadas: {config['app']['name']} v{config['app']['version']}")
 
         # 2. Carregar Arquivos de Scouts
-        print("\n[2/5] Carregando arquivos de scouts...")
-        SCOUTS_DIR = INPUTS_DIR / "scouts_base"
-
-        scout_files = list(SCOUTS_DIR.glob("*.xlsx"))
-        if not scout_files:
-            raise FileNotFoundError(
-                f"Nenhum arquivo .xlsx encontrado em: {SCOUTS_DIR}\n"
-                "Por favor, adicione arquivos de scouts na pasta inputs/scouts_base/"
-            )
-
-        print(f"  ✓ Arquivos encontrados: {len(scout_files)}")
-
-        dfs_scouts = []
-        for file_path in scout_files:
-            print(f"    - {file_path.name}...", end=" ")
-            df = pd.read_excel(file_path)
-            df["source_file"] = file_path.name
-            dfs_scouts.append(df)
-            print(f"{len(df)} jogadores")
-
-        df_scouts = pd.concat(dfs_scouts, ignore_index=True)
-        print(f"  ✓ Total: {len(df_scouts)} jogadores carregados")
+        print("\n[2/6] Carregando arquivos de scouts...")
+        df_scouts, n_files = load_scouts(INPUTS_DIR / "scouts_base")
 
         # 3. Carregar Mapeamento de Nacionalidades
         print("\n[3/6] Carregando mapeamento de nacionalidades...")
-        NATIONALITY_FILE = INPUTS_DIR / "business" / "nacionalidades.xlsx"
-
-        if NATIONALITY_FILE.exists():
-            df_nationality = pd.read_excel(NATIONALITY_FILE)
-
-            # Detectar country_ids novos que não estão no arquivo
-            existing_ids = set(df_nationality['country_id'].unique())
-            all_ids = set(df_scouts['country_id'].dropna().unique())
-            new_ids = all_ids - existing_ids
-
-            # Se há novos country_ids, adicionar ao arquivo com "PENDENTE"
-            if new_ids:
-                print(f"  ⚠ Novos country_ids detectados: {sorted(new_ids)}")
-                new_rows = []
-                for cid in new_ids:
-                    # Pegar um jogador de exemplo para esse country_id
-                    sample = df_scouts[df_scouts['country_id'] == cid].iloc[0]
-                    new_rows.append({
-                        'country_id': int(cid),
-                        'nationality': 'PENDENTE',
-                        'player_example': sample.get('player_name', ''),
-                        'team_example': sample.get('team_name', '')
-                    })
-
-                # Adicionar novas linhas ao DataFrame
-                df_new = pd.DataFrame(new_rows)
-                df_nationality = pd.concat([df_nationality, df_new], ignore_index=True)
-                df_nationality = df_nationality.sort_values('country_id')
-
-                # Salvar arquivo atualizado
-                df_nationality.to_excel(NATIONALITY_FILE, index=False)
-                print(f"  ✓ Arquivo nacionalidades.xlsx atualizado com {len(new_ids)} novos códigos")
-
-            # Fazer merge com scouts para adicionar coluna nationality
-            df_scouts = df_scouts.merge(
-                df_nationality[['country_id', 'nationality']],
-                on='country_id',
-                how='left'
-            )
-
-            # Contar pendências (nationality = "PENDENTE" ou vazio)
-            pending_mask = (df_scouts['nationality'] == 'PENDENTE') | (df_scouts['nationality'].isna())
-            pending_count = pending_mask.sum()
-            pending_ids = df_scouts[pending_mask]['country_id'].unique()
-
-            if pending_count > 0:
-                print(f"  ⚠ {pending_count} jogadores com nacionalidade PENDENTE (country_ids: {sorted(pending_ids)})")
-                # Salvar arquivo de controle para aviso no final
-                with open(OUTPUT_DIR / "_pending_nationalities.txt", "w") as f:
-                    f.write(f"{len(pending_ids)}")
-            else:
-                # Remover arquivo de controle se não há pendências
-                pending_file = OUTPUT_DIR / "_pending_nationalities.txt"
-                if pending_file.exists():
-                    pending_file.unlink()
-
-            mapped_count = (~pending_mask).sum()
-            print(f"  ✓ Nacionalidades mapeadas: {mapped_count} de {len(df_scouts)} jogadores")
-        else:
-            print(f"  ⚠ Arquivo de nacionalidades não encontrado: {NATIONALITY_FILE}")
-            df_scouts['nationality'] = None
+        df_scouts = add_nationalities(df_scouts, INPUTS_DIR / "business" / "nacionalidades.xlsx", OUTPUT_DIR)
 
         # 4. Carregar Tabela de Pesos
         print("\n[4/6] Carregando tabela de pesos...")
-        WEIGHTS_FILE = INPUTS_DIR / "business" / "base_peso.xlsx"
+        df_weights, df_weights_active = load_weights(INPUTS_DIR / "business" / "base_peso.xlsx")
 
-        if not WEIGHTS_FILE.exists():
-            raise FileNotFoundError(
-                f"Arquivo de pesos não encontrado: {WEIGHTS_FILE}\n"
-                "Certifique-se de que o arquivo base_peso.xlsx está em inputs/business/"
-            )
+        # 5. Validação dos Dados
+        print("\n[5/6] Validando dados...")
+        validate(df_scouts, df_weights_active)
 
-        df_weights = pd.read_excel(WEIGHTS_FILE)
-        df_weights_active = df_weights[df_weights["CONSIDERAR?"] == "SIM"].copy()
+        # 6. Salvar Dados Carregados
+        print("\n[6/6] Salvando dados intermediários...")
+        save_scouts(df_scouts, OUTPUT_DIR)
+        save_weights(df_weights_active, OUTPUT_DIR)
 
-        print(f"  ✓ Tabela de pesos carregada: {df_weights.shape}")
-        print(f"  ✓ Indicadores ativos: {len(df_weights_active)}")
-        print(f"  ✓ Indicadores ignorados: {len(df_weights) - len(df_weights_active)}")
+        # Resumo final
+        print("\n" + "=" * 70)
+        print("RESUMO")
+        print("=" * 70)
+        print(f"Total de jogadores: {len(df_scouts)}")
+        print(f"Total de colunas: {len(df_scouts.columns)}")
+        print(f"Arquivos processados: {n_files}")
+        print(f"Indicadores ativos: {len(df_weights_active)}")
+        print("=" * 70)
+        print()
 
-        # 4. Validação dos Dados
-        print("\n[5/6] Validando dados...")
+        return True
 
-        # Verificar indicadores
-        indicadores_pesos = set(df_weights_active["INDICADOR"].str.strip())
-        colunas_scouts = set(df_scouts.columns)
-        indicadores_match = indicadores_pesos.intersection(colunas_scouts)
-        indicadores_missing = indicadores_pesos - colunas_scouts
+    except Exception as e:
+        print(f"\n✗ ERRO no carregamento de dados: {str(e)}")
+        raise
 
-        print(f"  ✓ Indicadores na tabela de pesos: {len(indicadores_pesos)}")
-        print(f"  ✓ Indicadores encontrados nos scouts: {len(indicadores_match)}")
 
-        if indicadores_missing:
-            print(f"  ⚠ Indicadores faltantes: {len(indicadores_missing)}")
-            # Não é erro crítico, apenas aviso
+def run_scouts() -> bool:
+    """
+    Estágio independente: scouts + nacionalidades → _temp_scouts_raw.parquet
 
-        # 5. Salvar Dados Carregados
-        print("\n[6/6] Salvando dados intermediários...")
+    A comparação de indicadores com a tabela de pesos fica para a
+    normalização, que já lista os indicadores faltantes.
 
-        # Converter colunas string (mantém NaN como NaN)
-        string_cols = [
-            'season_name', 'competition_name', 'team_name', 'player_name',
-            'player_first_name', 'player_last_name', 'player_known_name',
-            'primary_position', 'source_file', 'nationality'
-        ]
+    Returns:
+        bool: True se sucesso, False se erro
+    """
+    try:
+        print("=" * 70)
+        print("ETAPA 1/6: CARREGAMENTO DE SCOUTS")
+        print("=" * 70)
+        print()
 
-        for col in string_cols:
-            if col in df_scouts.columns:
-                mask = df_scouts[col].notna()
-                df_scouts.loc[mask, col] = df_scouts.loc[mask, col].astype(str)
+        BASE_DIR = get_base_dir()
+        INPUTS_DIR = BASE_DIR / "bases" / "inputs"
+        OUTPUT_DIR = BASE_DIR / "bases" / "outputs"
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-        # Salvar scouts
-        df_scouts.to_parquet(OUTPUT_DIR / "_temp_scouts_raw.parquet", index=False)
+        print("[1/4] Carregando configurações...")
+        config, _ = load_configs(BASE_DIR / "config")
+        print(f"  ✓ Configurações carregadas: {config['app']['name']} v{config['app']['version']}")
 
-        # Converter colunas string da tabela de pesos
-        weights_string_cols = [
-            'INDICADOR', 'CLASSIFICACAO RANKING', 'SUBCLASSIFICACAO RANKING',
-            'CONSIDERAR?', 'ESPECIAL?', 'Melhor para', 'tipo_agreg',
-            'Explicação indicador'
-        ]
+        print("\n[2/4] Carregando arquivos de scouts...")
+        df_scouts, n_files = load_scouts(INPUTS_DIR / "scouts_base")
 
-        for col in weights_string_cols:
-            if col in df_weights_active.columns:
-                mask = df_weights_active[col].notna()
-                df_weights_active.loc[mask, col] = df_weights_active.loc[mask, col].astype(str)
+        print("\n[3/4] Carregando mapeamento de nacionalidades...")
+        df_scouts = add_nationalities(df_scouts, INPUTS_DIR / "business" / "nacionalidades.xlsx", OUTPUT_DIR)
 
-        # Salvar pesos
-        df_weights_active.to_parquet(OUTPUT_DIR / "_temp_weights_active.parquet", index=False)
+        print("\n[4/4] Salvando dados intermediários...")
+        save_scouts(df_scouts, OUTPUT_DIR)
+        print()
 
-        print(f"  ✓ Scouts salvos: _temp_scouts_raw.parquet")
-        print(f"  ✓ Pesos salvos: _temp_weights_active.parquet")
+        return True
 
-        # Resumo final
-        print("\n" + "=" * 70)
-        print("RESUMO")
+    except Exception as e:
+        print(f"\n✗ ERRO no carregamento de scouts: {str(e)}")
+        raise
+
+
+def run_weights() -> bool:
+    """
+    Estágio independente: base_peso.xlsx → _temp_weights_active.parquet
+
+    Returns:
+        bool: True se sucesso, False se erro
+    """
+    try:
         print("=" * 70)
-        print(f"Total de jogadores: {len(df_scouts)}")
-        print(f"Total de colunas: {len(df_scouts.columns)}")
-        print(f"Arquivos processados: {len(scout_files)}")
-        print(f"Indicadores ativos: {len(df_weights_active)}")
+        print("ETAPA 1/6: CARREGAMENTO DE PESOS")
         print("=" * 70)
         print()
 
+        BASE_DIR = get_base_dir()
+        OUTPUT_DIR = BASE_DIR / "bases" / "outputs"
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+        print("[1/2] Carregando tabela de pesos...")
+        _, df_weights_active = load_weights(BASE_DIR / "bases" / "inputs" / "business" / "base_peso.xlsx")
+
+        print("\n[2/2] Salvando dados intermediários...")
+        save_weights(df_weights_active, OUTPUT_DIR)
+        print()
+
         return True
 
     except Exception as e:
-        print(f"\n✗ ERRO no carregamento de dados: {str(e)}")
+        print(f"\n✗ ERRO no carregamento de pesos: {str(e)}")
         raise
 
 
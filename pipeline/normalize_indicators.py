@@ -6,6 +6,20 @@ Este módulo realiza:
 2. Normalização de valores (0-100) por grupo de posição + competição
 3. Tratamento de direção (CIMA vs BAIXO)
 
+A estratégia de normalização vem de normalization.strategy no config.yaml:
+- "minmax": (valor - mínimo) / (máximo - mínimo) do grupo (padrão, original)
+- "percentile": posição percentil no grupo (menos sensível a um valor extremo)
+- "zscore": z-score do grupo limitado a ±zscore_clip e levado para 0-100
+
+Com normalization.percentile_columns, as colunas <indicador>_pctl (percentil
+no grupo) também são gravadas ao lado das _norm.
+
+Com normalization.min_minutes_reference > 0, as estatísticas de cada grupo
+(mínimo/máximo, média/desvio, distribuição do percentil) vêm só dos jogadores
+com ao menos esse número de player_season_minutes: per-90 de quem jogou pouco
+são extremos ruidosos. Todos os jogadores continuam normalizados contra essa
+referência (limitados a 0-100).
+
 Converte: 04_normalize_indicators.ipynb → normalize_indicators.py
 """
 
@@ -14,7 +28,67 @@ import numpy as np
 import json
 from pathlib import Path
 
-from . import get_base_dir
+from . import get_base_dir, get_engine, load_settings
+from .sql_engine import ROW_ID, connect, group_stats, parquet_source, quote, register_frame
+from .streaming import ChunkWriter, GroupStats, batch_rows, get_streaming_settings, read_batches
+
+
+STRATEGIES = ("minmax", "percentile", "zscore")
+
+DEFAULT_NORMALIZATION_SETTINGS = {
+    "strategy": "minmax",
+    "zscore_clip": 3.0,
+    "percentile_columns": False,
+    "min_minutes_reference": 0,
+    "global": {},
+}
+
+DEFAULT_GLOBAL_SETTINGS = {
+    "enabled": False,
+    "default_strength": 1.0,
+    "strength": {},
+}
+
+MINUTES_COLUMN = "player_season_minutes"
+POSITION_COLUMNS = ["GK", "RCB", "LCB", "CB", "RB", "LB", "DM", "CM", "AM", "LW", "RW", "CF"]
+
+
+def get_normalization_settings() -> dict:
+    """Seção normalization do config.yaml, validada"""
+    settings = load_settings("normalization", DEFAULT_NORMALIZATION_SETTINGS)
+    if settings["strategy"] not in STRATEGIES:
+        raise ValueError(
+            f"normalization.strategy inválida: {settings['strategy']} (opções: {', '.join(STRATEGIES)})"
+        )
+    if not settings["zscore_clip"] or float(settings["zscore_clip"]) <= 0:
+        raise ValueError("normalization.zscore_clip deve ser maior que zero")
+    if float(settings["min_minutes_reference"] or 0) < 0:
+        raise ValueError("normalization.min_minutes_reference não pode ser negativo")
+
+    global_settings = dict(DEFAULT_GLOBAL_SETTINGS)
+    global_settings.update(settings.get("global") or {})
+    global_settings["strength"] = {
+        str(competition): float(coef) for competition, coef in (global_settings["strength"] or {}).items()
+    }
+    coefficients = list(global_settings["strength"].values()) + [float(global_settings["default_strength"])]
+    if any(coef <= 0 for coef in coefficients):
+        raise ValueError("normalization.global: coeficientes de força devem ser maiores que zero")
+    settings["global"] = global_settings
+    return settings
+
+
+def strength_coefficients(competition_ids: pd.Series, strength: dict, default: float = 1.0) -> np.ndarray:
+    """Coeficiente de força da liga de cada linha (default para competições fora da tabela)"""
+    keys = competition_ids.astype(str).str.replace(r"\.0$", "", regex=True)
+    return keys.map(strength).fillna(default).to_numpy(dtype=float)
+
+
+def reference_mask(df: pd.DataFrame, min_minutes: float) -> np.ndarray:
+    """Linhas usadas como referência do grupo (minutagem >= min_minutes; todas se 0)"""
+    if not min_minutes or MINUTES_COLUMN not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    minutes = pd.to_numeric(df[MINUTES_COLUMN], errors="coerce").to_numpy(dtype=float)
+    return minutes >= float(min_minutes)
 
 
 def normalize_column(series: pd.Series, direction: str = "CIMA") -> pd.Series:
@@ -46,6 +120,463 @@ def normalize_column(series: pd.Series, direction: str = "CIMA") -> pd.Series:
     return normalized
 
 
+def _reference_values(values: pd.DataFrame, groups: pd.Series, reference: np.ndarray) -> pd.DataFrame:
+    """
+    Valores que formam a referência de cada grupo (os demais viram NaN).
+
+    Se um grupo não tem nenhuma linha de referência para um indicador, o
+    grupo inteiro é usado (ninguém fica sem normalização).
+    """
+    if reference.all():
+        return values
+    rows = np.broadcast_to(reference[:, np.newaxis], values.shape)
+    ref_counts = values.where(rows).groupby(groups, sort=False).transform("count").to_numpy()
+    return values.where(rows | (ref_counts == 0))
+
+
+def _minmax_scores(values: pd.DataFrame, groups: pd.Series, is_up: np.ndarray,
+                   reference: np.ndarray = None) -> np.ndarray:
+    """Min-max por grupo (mesmo resultado de normalize_column, inclusive 50.0 se max == min)"""
+    ref_values = values if reference is None else _reference_values(values, groups, reference)
+    grouped = ref_values.groupby(groups, sort=False)
+    mins = grouped.transform("min").to_numpy(dtype=float)
+    maxs = grouped.transform("max").to_numpy(dtype=float)
+    # Quem está fora da referência pode passar do mínimo/máximo dela
+    return minmax_from_stats(values.to_numpy(dtype=float), mins, maxs, is_up, clip=ref_values is not values)
+
+
+def minmax_from_stats(raw: np.ndarray, mins: np.ndarray, maxs: np.ndarray, is_up: np.ndarray,
+                      clip: bool = False) -> np.ndarray:
+    """Min-max a partir do mínimo/máximo do grupo de cada linha (clip: limitar a 0-100)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        span = maxs - mins
+        up = (raw - mins) / span * 100
+        down = (maxs - raw) / span * 100
+        normalized = np.where(is_up[np.newaxis, :], up, down)
+        normalized = np.where(maxs == mins, 50.0, normalized)
+    if clip:
+        normalized = np.clip(normalized, 0.0, 100.0)
+    return normalized
+
+
+def _percentile_scores(values: pd.DataFrame, groups: pd.Series, is_up: np.ndarray,
+                       reference: np.ndarray = None) -> np.ndarray:
+    """
+    Posição percentil no grupo: (rank - 1) / (n - 1) * 100, empates pela média.
+
+    Um único rank agrupado para todos os indicadores (os "menor é melhor"
+    entram com sinal trocado). Grupo com um só valor (ou todos iguais) = 50.0.
+    Com referência parcial, ver _percentile_against_reference.
+    """
+    signed = values * np.where(is_up, 1.0, -1.0)
+    if reference is not None and not reference.all():
+        ref_signed = _reference_values(signed, groups, reference)
+        return _percentile_against_reference(signed, ref_signed, groups)
+
+    grouped = signed.groupby(groups, sort=False)
+    ranks = grouped.rank(method="average").to_numpy(dtype=float)
+    counts = grouped.transform("count").to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized = (ranks - 1) / (counts - 1) * 100
+        normalized = np.where(counts == 1, 50.0, normalized)
+    return np.where(np.isnan(ranks), np.nan, normalized)
+
+
+def _percentile_against_reference(signed: pd.DataFrame, ref_signed: pd.DataFrame,
+                                  groups: pd.Series) -> np.ndarray:
+    """
+    Percentil de cada valor na distribuição de referência do seu grupo.
+
+    Por indicador, valores e grupo viram uma chave inteira ordenável
+    (grupo * n_valores + posição do valor), e um searchsorted sobre as chaves
+    da referência dá, para todas as linhas de uma vez, quantos valores de
+    referência do grupo estão abaixo e empatados.
+
+    - linha da referência: (abaixo + (empates - 1) / 2) / (n - 1), igual ao
+      rank agrupado quando todas as linhas são referência
+    - demais linhas: (abaixo + empates / 2) / n
+    """
+    group_codes = pd.factorize(groups, sort=False)[0].astype(np.int64)
+    raw_all = signed.to_numpy(dtype=float)
+    raw_ref = ref_signed.to_numpy(dtype=float)
+    result = np.full(raw_all.shape, np.nan)
+
+    for j in range(raw_all.shape[1]):
+        raw = raw_all[:, j]
+        valid = ~np.isnan(raw)
+        in_ref = ~np.isnan(raw_ref[:, j])
+        if not valid.any():
+            continue
+
+        # Posição de cada valor entre os valores distintos (ordem preservada)
+        distinct, value_pos = np.unique(raw[valid], return_inverse=True)
+        stride = len(distinct) + 1
+        keys = np.full(len(raw), -1, dtype=np.int64)
+        keys[valid] = group_codes[valid] * stride + value_pos
+
+        ref_keys = np.sort(keys[in_ref])
+        start = np.searchsorted(ref_keys, group_codes * stride, side="left")
+        end = np.searchsorted(ref_keys, (group_codes + 1) * stride, side="left")
+        below = np.searchsorted(ref_keys, keys, side="left") - start
+        equal = np.searchsorted(ref_keys, keys, side="right") - start - below
+        n = (end - start).astype(float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ref_score = np.where(n == 1, 50.0, (below + (equal - 1) / 2) / (n - 1) * 100)
+            other_score = (below + equal / 2) / n * 100
+        result[:, j] = np.where(valid, np.where(in_ref, ref_score, other_score), np.nan)
+
+    return result
+
+
+def _zscore_scores(values: pd.DataFrame, groups: pd.Series, is_up: np.ndarray,
+                   clip: float = 3.0, reference: np.ndarray = None) -> np.ndarray:
+    """Z-score no grupo (desvio populacional), limitado a ±clip e levado para 0-100 (média = 50)"""
+    ref_values = values if reference is None else _reference_values(values, groups, reference)
+    grouped = ref_values.groupby(groups, sort=False)
+    means = grouped.transform("mean").to_numpy(dtype=float)
+    stds = grouped.transform("std", ddof=0).to_numpy(dtype=float)
+    return zscore_from_stats(values.to_numpy(dtype=float), means, stds, is_up, clip)
+
+
+def zscore_from_stats(raw: np.ndarray, means: np.ndarray, stds: np.ndarray, is_up: np.ndarray,
+                      clip: float = 3.0) -> np.ndarray:
+    """Z-score a partir da média/desvio do grupo de cada linha, limitado a ±clip e levado para 0-100"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (raw - means) / stds
+        z = np.where(is_up[np.newaxis, :], z, -z)
+        normalized = (np.clip(z, -clip, clip) + clip) / (2 * clip) * 100
+        normalized = np.where(stds == 0, 50.0, normalized)
+    return np.where(np.isnan(raw), np.nan, normalized)
+
+
+def _scores_from_stats(raw: np.ndarray, stats: tuple, is_up: np.ndarray, strategy: str,
+                       zscore_clip: float, clip: bool) -> np.ndarray:
+    """Min-max ou z-score com as estatísticas por grupo de sql_group_stats: (códigos, estatísticas)"""
+    codes, per_group = stats
+    if strategy == "minmax":
+        return minmax_from_stats(raw, per_group["min"][codes], per_group["max"][codes], is_up, clip=clip)
+    if strategy == "zscore":
+        # Grupo constante: desvio exatamente 0, como no groupby do pandas
+        stds = np.where(per_group["max"] == per_group["min"], 0.0, per_group["std"])
+        return zscore_from_stats(raw, per_group["mean"][codes], stds[codes], is_up, zscore_clip)
+    raise ValueError(f"Estratégia sem estatísticas de grupo: {strategy}")
+
+
+def normalize_frame(df: pd.DataFrame, indicadores: list, direction_map: dict,
+                    strategy: str = "minmax", group_col: str = "_norm_group",
+                    zscore_clip: float = 3.0, percentile_columns: bool = False,
+                    reference: np.ndarray = None, suffix: str = "_norm",
+                    stats: dict = None) -> pd.DataFrame:
+    """
+    Normalização vetorizada: todos os indicadores em uma única passada
+    agrupada, sem lambda por grupo/indicador.
+
+    Com strategy="minmax" produz exatamente o mesmo resultado de
+    normalize_column aplicado por grupo.
+
+    Args:
+        df: DataFrame com os indicadores e a coluna de grupo
+        indicadores: lista de indicadores a normalizar
+        direction_map: indicador -> 'CIMA' ou 'BAIXO'
+        strategy: "minmax", "percentile" ou "zscore"
+        group_col: coluna com a chave do grupo (posição + competição)
+        zscore_clip: limite do z-score (strategy="zscore")
+        percentile_columns: também adicionar as colunas <indicador>_pctl
+        reference: máscara booleana das linhas que formam as estatísticas de
+            cada grupo (None = todas; ver reference_mask)
+        suffix: sufixo das colunas normalizadas (ex: "_norm_global")
+        stats: estatísticas dos grupos já calculadas (sql_group_stats,
+            engine duckdb; minmax e zscore)
+
+    Returns:
+        DataFrame com os indicadores convertidos para numérico e as
+        colunas <indicador><suffix> (e _pctl) adicionadas ao final
+    """
+    indicadores = list(dict.fromkeys(indicadores))
+    if not indicadores:
+        return df
+
+    values = df[indicadores].apply(pd.to_numeric, errors="coerce")
+    groups = df[group_col]
+
+    # Mesmo critério de normalize_column: somente "CIMA" é "maior é melhor"
+    is_up = np.array([direction_map.get(ind, "CIMA") == "CIMA" for ind in indicadores])
+
+    if stats is not None:
+        normalized = _scores_from_stats(values.to_numpy(dtype=float), stats, is_up, strategy,
+                                        zscore_clip, clip=reference is not None and not reference.all())
+    elif strategy == "minmax":
+        normalized = _minmax_scores(values, groups, is_up, reference)
+    elif strategy == "percentile":
+        normalized = _percentile_scores(values, groups, is_up, reference)
+    elif strategy == "zscore":
+        normalized = _zscore_scores(values, groups, is_up, zscore_clip, reference)
+    else:
+        raise ValueError(f"Estratégia de normalização inválida: {strategy}")
+
+    df = df.copy()
+    df[indicadores] = values
+    new_frames = [pd.DataFrame(normalized, index=df.index, columns=[f"{ind}{suffix}" for ind in indicadores])]
+
+    if percentile_columns:
+        percentiles = (normalized if strategy == "percentile"
+                       else _percentile_scores(values, groups, is_up, reference))
+        new_frames.append(
+            pd.DataFrame(percentiles, index=df.index, columns=[f"{ind}_pctl" for ind in indicadores])
+        )
+
+    return pd.concat([df] + new_frames, axis=1)
+
+
+def normalize_frame_fast(df: pd.DataFrame, indicadores: list, direction_map: dict,
+                         group_col: str = "_norm_group") -> pd.DataFrame:
+    """
+    Versão vetorizada da normalização min-max original (engine "fast"):
+    mesmo resultado de normalize_column aplicado por grupo, inclusive o
+    valor 50.0 para grupos com max == min.
+    """
+    return normalize_frame(df, indicadores, direction_map, "minmax", group_col)
+
+
+def normalize_global(df: pd.DataFrame, indicadores: list, direction_map: dict, strategy: str,
+                     strength: np.ndarray, zscore_clip: float = 3.0,
+                     reference: np.ndarray = None, stats: dict = None) -> pd.DataFrame:
+    """
+    Normalização entre competições: valores ajustados pela força da liga e
+    normalizados por mapped_position em uma única passada agrupada.
+
+    Args:
+        df: DataFrame com os indicadores e mapped_position
+        indicadores: lista de indicadores a normalizar
+        direction_map: indicador -> 'CIMA' ou 'BAIXO'
+        strategy: mesma estratégia das colunas _norm
+        strength: coeficiente de força da liga de cada linha (strength_coefficients)
+        zscore_clip: limite do z-score (strategy="zscore")
+        reference: linhas que formam as estatísticas de cada posição
+        stats: estatísticas de cada posição já calculadas (sql_group_stats)
+
+    Returns:
+        DataFrame (mesmo índice de df) só com as colunas <indicador>_norm_global
+    """
+    indicadores = list(dict.fromkeys(indicadores))
+    values = df[indicadores].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    is_up = np.array([direction_map.get(ind, "CIMA") == "CIMA" for ind in indicadores])
+
+    # "maior é melhor": valor x força; "menor é melhor": valor / força
+    factor = np.where(is_up[np.newaxis, :], strength[:, np.newaxis], 1.0 / strength[:, np.newaxis])
+    adjusted = pd.DataFrame(values * factor, index=df.index, columns=indicadores)
+    adjusted["_norm_global_group"] = df["mapped_position"].astype(str).to_numpy()
+
+    result = normalize_frame(adjusted, indicadores, direction_map, strategy, "_norm_global_group",
+                             zscore_clip=zscore_clip, reference=reference, suffix="_norm_global",
+                             stats=stats)
+    return result[[f"{ind}_norm_global" for ind in indicadores]]
+
+
+def sql_group_stats(con, source: Path, indicadores: list, direction_map: dict, strategy: str,
+                    min_minutes: float = 0, strength: np.ndarray = None) -> tuple:
+    """
+    Estatísticas de cada grupo calculadas pelo DuckDB direto do parquet
+    (engine duckdb) e o grupo de cada linha, na ordem das linhas do arquivo
+    (ver sql_engine.group_stats).
+
+    Sem strength: por (mapped_position, competition_id), como _norm_group.
+    Com strength (normalização global): valores ajustados pela força da liga,
+    por mapped_position, como normalize_global.
+    """
+    indicadores = list(dict.fromkeys(indicadores))
+    expressions = [f"TRY_CAST(s.{quote(ind)} AS DOUBLE)" for ind in indicadores]
+    stats = ("min", "max") if strategy == "minmax" else ("min", "max", "mean", "std")
+    reference = (f"TRY_CAST(s.{quote(MINUTES_COLUMN)} AS DOUBLE) >= {float(min_minutes)!r}"
+                 if min_minutes else None)
+
+    if strength is None:
+        return group_stats(con, parquet_source(source), ["mapped_position", "competition_id"],
+                            expressions, stats, reference)
+
+    # Mesmo fator de normalize_global: "maior é melhor" x força, "menor é melhor" x (1 / força)
+    factors = pd.DataFrame({"up": strength, "down": 1.0 / strength})
+    register_frame(con, "_strength", factors, ["up", "down"])
+    try:
+        expressions = [f"{expr} * f.{'up' if direction_map.get(ind, 'CIMA') == 'CIMA' else 'down'}"
+                       for ind, expr in zip(indicadores, expressions)]
+        return group_stats(con, parquet_source(source), ["mapped_position"], expressions, stats,
+                            reference, joins=f"JOIN _strength f ON f.{ROW_ID} = s.{ROW_ID}")
+    finally:
+        con.unregister("_strength")
+
+
+def build_weights_map(df_weights: pd.DataFrame, indicadores_disponiveis: list) -> dict:
+    """indicador → {posição: peso} dos indicadores disponíveis (peso nulo = 0)"""
+    available_pos_cols = [c for c in POSITION_COLUMNS if c in df_weights.columns]
+
+    weights_dict = {}
+    for _, row in df_weights.iterrows():
+        indicador = row["INDICADOR"].strip()
+        if indicador in indicadores_disponiveis:
+            weights_dict[indicador] = {}
+            for pos in available_pos_cols:
+                weights_dict[indicador][pos] = row[pos] if pd.notna(row[pos]) else 0
+    return weights_dict
+
+
+def effective_stats(stats: GroupStats, ref_stats: GroupStats = None) -> dict:
+    """
+    Estatísticas usadas por grupo e indicador (alinhadas a stats.keys): as da
+    referência por minutagem quando o grupo tem algum valor de referência
+    para o indicador, senão as do grupo inteiro (mesmo critério de
+    _reference_values).
+    """
+    result = {"min": stats.min, "max": stats.max, "mean": stats.mean, "std": stats.std()}
+    if ref_stats is not None:
+        ref_rows = ref_stats.rows_of(stats.keys)
+        found = ref_rows >= 0
+        use_ref = np.zeros(stats.count.shape, dtype=bool)
+        use_ref[found] = ref_stats.count[ref_rows[found]] > 0
+        ref_values = {"min": ref_stats.min, "max": ref_stats.max, "mean": ref_stats.mean, "std": ref_stats.std()}
+        for name, values in ref_values.items():
+            aligned = np.full(stats.count.shape, np.nan)
+            aligned[found] = values[ref_rows[found]]
+            result[name] = np.where(use_ref, aligned, result[name])
+
+    # Grupo constante: desvio exatamente 0 (a combinação entre lotes pode deixar um resíduo)
+    result["std"] = np.where(result["max"] == result["min"], 0.0, result["std"])
+    return result
+
+
+def _normalize_from_stats(raw: np.ndarray, stats: dict, rows: np.ndarray, is_up: np.ndarray,
+                          strategy: str, zscore_clip: float, clip: bool) -> np.ndarray:
+    """Normaliza um lote com as estatísticas (effective_stats) do grupo de cada linha"""
+    if strategy == "minmax":
+        return minmax_from_stats(raw, stats["min"][rows], stats["max"][rows], is_up, clip=clip)
+    return zscore_from_stats(raw, stats["mean"][rows], stats["std"][rows], is_up, zscore_clip)
+
+
+def run_streaming(settings: dict) -> bool:
+    """
+    Normalização em duas passadas sobre lotes (streaming.enabled).
+
+    Passada 1: estatísticas de cada grupo (GroupStats), com e sem o filtro
+    de minutagem e também para a normalização global. Passada 2: cada lote
+    é normalizado com essas estatísticas e gravado. Mesmo resultado da
+    normalização em memória para as estratégias minmax e zscore.
+    """
+    OUTPUT_DIR = get_base_dir() / "bases" / "outputs"
+    source = OUTPUT_DIR / "_temp_scouts_consolidated.parquet"
+    strategy = settings["strategy"]
+    zscore_clip = float(settings["zscore_clip"])
+    min_minutes = float(settings["min_minutes_reference"] or 0)
+    global_settings = settings["global"]
+
+    # 1. Indicadores (esquema do parquet, sem ler os dados)
+    print("[1/4] Identificando indicadores...")
+    import pyarrow.parquet as pq
+    df_weights = pd.read_parquet(OUTPUT_DIR / "_temp_weights_active.parquet")
+    base_schema = pq.read_schema(source)
+    indicadores = df_weights["INDICADOR"].str.strip().tolist()
+    indicadores_disponiveis = [ind for ind in indicadores if ind in base_schema.names]
+    direction_map = dict(zip(df_weights["INDICADOR"].str.strip(), df_weights["Melhor para"]))
+    unique_indicadores = list(dict.fromkeys(indicadores_disponiveis))
+    is_up = np.array([direction_map.get(ind, "CIMA") == "CIMA" for ind in unique_indicadores])
+
+    rows_per_batch = batch_rows(source, get_streaming_settings())
+    print(f"  ✓ Indicadores disponíveis: {len(indicadores_disponiveis)}")
+    print(f"  ✓ Estratégia: {strategy}")
+    print(f"  ✓ Lotes de até {rows_per_batch} linhas")
+
+    def batch_values(batch):
+        values = batch[unique_indicadores].apply(pd.to_numeric, errors="coerce")
+        groups = batch["mapped_position"].astype(str) + "_" + batch["competition_id"].astype(str)
+        return values, groups.to_numpy()
+
+    def global_values(batch, values):
+        strength = strength_coefficients(
+            batch["competition_id"], global_settings["strength"], float(global_settings["default_strength"])
+        )
+        factor = np.where(is_up[np.newaxis, :], strength[:, np.newaxis], 1.0 / strength[:, np.newaxis])
+        return values.to_numpy(dtype=float) * factor, batch["mapped_position"].astype(str).to_numpy()
+
+    # 2. Passada 1: estatísticas dos grupos
+    print("\n[2/4] Passada 1: estatísticas dos grupos...")
+    n_ind = len(unique_indicadores)
+    stats, ref_stats = GroupStats(n_ind), GroupStats(n_ind) if min_minutes else None
+    global_stats = GroupStats(n_ind) if global_settings["enabled"] else None
+    global_ref_stats = GroupStats(n_ind) if global_settings["enabled"] and min_minutes else None
+    total_rows, reference_rows = 0, 0
+
+    for batch in read_batches(source, rows_per_batch):
+        values, groups = batch_values(batch)
+        raw = values.to_numpy(dtype=float)
+        reference = reference_mask(batch, min_minutes)
+        stats.update(groups, raw)
+        if ref_stats is not None:
+            ref_stats.update(groups[reference], raw[reference])
+        if global_stats is not None:
+            adjusted, positions = global_values(batch, values)
+            global_stats.update(positions, adjusted)
+            if global_ref_stats is not None:
+                global_ref_stats.update(positions[reference], adjusted[reference])
+        total_rows += len(batch)
+        reference_rows += int(reference.sum())
+
+    partial_reference = reference_rows < total_rows
+    group_stats = effective_stats(stats, ref_stats if partial_reference else None)
+    if global_stats is not None:
+        global_group_stats = effective_stats(global_stats, global_ref_stats if partial_reference else None)
+    print(f"  ✓ Registros: {total_rows}")
+    print(f"  ✓ Grupos (posição + competição): {len(stats.keys)}")
+    if min_minutes:
+        print(f"  ✓ Referência dos grupos: {reference_rows}/{total_rows} jogadores "
+              f"com {MINUTES_COLUMN} >= {min_minutes:g}")
+
+    # 3. Passada 2: normalização lote a lote
+    print("\n[3/4] Passada 2: normalizando e gravando...")
+    norm_columns = [f"{ind}_norm" for ind in unique_indicadores]
+    global_columns = [f"{ind}_norm_global" for ind in unique_indicadores]
+    with ChunkWriter(OUTPUT_DIR / "_temp_scouts_normalized.parquet", base_schema) as writer:
+        for batch in read_batches(source, rows_per_batch):
+            values, groups = batch_values(batch)
+            raw = values.to_numpy(dtype=float)
+            frames = [pd.DataFrame(
+                _normalize_from_stats(raw, group_stats, stats.rows_of(groups), is_up, strategy,
+                                      zscore_clip, partial_reference),
+                index=batch.index, columns=norm_columns,
+            )]
+            if global_stats is not None:
+                adjusted, positions = global_values(batch, values)
+                frames.append(pd.DataFrame(
+                    _normalize_from_stats(adjusted, global_group_stats, global_stats.rows_of(positions), is_up,
+                                          strategy, zscore_clip, partial_reference),
+                    index=batch.index, columns=global_columns,
+                ))
+            batch[unique_indicadores] = values
+            writer.write(pd.concat([batch] + frames, axis=1))
+    print(f"  ✓ Indicadores normalizados: {len(indicadores_disponiveis)}")
+    if global_stats is not None:
+        print(f"  ✓ Normalização global: {len(global_columns)} indicadores")
+
+    # 4. Mapeamento de pesos
+    print("\n[4/4] Salvando mapeamento de pesos...")
+    weights_dict = build_weights_map(df_weights, indicadores_disponiveis)
+    with open(OUTPUT_DIR / "_temp_weights_map.json", "w") as f:
+        json.dump(weights_dict, f)
+    with open(OUTPUT_DIR / "_temp_indicators_available.json", "w") as f:
+        json.dump(indicadores_disponiveis, f)
+    print(f"  ✓ Mapeamento criado para {len(weights_dict)} indicadores")
+
+    print("\n" + "=" * 70)
+    print("RESUMO")
+    print("=" * 70)
+    print(f"Jogadores: {writer.rows}")
+    print(f"Indicadores normalizados: {len(norm_columns)} ({strategy}, em lotes)")
+    print("=" * 70)
+    print()
+
+    return True
+
+
 def run() -> bool:
     """
     Executa a normalização de indicadores.
@@ -53,12 +584,21 @@ def run() -> bool:
     Returns:
         bool: True se sucesso, False se erro
     """
+    con = None
     try:
         print("=" * 70)
         print("ETAPA 4/6: NORMALIZAÇÃO DE INDICADORES")
         print("=" * 70)
         print()
 
+        settings = get_normalization_settings()
+        if get_streaming_settings()["enabled"]:
+            if settings["strategy"] == "percentile" or settings["percentile_columns"]:
+                # O percentil precisa da distribuição completa de cada grupo
+                print("  ⚠ Streaming: percentil não é calculado em lotes; normalização em memória\n")
+            else:
+                return run_streaming(settings)
+
         # Configurar diretórios
         BASE_DIR = get_base_dir()
         OUTPUT_DIR = BASE_DIR / "bases" / "outputs"
@@ -68,8 +608,13 @@ def run() -> bool:
         df = pd.read_parquet(OUTPUT_DIR / "_temp_scouts_consolidated.parquet")
         df_weights = pd.read_parquet(OUTPUT_DIR / "_temp_weights_active.parquet")
 
+        engine = get_engine()
+        strategy = settings["strategy"]
+
         print(f"  ✓ Jogadores: {len(df)}")
         print(f"  ✓ Indicadores ativos: {len(df_weights)}")
+        print(f"  ✓ Engine: {engine}")
+        print(f"  ✓ Estratégia: {strategy}")
 
         # 2. Identificar Indicadores Válidos
         print("\n[2/5] Identificando indicadores...")
@@ -97,44 +642,89 @@ def run() -> bool:
             df_normalized["competition_id"].astype(str)
         )
 
-        normalized_count = 0
-        for idx, indicador in enumerate(indicadores_disponiveis, 1):
-            if idx % 20 == 0:
-                print(f"    {idx}/{len(indicadores_disponiveis)}...", end="\r")
-
-            try:
-                direction = direction_map.get(indicador, "CIMA")
+        # Linhas que formam as estatísticas de cada grupo (minutagem mínima)
+        min_minutes = float(settings["min_minutes_reference"] or 0)
+        reference = reference_mask(df_normalized, min_minutes)
+        if min_minutes:
+            print(f"  ✓ Referência dos grupos: {int(reference.sum())}/{len(reference)} jogadores "
+                  f"com {MINUTES_COLUMN} >= {min_minutes:g}")
+
+        # Engine duckdb: estatísticas dos grupos em SQL, direto do parquet
+        if engine == "duckdb":
+            if strategy == "percentile" or settings["percentile_columns"]:
+                print("  ⚠ Engine duckdb: percentil calculado no pandas (engine fast)")
+            else:
+                con = connect()
+        min_minutes_sql = min_minutes if MINUTES_COLUMN in df_normalized.columns else 0
+        source = OUTPUT_DIR / "_temp_scouts_consolidated.parquet"
 
-                # Converter para numérico
-                df_normalized[indicador] = pd.to_numeric(df_normalized[indicador], errors="coerce")
-
-                # Normalizar POR GRUPO (posição + competição)
-                df_normalized[f"{indicador}_norm"] = df_normalized.groupby("_norm_group")[indicador].transform(
-                    lambda x: normalize_column(x, direction)
-                )
-                normalized_count += 1
-
-            except Exception as e:
-                # Continuar mesmo se houver erro em um indicador
-                pass
+        normalized_count = 0
+        if engine != "reference" or strategy != "minmax" or settings["percentile_columns"] or min_minutes:
+            # Todos os indicadores em uma única passada agrupada (percentil,
+            # z-score e referência por minutagem só existem na versão vetorizada)
+            stats = (sql_group_stats(con, source, indicadores_disponiveis, direction_map, strategy, min_minutes_sql)
+                     if con is not None else None)
+            df_normalized = normalize_frame(
+                df_normalized, indicadores_disponiveis, direction_map, strategy,
+                zscore_clip=float(settings["zscore_clip"]),
+                percentile_columns=bool(settings["percentile_columns"]),
+                reference=reference, stats=stats,
+            )
+            del stats
+            normalized_count = len(indicadores_disponiveis)
+        else:
+            for idx, indicador in enumerate(indicadores_disponiveis, 1):
+                if idx % 20 == 0:
+                    print(f"    {idx}/{len(indicadores_disponiveis)}...", end="\r")
+
+                try:
+                    direction = direction_map.get(indicador, "CIMA")
+
+                    # Converter para numérico
+                    df_normalized[indicador] = pd.to_numeric(df_normalized[indicador], errors="coerce")
+
+                    # Normalizar POR GRUPO (posição + competição)
+                    df_normalized[f"{indicador}_norm"] = df_normalized.groupby("_norm_group")[indicador].transform(
+                        lambda x: normalize_column(x, direction)
+                    )
+                    normalized_count += 1
+
+                except Exception as e:
+                    # Continuar mesmo se houver erro em um indicador
+                    pass
 
         # Remover coluna auxiliar
         df_normalized.drop(columns=["_norm_group"], inplace=True)
 
         print(f"\r  ✓ Indicadores normalizados: {normalized_count}")
 
+        # Normalização entre competições (força da liga), por posição
+        global_settings = settings["global"]
+        if global_settings["enabled"]:
+            strength = strength_coefficients(
+                df_normalized["competition_id"], global_settings["strength"],
+                float(global_settings["default_strength"]),
+            )
+            global_stats = (sql_group_stats(con, source, indicadores_disponiveis, direction_map, strategy,
+                                            min_minutes_sql, strength=strength)
+                            if con is not None else None)
+            df_global = normalize_global(
+                df_normalized, indicadores_disponiveis, direction_map, strategy, strength,
+                zscore_clip=float(settings["zscore_clip"]), reference=reference, stats=global_stats,
+            )
+            del global_stats
+            df_normalized = pd.concat([df_normalized, df_global], axis=1)
+            print(f"  ✓ Normalização global: {len(df_global.columns)} indicadores "
+                  f"({len(global_settings['strength'])} ligas com coeficiente, demais = "
+                  f"{float(global_settings['default_strength']):g})")
+
+        if con is not None:
+            con.close()
+            con = None
+
         # 4. Criar Mapeamento de Pesos
         print("\n[4/5] Criando mapeamento de pesos...")
-        position_columns = ["GK", "RCB", "LCB", "CB", "RB", "LB", "DM", "CM", "AM", "LW", "RW", "CF"]
-        available_pos_cols = [c for c in position_columns if c in df_weights.columns]
-
-        weights_dict = {}
-        for _, row in df_weights.iterrows():
-            indicador = row["INDICADOR"].strip()
-            if indicador in indicadores_disponiveis:
-                weights_dict[indicador] = {}
-                for pos in available_pos_cols:
-                    weights_dict[indicador][pos] = row[pos] if pd.notna(row[pos]) else 0
+        weights_dict = build_weights_map(df_weights, indicadores_disponiveis)
 
         print(f"  ✓ Mapeamento criado para {len(weights_dict)} indicadores")
 
@@ -159,7 +749,7 @@ def run() -> bool:
         print("RESUMO")
         print("=" * 70)
         print(f"Jogadores: {len(df_normalized)}")
-        print(f"Indicadores normalizados: {len(norm_cols)}")
+        print(f"Indicadores normalizados: {len(norm_cols)} ({strategy})")
         print(f"Colunas totais: {len(df_normalized.columns)}")
         print("=" * 70)
         print()
@@ -169,6 +759,10 @@ def run() -> bool:
     except Exception as e:
         print(f"\n✗ ERRO na normalização: {str(e)}")
         raise
+    finally:
+        # Conexão duckdb fechada também quando as estatísticas ou a normalização falham
+        if con is not None:
+            con.close()
 
 
 if __name__ == "__main__":
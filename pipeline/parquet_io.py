@@ -0,0 +1,169 @@
+"""
+Escrita de Parquet com pyarrow
+
+Este módulo realiza:
+1. Escrita dos arquivos finais com codec, nível de compressão e tamanho de
+   row group configuráveis por arquivo (seção export do config.yaml)
+2. Medição da vazão de escrita (MB/s e linhas/s) por arquivo
+3. Escrita concorrente de vários arquivos (a compressão do pyarrow libera
+   o GIL, então cada arquivo comprime em um núcleo)
+
+Exemplo de configuração:
+
+    export:
+      compression: "snappy"
+      compression_level: null
+      row_group_size: null
+      files:
+        consolidated_normalized:
+          compression: "zstd"
+          compression_level: 3
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import load_settings
+
+
+DEFAULT_EXPORT_SETTINGS = {
+    "compression": "snappy",
+    "compression_level": None,
+    "row_group_size": None,
+    "workers": 4,
+    "files": {},
+}
+
+_MB = 1024 * 1024
+
+
+def get_write_options(filename: str, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Opções de escrita de um arquivo: padrão da seção export + sobrescritas em export.files.
+
+    Args:
+        filename: nome do arquivo (com ou sem .parquet)
+        settings: seção export já carregada (None = ler do config.yaml)
+
+    Returns:
+        dict com compression, compression_level e row_group_size
+    """
+    if settings is None:
+        settings = load_settings("export", DEFAULT_EXPORT_SETTINGS)
+
+    options = {key: settings.get(key) for key in ("compression", "compression_level", "row_group_size")}
+    overrides = (settings.get("files") or {}).get(Path(filename).stem) or {}
+    options.update({key: value for key, value in overrides.items() if key in options})
+    return options
+
+
+class WriteStats:
+    """Resultado da escrita de um arquivo parquet"""
+
+    def __init__(self, path: Path, rows: int, columns: int, size_bytes: int, seconds: float,
+                 options: Dict[str, Any]):
+        self.path = Path(path)
+        self.rows = rows
+        self.columns = columns
+        self.size_bytes = size_bytes
+        self.seconds = seconds
+        self.options = options
+
+    @property
+    def size_mb(self) -> float:
+        return self.size_bytes / _MB
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.size_mb / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def describe(self) -> str:
+        """Resumo de uma linha: tamanho, tempo, vazão e codec"""
+        codec = self.options.get("compression") or "none"
+        if self.options.get("compression_level") is not None:
+            codec = f"{codec}:{self.options['compression_level']}"
+        return (f"{self.size_mb:.2f} MB em {self.seconds:.2f}s, "
+                f"{self.mb_per_s:.1f} MB/s, {self.rows_per_s:,.0f} linhas/s, {codec}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "file": self.path.name,
+            "rows": self.rows,
+            "columns": self.columns,
+            "size_mb": round(self.size_mb, 2),
+            "seconds": round(self.seconds, 4),
+            "mb_per_s": round(self.mb_per_s, 2),
+            "options": self.options,
+        }
+
+
+def write_parquet(df: pd.DataFrame, path: Path, options: Optional[Dict[str, Any]] = None,
+                  schema: Optional[pa.Schema] = None, metadata: Optional[Dict[str, str]] = None) -> WriteStats:
+    """
+    Grava um DataFrame em parquet (sem índice, como df.to_parquet(index=False)).
+
+    Args:
+        df: DataFrame a gravar
+        path: arquivo de destino
+        options: opções de escrita (None = get_write_options(path.name))
+        schema: schema Arrow a usar (None = inferido do DataFrame)
+        metadata: pares chave/valor extras gravados no rodapé do arquivo
+
+    Returns:
+        WriteStats
+    """
+    path = Path(path)
+    if options is None:
+        options = get_write_options(path.name)
+
+    start = time.perf_counter()
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            **{key.encode("utf-8"): str(value).encode("utf-8") for key, value in metadata.items()},
+        })
+    pq.write_table(
+        table,
+        path,
+        compression=options.get("compression") or "none",
+        compression_level=options.get("compression_level"),
+        row_group_size=options.get("row_group_size"),
+    )
+    seconds = time.perf_counter() - start
+
+    return WriteStats(path, table.num_rows, table.num_columns, path.stat().st_size, seconds, options)
+
+
+def write_many(frames: Dict[Path, pd.DataFrame], workers: Optional[int] = None,
+               metadata: Optional[Dict[str, str]] = None) -> List[WriteStats]:
+    """
+    Grava vários arquivos em paralelo.
+
+    Args:
+        frames: dict caminho → DataFrame
+        workers: threads de escrita (None = export.workers do config.yaml)
+        metadata: pares chave/valor extras gravados em todos os arquivos
+
+    Returns:
+        lista de WriteStats na mesma ordem de frames
+    """
+    settings = load_settings("export", DEFAULT_EXPORT_SETTINGS)
+    if workers is None:
+        workers = settings.get("workers") or 1
+
+    jobs = [(Path(path), df, get_write_options(Path(path).name, settings)) for path, df in frames.items()]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs) or 1)),
+                            thread_name_prefix="parquet-writer") as pool:
+        futures = [pool.submit(write_parquet, df, path, options, None, metadata) for path, df, options in jobs]
+        return [future.result() for future in futures]
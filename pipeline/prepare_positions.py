@@ -17,6 +17,11 @@ from pathlib import Path
 from typing import Dict, Any
 
 from . import get_base_dir
+from .streaming import ChunkWriter, batch_rows, get_streaming_settings, read_batches
+
+
+# Posições esperadas
+EXPECTED_POSITIONS = {"GK", "CB", "RCB", "LCB", "RB", "LB", "DM", "CM", "AM", "LW", "RW", "CF"}
 
 
 def map_position(original_position: str, position_mapping: Dict[str, Dict]) -> Dict[str, Any]:
@@ -49,6 +54,81 @@ def map_position(original_position: str, position_mapping: Dict[str, Dict]) -> D
     return {"position": None, "position_group": None, "position_sub_group": None}
 
 
+def apply_position_mapping(df_scouts: pd.DataFrame, position_mapping: Dict[str, Dict]) -> pd.DataFrame:
+    """
+    Preenche primary_position nulo e adiciona mapped_position, position_group
+    e position_sub_group (local por linha: também usada lote a lote).
+    """
+    # Preencher primary_position nulo com texto padrão
+    df_scouts['primary_position'] = df_scouts['primary_position'].fillna('Sem posição definida')
+
+    mapped = df_scouts["primary_position"].apply(lambda pos: map_position(pos, position_mapping))
+
+    # Extrair as três colunas
+    df_scouts["mapped_position"] = mapped.apply(lambda x: x["position"])
+    df_scouts["position_group"] = mapped.apply(lambda x: x["position_group"])
+    df_scouts["position_sub_group"] = mapped.apply(lambda x: x["position_sub_group"])
+    return df_scouts
+
+
+def print_position_checks(mapped_positions: set, unmapped: int, position_counts: pd.Series) -> None:
+    """Validação das posições mapeadas (posições inválidas, sem posição, distribuição)"""
+    # Verificar se todas estão no conjunto esperado
+    invalid_positions = mapped_positions - EXPECTED_POSITIONS
+    if invalid_positions:
+        print(f"  ⚠ POSIÇÕES INVÁLIDAS: {invalid_positions}")
+    else:
+        print(f"  ✓ Todas as posições são válidas")
+
+    # Verificar posições não mapeadas
+    if unmapped > 0:
+        print(f"  ⚠ Jogadores sem posição mapeada: {unmapped}")
+        # Não é erro crítico - geralmente jogadores com baixa minutagem
+    else:
+        print(f"  ✓ Todos os jogadores têm posição mapeada")
+
+    # Distribuição de posições
+    print(f"\n  Distribuição de posições:")
+    for pos, count in position_counts.head(5).items():
+        print(f"    {pos}: {count}")
+
+
+def run_streaming(position_mapping: Dict[str, Dict]) -> bool:
+    """Mapeamento de posições lote a lote (streaming.enabled)"""
+    OUTPUT_DIR = get_base_dir() / "bases" / "outputs"
+    source = OUTPUT_DIR / "_temp_scouts_raw.parquet"
+    import pyarrow.parquet as pq
+
+    rows = batch_rows(source, get_streaming_settings())
+    print(f"\n[2/3] Aplicando mapeamento de posições (lotes de até {rows} linhas)...")
+    position_counts = pd.Series(dtype="int64")
+    with ChunkWriter(OUTPUT_DIR / "_temp_scouts_positions.parquet", pq.read_schema(source)) as writer:
+        for df_batch in read_batches(source, rows):
+            df_batch = apply_position_mapping(df_batch, position_mapping)
+            position_counts = position_counts.add(df_batch["mapped_position"].value_counts(dropna=False),
+                                                  fill_value=0)
+            writer.write(df_batch)
+    position_counts = position_counts.astype("int64").sort_values(ascending=False, kind="stable")
+    print(f"  ✓ Mapeamento aplicado com sucesso: {writer.rows} jogadores")
+
+    print("\n[3/3] Validando posições...")
+    mapped_positions = {pos for pos in position_counts.index if pd.notna(pos)}
+    unmapped = int(position_counts[[pd.isna(pos) for pos in position_counts.index]].sum())
+    print_position_checks(mapped_positions, unmapped, position_counts)
+    print(f"\n  ✓ Dados salvos: _temp_scouts_positions.parquet")
+
+    print("\n" + "=" * 70)
+    print("RESUMO")
+    print("=" * 70)
+    print(f"Total de jogadores: {writer.rows}")
+    print(f"Jogadores com posição mapeada: {writer.rows - unmapped}")
+    print(f"Posições mapeadas encontradas: {len(mapped_positions)}")
+    print("=" * 70)
+    print()
+
+    return True
+
+
 def run() -> bool:
     """
     Executa o mapeamento de posições.
@@ -69,56 +149,28 @@ def run() -> bool:
 
         # 1. Carregar Dados
         print("[1/4] Carregando dados...")
-        df_scouts = pd.read_parquet(OUTPUT_DIR / "_temp_scouts_raw.parquet")
-        print(f"  ✓ Scouts carregados: {len(df_scouts)} jogadores")
-
         with open(CONFIG_DIR / "positions.yaml", "r", encoding="utf-8") as f:
             positions_config = yaml.safe_load(f)
 
         position_mapping = positions_config["position_mapping"]
         print(f"  ✓ Mapeamentos de posição: {len(position_mapping)}")
 
-        # Preencher primary_position nulo com texto padrão
-        df_scouts['primary_position'] = df_scouts['primary_position'].fillna('Sem posição definida')
+        if get_streaming_settings()["enabled"]:
+            return run_streaming(position_mapping)
+
+        df_scouts = pd.read_parquet(OUTPUT_DIR / "_temp_scouts_raw.parquet")
+        print(f"  ✓ Scouts carregados: {len(df_scouts)} jogadores")
 
         # 2. Aplicar Mapeamento de Posições
         print("\n[2/4] Aplicando mapeamento de posições...")
-        mapped = df_scouts["primary_position"].apply(lambda pos: map_position(pos, position_mapping))
-
-        # Extrair as três colunas
-        df_scouts["mapped_position"] = mapped.apply(lambda x: x["position"])
-        df_scouts["position_group"] = mapped.apply(lambda x: x["position_group"])
-        df_scouts["position_sub_group"] = mapped.apply(lambda x: x["position_sub_group"])
-
+        df_scouts = apply_position_mapping(df_scouts, position_mapping)
         print(f"  ✓ Mapeamento aplicado com sucesso")
 
         # 3. Validação das Posições
         print("\n[3/4] Validando posições...")
-
-        # Posições esperadas
-        EXPECTED_POSITIONS = {"GK", "CB", "RCB", "LCB", "RB", "LB", "DM", "CM", "AM", "LW", "RW", "CF"}
         mapped_positions = set(df_scouts["mapped_position"].dropna().unique())
-
-        # Verificar se todas estão no conjunto esperado
-        invalid_positions = mapped_positions - EXPECTED_POSITIONS
-        if invalid_positions:
-            print(f"  ⚠ POSIÇÕES INVÁLIDAS: {invalid_positions}")
-        else:
-            print(f"  ✓ Todas as posições são válidas")
-
-        # Verificar posições não mapeadas
-        unmapped = df_scouts[df_scouts["mapped_position"].isna()]
-        if len(unmapped) > 0:
-            print(f"  ⚠ Jogadores sem posição mapeada: {len(unmapped)}")
-            # Não é erro crítico - geralmente jogadores com baixa minutagem
-        else:
-            print(f"  ✓ Todos os jogadores têm posição mapeada")
-
-        # Distribuição de posições
-        position_counts = df_scouts["mapped_position"].value_counts(dropna=False)
-        print(f"\n  Distribuição de posições:")
-        for pos, count in position_counts.head(5).items():
-            print(f"    {pos}: {count}")
+        print_position_checks(mapped_positions, int(df_scouts["mapped_position"].isna().sum()),
+                              df_scouts["mapped_position"].value_counts(dropna=False))
 
         # 4. Salvar Dados Processados
         print("\n[4/4] Salvando dados processados...")
@@ -0,0 +1,565 @@
+"""
+Perfilamento da Pipeline
+
+Este módulo realiza:
+1. Medição de tempo de parede (wall time) e tempo de CPU por etapa (CPU da
+   thread que executa a etapa: etapas em paralelo não somam o CPU umas das
+   outras; threads internas do pyarrow/numpy não entram)
+2. Medição de pico de memória (RSS) por etapa e por sub-fase (RSS do
+   processo: etapas que rodaram junto com outras saem com rss_shared)
+3. Detecção automática das sub-fases impressas pelos módulos ("[2/4] ...")
+4. Contagem de linhas/colunas dos arquivos gerados por cada etapa
+5. Geração do relatório JSON da execução (bases/outputs/_run_report.json)
+6. Dump opcional de cProfile por etapa (bases/outputs/_profiles/<etapa>.prof)
+7. Custo de importação da inicialização e de cada módulo de estágio
+   (python -X importtime, bases/outputs/_import_profile.json)
+
+Usa apenas a biblioteca padrão (psutil é usado se estiver instalado).
+"""
+
+import cProfile
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import get_run_id
+
+
+REPORT_FILE = "_run_report.json"
+PROFILES_DIR = "_profiles"
+IMPORT_REPORT_FILE = "_import_profile.json"
+
+# Linhas do python -X importtime: "import time: <self us> | <cumulativo us> | <módulo>"
+# (dois espaços a mais antes do módulo por nível de aninhamento)
+IMPORTTIME_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$")
+
+# Linhas como "[2/4] Calculando scores overall..." marcam o início de uma sub-fase
+PHASE_PATTERN = re.compile(r"^\s*\[(\d+)/(\d+)\]\s*(.+?)\s*$")
+
+_MB = 1024 * 1024
+
+
+def get_rss_bytes() -> Optional[int]:
+    """
+    Retorna a memória residente (RSS) atual do processo.
+
+    Returns:
+        int com o RSS em bytes, ou None se não for possível medir
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+
+    # Linux: /proc/self/statm (segunda coluna = páginas residentes)
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        try:
+            resident_pages = int(statm.read_text().split()[1])
+            return resident_pages * os.sysconf("SC_PAGE_SIZE")
+        except Exception:
+            return None
+
+    # Windows: GetProcessMemoryInfo
+    counters = _windows_memory_counters()
+    if counters is not None:
+        return counters.WorkingSetSize
+
+    return None
+
+
+def get_peak_rss_bytes() -> Optional[int]:
+    """
+    Retorna o pico de memória residente do processo desde o início.
+
+    Returns:
+        int com o pico de RSS em bytes, ou None se não for possível medir
+    """
+    counters = _windows_memory_counters()
+    if counters is not None:
+        return counters.PeakWorkingSetSize
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS retorna bytes, Linux retorna kilobytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return None
+
+
+def _windows_memory_counters():
+    """Lê PROCESS_MEMORY_COUNTERS no Windows (None em outras plataformas)"""
+    if sys.platform != "win32":
+        return None
+
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        ok = ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+        return counters if ok else None
+    except Exception:
+        return None
+
+
+def _to_mb(value: Optional[int]) -> Optional[float]:
+    """Converte bytes para MB (arredondado), preservando None"""
+    return round(value / _MB, 2) if value is not None else None
+
+
+class PeakWatch:
+    """Pico de RSS acumulado desde o último reset (um por etapa em andamento)"""
+
+    def __init__(self, initial: Optional[int]):
+        self._peak = initial
+        # Outra etapa esteve em andamento ao mesmo tempo: o pico inclui a memória dela
+        self.shared = False
+
+    def update(self, rss: int):
+        if self._peak is None or rss > self._peak:
+            self._peak = rss
+
+
+class MemorySampler:
+    """
+    Amostra o RSS do processo em uma thread de fundo.
+
+    Cada etapa em andamento registra um PeakWatch próprio, então etapas
+    executadas em paralelo (runner em DAG) não zeram o pico umas das outras.
+    O RSS é do processo inteiro: com etapas em paralelo, o pico de cada uma
+    inclui a memória das demais que estavam rodando ao mesmo tempo (essas
+    etapas ficam marcadas com PeakWatch.shared).
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self._watches: List[PeakWatch] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> Optional[int]:
+        """Lê o RSS atual e atualiza o pico de todas as etapas em andamento"""
+        rss = get_rss_bytes()
+        if rss is not None:
+            with self._lock:
+                for watch in self._watches:
+                    watch.update(rss)
+        return rss
+
+    def watch(self) -> PeakWatch:
+        """Começa a acompanhar o pico de uma nova etapa"""
+        watch = PeakWatch(get_rss_bytes())
+        with self._lock:
+            if self._watches:
+                watch.shared = True
+                for other in self._watches:
+                    other.shared = True
+            self._watches.append(watch)
+        return watch
+
+    def unwatch(self, watch: PeakWatch):
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def reset(self, watch: PeakWatch) -> Optional[int]:
+        """Retorna o pico do watch desde o último reset e reinicia a contagem"""
+        current = self.sample()
+        with self._lock:
+            peak = watch._peak
+            watch._peak = current
+        return peak
+
+
+class PhaseRecord:
+    """Medições de uma sub-fase ("[n/m] ...") de uma etapa"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self.wall_s = None
+        self.cpu_s = None
+        self.peak_rss = None
+
+    def close(self, peak_rss: Optional[int]):
+        self.wall_s = round(time.perf_counter() - self._wall_start, 4)
+        self.cpu_s = round(time.thread_time() - self._cpu_start, 4)
+        self.peak_rss = peak_rss
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "peak_rss_mb": _to_mb(self.peak_rss),
+        }
+
+
+class StageProfile:
+    """Medições de uma etapa da pipeline"""
+
+    def __init__(self, step_id: str, name: str, sampler: MemorySampler):
+        self.step_id = step_id
+        self.name = name
+        self.status = "running"
+        self.error = None
+        self.outputs: List[Dict[str, Any]] = []
+        self.phases: List[PhaseRecord] = []
+        self.cprofile_file = None
+
+        self._sampler = sampler
+        self._watch = sampler.watch()
+        self._stage_peak = None
+        self.rss_start = get_rss_bytes()
+        self.rss_end = None
+        self._wall_start = time.perf_counter()
+        # A etapa (e suas sub-fases) roda inteira na mesma thread (runner em DAG)
+        self._cpu_start = time.thread_time()
+        self.wall_s = None
+        self.cpu_s = None
+
+    def _collect_peak(self) -> Optional[int]:
+        """Coleta o pico desde a última medição e acumula no pico da etapa"""
+        peak = self._sampler.reset(self._watch)
+        if peak is not None and (self._stage_peak is None or peak > self._stage_peak):
+            self._stage_peak = peak
+        return peak
+
+    def start_phase(self, label: str):
+        """Fecha a sub-fase atual (se houver) e abre uma nova"""
+        if self.phases and self.phases[-1].wall_s is None:
+            self.phases[-1].close(self._collect_peak())
+        else:
+            self._collect_peak()
+        self.phases.append(PhaseRecord(label))
+
+    def close(self, status: str, error: Optional[BaseException] = None):
+        peak = self._collect_peak()
+        self._sampler.unwatch(self._watch)
+        if self.phases and self.phases[-1].wall_s is None:
+            self.phases[-1].close(peak)
+
+        self.wall_s = round(time.perf_counter() - self._wall_start, 4)
+        self.cpu_s = round(time.thread_time() - self._cpu_start, 4)
+        self.rss_end = get_rss_bytes()
+        self.status = status
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def record_outputs(self, paths: Iterable[Path]):
+        """
+        Registra linhas/colunas/tamanho dos arquivos gerados pela etapa.
+
+        Para parquet lê apenas os metadados do rodapé (sem carregar os dados).
+        """
+        for path in paths:
+            path = Path(path)
+            if not path.exists():
+                continue
+
+            entry = {"file": path.name, "size_mb": _to_mb(path.stat().st_size)}
+            if path.suffix == ".parquet":
+                try:
+                    import pyarrow.parquet as pq
+                    metadata = pq.read_metadata(path)
+                    entry["rows"] = metadata.num_rows
+                    entry["columns"] = metadata.num_columns
+                except Exception:
+                    pass
+            self.outputs.append(entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.step_id,
+            "name": self.name,
+            "status": self.status,
+            "error": self.error,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "rss_start_mb": _to_mb(self.rss_start),
+            "rss_end_mb": _to_mb(self.rss_end),
+            "peak_rss_mb": _to_mb(self._stage_peak),
+            # RSS (início, fim e pico) medido com outras etapas em andamento
+            "rss_shared": self._watch.shared,
+            "outputs": self.outputs,
+            "phases": [phase.to_dict() for phase in self.phases],
+            "cprofile": self.cprofile_file,
+        }
+
+
+class _PhaseTap:
+    """
+    Envolve sys.stdout para detectar as linhas de sub-fase dos módulos.
+
+    Todo texto é repassado ao stream original sem alteração; apenas as
+    linhas escritas pela thread com uma etapa ativa são analisadas.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def bind(self, stage: Optional[StageProfile]):
+        self._local.stage = stage
+        self._local.pending = ""
+
+    def write(self, text):
+        stage = getattr(self._local, "stage", None)
+        if stage is not None:
+            pending = self._local.pending + text
+            lines = pending.split("\n")
+            self._local.pending = lines.pop()
+            for line in lines:
+                match = PHASE_PATTERN.match(line.split("\r")[-1])
+                if match:
+                    stage.start_phase(match.group(3).rstrip("."))
+        return self._stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class PipelineProfiler:
+    """
+    Coleta as medições de uma execução completa da pipeline.
+
+    Uso:
+        with PipelineProfiler(output_dir, cprofile=True) as profiler:
+            with profiler.stage("load_data", "Carregamento de Dados") as stage:
+                load_data.run()
+                stage.record_outputs([...])
+        profiler.write_report("success")
+    """
+
+    def __init__(self, output_dir: Path, cprofile: bool = False):
+        self.output_dir = Path(output_dir)
+        self.cprofile = cprofile
+        self.run_id = get_run_id()
+        self.stages: List[StageProfile] = []
+        self.started_at = None
+        self.finished_at = None
+        self._sampler = None
+        self._tap = None
+        self._original_stdout = None
+        self._wall_start = None
+        self._cpu_start = None
+
+    def __enter__(self):
+        self.started_at = datetime.now()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+        self._sampler = MemorySampler()
+        self._sampler.start()
+
+        self._original_stdout = sys.stdout
+        self._tap = _PhaseTap(sys.stdout)
+        sys.stdout = self._tap
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if sys.stdout is self._tap:
+            sys.stdout = self._original_stdout
+        self._sampler.stop()
+        self.finished_at = datetime.now()
+        return False
+
+    @contextmanager
+    def stage(self, step_id: str, name: str):
+        """
+        Mede uma etapa. Exceções são registradas e propagadas.
+
+        Args:
+            step_id: identificador estável da etapa (ex: "normalize_indicators")
+            name: nome amigável exibido no console
+        """
+        profile = StageProfile(step_id, name, self._sampler)
+        self.stages.append(profile)
+        self._tap.bind(profile)
+
+        profiler = cProfile.Profile() if self.cprofile else None
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            yield profile
+        except BaseException as e:
+            profile.close("failed", e)
+            raise
+        else:
+            profile.close("success")
+        finally:
+            self._tap.bind(None)
+            if profiler is not None:
+                profiler.disable()
+                profiles_dir = self.output_dir / PROFILES_DIR
+                profiles_dir.mkdir(parents=True, exist_ok=True)
+                prof_file = profiles_dir / f"{step_id}.prof"
+                profiler.dump_stats(prof_file)
+                profile.cprofile_file = str(prof_file)
+
+    def to_dict(self, status: str) -> Dict[str, Any]:
+        finished = self.finished_at or datetime.now()
+        return {
+            "run_id": self.run_id,
+            "status": status,
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "finished_at": finished.isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "total": {
+                "wall_s": round(time.perf_counter() - self._wall_start, 4),
+                "cpu_s": round(time.process_time() - self._cpu_start, 4),
+                "peak_rss_mb": _to_mb(get_peak_rss_bytes()),
+            },
+            "steps": [stage.to_dict() for stage in self.stages],
+        }
+
+    def write_report(self, status: str) -> Path:
+        """
+        Grava o relatório JSON da execução.
+
+        Args:
+            status: "success" ou "failed"
+
+        Returns:
+            Path do arquivo gerado
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        report_file = self.output_dir / REPORT_FILE
+        with open(report_file, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(status), f, indent=2, ensure_ascii=False)
+        return report_file
+
+    def print_summary(self):
+        """Exibe uma tabela resumida de tempo e memória por etapa"""
+        print(f"  {'Etapa':<32} {'Tempo':>9} {'CPU':>9} {'Pico RSS':>11}")
+        for stage in self.stages:
+            peak = _to_mb(stage._stage_peak)
+            peak_str = f"{peak:.0f} MB" if peak is not None else "-"
+            if stage._watch.shared:
+                peak_str += "*"
+            print(f"  {stage.name:<32} {stage.wall_s or 0:>8.2f}s {stage.cpu_s or 0:>8.2f}s {peak_str:>11}")
+        if any(stage._watch.shared for stage in self.stages):
+            print("  * pico do processo, com outras etapas executando em paralelo")
+
+
+def profile_imports(output_dir: Path, startup: List[str], stages: List[str], top: int = 15) -> Dict[str, Any]:
+    """
+    Mede o custo de importação em um processo novo (python -X importtime).
+
+    Importa os módulos da inicialização e depois os de cada estágio, na
+    ordem: o custo de um módulo é o que ele acrescenta aos anteriores (o
+    primeiro estágio a importar pandas leva o custo do pandas). Grava o
+    relatório em bases/outputs/_import_profile.json.
+
+    Args:
+        startup: módulos importados antes da primeira etapa (ex: main)
+        stages: módulos dos estágios (steps.stage_modules)
+        top: quantidade de módulos mais pesados (tempo próprio) no relatório
+
+    Returns:
+        dict com o relatório
+    """
+    if getattr(sys, "frozen", False):
+        raise RuntimeError("--import-profile requer o interpretador Python (não disponível no executável)")
+
+    requested = list(dict.fromkeys(list(startup) + list(stages)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in requested)],
+        cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar os módulos:\n{result.stderr.strip().splitlines()[-1]}")
+
+    top_level: Dict[str, int] = {}
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = int(match[1]), int(match[2]), match[3], match[4]
+        entries.append((module, self_us, cumulative_us))
+        if len(indent) == 1:
+            top_level[module] = top_level.get(module, 0) + cumulative_us
+
+    def ms(us: int) -> float:
+        return round(us / 1000, 1)
+
+    modules = [
+        {"module": m, "group": "startup" if m in startup else "stage", "cumulative_ms": ms(top_level.get(m, 0))}
+        for m in requested
+    ]
+    heaviest = sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+    report = {
+        "run_id": get_run_id(),
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "executable": sys.executable,
+        "total_ms": ms(sum(top_level.values())),
+        "interpreter_ms": ms(sum(us for m, us in top_level.items() if m not in requested)),
+        "startup_ms": ms(sum(top_level.get(m, 0) for m in startup)),
+        "stages_ms": ms(sum(top_level.get(m, 0) for m in stages if m not in startup)),
+        "modules": modules,
+        "heaviest": [{"module": m, "self_ms": ms(s), "cumulative_ms": ms(c)} for m, s, c in heaviest],
+    }
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / IMPORT_REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def print_import_profile(report: Dict[str, Any]):
+    """Exibe o relatório de profile_imports"""
+    print(f"  {'Módulo':<40} {'Importação':>12}")
+    for entry in report["modules"]:
+        print(f"  {entry['module']:<40} {entry['cumulative_ms']:>9.1f} ms")
+    print(f"\n  Interpretador (site, encodings): {report['interpreter_ms']:.1f} ms")
+    print(f"  Inicialização (até a 1ª etapa):  {report['startup_ms']:.1f} ms")
+    print(f"  Módulos dos estágios:            {report['stages_ms']:.1f} ms")
+    print(f"\n  Módulos mais pesados (tempo próprio):")
+    for entry in report["heaviest"]:
+        print(f"    {entry['module']:<38} {entry['self_ms']:>9.1f} ms")
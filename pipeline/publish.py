@@ -0,0 +1,350 @@
+"""
+Publicação Atômica das Saídas
+
+Este módulo realiza:
+1. Verificação dos arquivos preparados pela exportação em
+   bases/outputs/_staging/<run id>/ (rodapé parquet legível, colunas
+   obrigatórias, mesmas linhas que a base) e dos datasets particionados
+   preparados em _staging/<run id>/datasets/
+2. Substituição atômica de cada consolidated_*.parquet (os.replace) e das
+   partições alteradas dos datasets, somente depois que tudo passou na
+   verificação
+3. Gravação do _manifest.json por último (run id, linhas, colunas, hash de
+   cada arquivo e das partições, impressão digital das entradas)
+
+Se a exportação falhar no meio, nada é publicado e bases/outputs/ continua
+com o conjunto anterior. Cada execução prepara os arquivos na própria pasta
+de staging e publica só os arquivos declarados pelos seus estágios, então
+execuções sobrepostas não publicam arquivos umas das outras. Cada arquivo final carrega no rodapé o run id da
+execução que o gerou (chave scouts_run_id); verify_outputs() confere os
+arquivos publicados contra o manifesto, permitindo que leitores (ex: o
+refresh do Power BI) detectem um conjunto inconsistente.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pyarrow.parquet as pq
+
+from . import RUN_ID_ENV, get_base_dir, get_run_id
+from .steps import MANIFEST_FILE, STAGING, staging_path
+
+
+STAGING_DIR = STAGING
+RUN_ID_KEY = "scouts_run_id"
+
+# Arquivo publicado → colunas obrigatórias
+PUBLISHED_FILES = {
+    "consolidated_overall.parquet": ["unique_key", "player_id", "competition_id", "overall_score"],
+    "consolidated_weights.parquet": ["INDICADOR"],
+    "consolidated_context.parquet": ["unique_key", "player_id", "competition_id"],
+    "consolidated_normalized.parquet": ["unique_key", "player_id", "competition_id"],
+    "consolidated_normalized_long.parquet": ["unique_key", "indicator_id", "value"],
+    "consolidated_similar.parquet": ["unique_key", "rank", "similar_unique_key", "score"],
+    "consolidated_leaderboards.parquet": ["competition_id", "mapped_position", "score_column", "rank", "unique_key"],
+    "consolidated_percentile_cutoffs.parquet": ["competition_id", "mapped_position", "score_column", "n_players"],
+}
+
+# Arquivos com uma linha por registro de jogador (mesmo total que a base com tendências)
+PLAYER_FILES = ["consolidated_overall.parquet", "consolidated_context.parquet", "consolidated_normalized.parquet"]
+PLAYER_SOURCE = "_temp_scouts_with_trends.parquet"
+
+# Pastas de staging de outras execuções mais antigas que isso são removidas
+# (execuções que falharam antes da publicação)
+STALE_STAGING_HOURS = 24
+
+
+def staging_dir(output_dir: Path) -> Path:
+    """Pasta onde a exportação da execução atual prepara os arquivos (_staging/<run id>)"""
+    path = Path(output_dir) / staging_path()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def declared_files() -> List[str]:
+    """Arquivos declarados pelo estágio publish (os opcionais conforme o config.yaml)"""
+    from .steps import get_steps
+
+    return [output for step in get_steps() if step.id == "publish"
+            for output in step.outputs if output != MANIFEST_FILE]
+
+
+def read_run_id(path: Path) -> Optional[str]:
+    """Run id gravado no rodapé de um parquet (None se ausente)"""
+    metadata = pq.read_schema(path).metadata or {}
+    value = metadata.get(RUN_ID_KEY.encode("utf-8"))
+    return value.decode("utf-8") if value is not None else None
+
+
+def describe_file(path: Path) -> Dict[str, Any]:
+    """Linhas, colunas, tamanho, hash e run id de um parquet (lê só o rodapé + hash do arquivo)"""
+    from .checkpoints import hash_file
+
+    metadata = pq.read_metadata(path)
+    return {
+        "run_id": read_run_id(path),
+        "rows": metadata.num_rows,
+        "columns": metadata.num_columns,
+        "size_bytes": path.stat().st_size,
+        "blake2b": hash_file(path),
+    }
+
+
+def verify_staged(output_dir: Path, filenames: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Verifica os arquivos preparados antes de publicar.
+
+    Raises:
+        ValueError: se algum arquivo estiver ausente, ilegível ou inconsistente
+
+    Returns:
+        dict arquivo → describe_file()
+    """
+    output_dir = Path(output_dir)
+    staging = output_dir / staging_path()
+    expected_rows = None
+    if (output_dir / PLAYER_SOURCE).exists():
+        expected_rows = pq.read_metadata(output_dir / PLAYER_SOURCE).num_rows
+
+    problems = []
+    described = {}
+    for filename in filenames:
+        path = staging / filename
+        if not path.exists():
+            problems.append(f"{filename}: arquivo não preparado")
+            continue
+
+        try:
+            info = describe_file(path)
+            names = pq.read_schema(path).names
+        except Exception as e:
+            problems.append(f"{filename}: parquet ilegível ({type(e).__name__}: {e})")
+            continue
+
+        missing = [col for col in PUBLISHED_FILES.get(filename, []) if col not in names]
+        if missing:
+            problems.append(f"{filename}: colunas obrigatórias ausentes {missing}")
+        if info["rows"] == 0:
+            problems.append(f"{filename}: nenhuma linha")
+        if filename in PLAYER_FILES and expected_rows is not None and info["rows"] != expected_rows:
+            problems.append(f"{filename}: {info['rows']} linhas, esperado {expected_rows}")
+
+        described[filename] = info
+
+    from .datasets import staged_datasets, verify_partitioned
+    for name in staged_datasets(staging):
+        rows = described.get(f"{name}.parquet", {}).get("rows")
+        problems.extend(verify_partitioned(output_dir, staging, name, rows))
+
+    if problems:
+        raise ValueError("Verificação antes da publicação falhou:\n  - " + "\n  - ".join(problems))
+
+    return described
+
+
+def _input_fingerprints(base_dir: Path) -> Dict[str, str]:
+    """Hash dos arquivos de entrada da pipeline (scouts, pesos, nacionalidades, config)"""
+    from .checkpoints import CheckpointStore
+    from .steps import OUTPUTS, get_steps
+
+    store = CheckpointStore(base_dir)
+    patterns = [pattern for step in get_steps() for pattern in step.inputs if not pattern.startswith(OUTPUTS)]
+    return store.file_hashes(dict.fromkeys(patterns))
+
+
+def _write_json_atomic(data: Dict[str, Any], path: Path):
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+
+def _remove_staging(output_dir: Path, staging: Path):
+    """Remove a pasta de staging publicada e as de execuções antigas que falharam"""
+    shutil.rmtree(staging, ignore_errors=True)
+    root = Path(output_dir) / STAGING_DIR
+    limit = datetime.now().timestamp() - STALE_STAGING_HOURS * 3600
+    for path in root.iterdir() if root.exists() else []:
+        try:
+            if path.is_file():
+                # Arquivos soltos em _staging/ (layout anterior, sem pasta por execução)
+                path.unlink()
+            elif path.stat().st_mtime < limit:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def discard_staging(output_dir: Path) -> bool:
+    """
+    Remove a pasta de staging de uma execução que terminou sem o estágio
+    publish (ex: --only export_weights), que ninguém mais publicaria.
+
+    Com SCOUTS_RUN_ID definido a pasta é mantida: outra execução com o mesmo
+    identificador conclui a publicação (--only publish).
+
+    Returns:
+        True se a pasta foi removida
+    """
+    staging = Path(output_dir) / staging_path()
+    if os.environ.get(RUN_ID_ENV) or not staging.exists():
+        return False
+    shutil.rmtree(staging, ignore_errors=True)
+    return True
+
+
+def publish(output_dir: Path, filenames: List[str]) -> Dict[str, Any]:
+    """
+    Publica os arquivos preparados em _staging/<run id>/ e grava o manifesto.
+
+    Os arquivos são movidos com os.replace (mesmo disco: troca atômica) e os
+    datasets particionados preparados na mesma pasta são promovidos em
+    seguida; por fim a pasta de staging da execução é removida.
+
+    Args:
+        output_dir: bases/outputs
+        filenames: arquivos a publicar (os declarados pelos estágios da execução)
+
+    Returns:
+        dict do manifesto gravado
+    """
+    from .datasets import DATASETS_DIR, PARTITIONS_FILE, promote_partitioned, staged_datasets
+    from .checkpoints import hash_file
+
+    output_dir = Path(output_dir)
+    staging = output_dir / staging_path()
+
+    described = verify_staged(output_dir, filenames)
+
+    for filename in filenames:
+        os.replace(staging / filename, output_dir / filename)
+
+    datasets = {}
+    for name in staged_datasets(staging):
+        stats = promote_partitioned(output_dir, staging, name)
+        state_file = output_dir / DATASETS_DIR / name / PARTITIONS_FILE
+        with open(state_file, "r", encoding="utf-8") as f:
+            partitions = json.load(f)["partitions"]
+        datasets[name] = {
+            "rows": sum(info["rows"] for info in partitions.values()),
+            "written": len(stats.written),
+            "removed": len(stats.removed),
+            "partitions": {relative: info["hash"] for relative, info in partitions.items()},
+            "blake2b": hash_file(state_file),
+        }
+
+    # Manifesto por último: descreve o conjunto publicado por esta execução
+    manifest = {
+        "run_id": get_run_id(),
+        "published_at": datetime.now().isoformat(timespec="seconds"),
+        "files": {filename: described[filename] for filename in PUBLISHED_FILES if filename in described},
+        "datasets": datasets,
+        "inputs": _input_fingerprints(output_dir.parent.parent),
+    }
+    _write_json_atomic(manifest, output_dir / MANIFEST_FILE)
+    _remove_staging(output_dir, staging)
+    return manifest
+
+
+def read_manifest(output_dir: Path) -> Optional[Dict[str, Any]]:
+    """Lê o _manifest.json (None se não existir)"""
+    manifest_file = Path(output_dir) / MANIFEST_FILE
+    if not manifest_file.exists():
+        return None
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_outputs(output_dir: Path, check_hash: bool = False) -> List[str]:
+    """
+    Confere os arquivos publicados contra o manifesto.
+
+    Args:
+        output_dir: bases/outputs
+        check_hash: também recalcular o hash de cada arquivo (mais lento)
+
+    Returns:
+        lista de problemas (vazia se o conjunto estiver consistente)
+    """
+    output_dir = Path(output_dir)
+    manifest = read_manifest(output_dir)
+    if manifest is None:
+        return [f"{MANIFEST_FILE} não encontrado"]
+
+    problems = []
+    for filename, expected in manifest["files"].items():
+        path = output_dir / filename
+        if not path.exists():
+            problems.append(f"{filename}: ausente")
+            continue
+        try:
+            run_id = read_run_id(path)
+            rows = pq.read_metadata(path).num_rows
+        except Exception as e:
+            problems.append(f"{filename}: parquet ilegível ({type(e).__name__}: {e})")
+            continue
+        if run_id != expected["run_id"]:
+            problems.append(f"{filename}: run id {run_id}, manifesto {expected['run_id']}")
+        if rows != expected["rows"]:
+            problems.append(f"{filename}: {rows} linhas, manifesto {expected['rows']}")
+        if check_hash:
+            from .checkpoints import hash_file
+            if hash_file(path) != expected["blake2b"]:
+                problems.append(f"{filename}: conteúdo difere do manifesto")
+
+    from .datasets import DATASETS_DIR, PARTITIONS_FILE, PART_FILE
+    from .checkpoints import hash_file
+    for name, expected in manifest.get("datasets", {}).items():
+        dataset_dir = output_dir / DATASETS_DIR / name
+        if not (dataset_dir / PARTITIONS_FILE).exists():
+            problems.append(f"datasets/{name}: {PARTITIONS_FILE} ausente")
+            continue
+        if hash_file(dataset_dir / PARTITIONS_FILE) != expected["blake2b"]:
+            problems.append(f"datasets/{name}: partições diferentes das do manifesto")
+        missing = [relative for relative in expected["partitions"] if not (dataset_dir / relative / PART_FILE).exists()]
+        if missing:
+            problems.append(f"datasets/{name}: {len(missing)} partição(ões) ausente(s), ex: {missing[0]}")
+
+    return problems
+
+
+def run() -> bool:
+    """
+    Executa a publicação dos arquivos finais.
+
+    Returns:
+        bool: True se sucesso, False se erro
+    """
+    try:
+        print("=" * 70)
+        print("ETAPA 6/6: PUBLICAÇÃO DOS ARQUIVOS FINAIS")
+        print("=" * 70)
+        print()
+
+        OUTPUT_DIR = get_base_dir() / "bases" / "outputs"
+
+        print("[1/2] Verificando arquivos preparados...")
+        manifest = publish(OUTPUT_DIR, declared_files())
+
+        print("\n[2/2] Arquivos publicados:")
+        for filename, info in manifest["files"].items():
+            print(f"  ✓ {filename}: {info['rows']} linhas, {info['columns']} colunas (run {info['run_id']})")
+        for name, info in manifest["datasets"].items():
+            print(f"  ✓ datasets/{name}/: {len(info['partitions'])} partições "
+                  f"({info['written']} gravadas, {info['removed']} removidas)")
+        print(f"  ✓ Manifesto: {MANIFEST_FILE} (run {manifest['run_id']})")
+        print()
+
+        return True
+
+    except Exception as e:
+        print(f"\n✗ ERRO na publicação: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    run()
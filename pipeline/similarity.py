@@ -0,0 +1,419 @@
+"""
+Busca de Jogadores Similares
+
+Este módulo realiza:
+1. Montagem de uma matriz compacta (float32) com os indicadores _norm dos
+   registros atuais (v_current), separada por posição (mapped_position)
+2. Ponderação pelos pesos da posição em base_peso.xlsx: cada indicador entra
+   multiplicado por √peso, então a distância euclidiana fica ponderada pelo
+   peso e indicadores sem peso na posição ficam de fora
+3. Consulta top-k por similaridade de cosseno ou distância euclidiana com
+   multiplicação de matrizes (várias consultas em lote de uma vez)
+4. Persistência do índice em bases/outputs/_similarity_index.npz, carregado
+   em milissegundos para consultas repetidas
+5. Estágio da pipeline (run) que grava o índice e a tabela
+   consolidated_similar.parquet com os top-k similares de todos os registros
+   atuais, calculada em blocos de consultas (memória limitada)
+
+Os valores são centrados na média da posição antes do cosseno (o que
+importa é o perfil acima/abaixo da média, não o nível absoluto); indicador
+nulo vira a média da posição.
+
+Uso:
+    index = SimilarityIndex.build(df, weights_dict)
+    index.save(output_dir / INDEX_FILE)
+    index = SimilarityIndex.load(output_dir / INDEX_FILE)
+    index.query("11000_11_8", k=10, metric="cosine")
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import get_base_dir, get_run_id, load_settings
+from .steps import SIMILAR_FILE, SIMILARITY_INDEX_FILE as INDEX_FILE
+
+
+SOURCE_FILE = "_temp_scouts_scored.parquet"
+WEIGHTS_MAP_FILE = "_temp_weights_map.json"
+METRICS = ("cosine", "euclidean")
+
+DEFAULT_SIMILARITY_SETTINGS = {
+    "enabled": True,
+    "k": 10,
+    "metric": "cosine",
+    "block_size": 2048,
+}
+
+# Colunas de identificação guardadas no índice (exibidas nos resultados)
+INFO_COLUMNS = ["player_id", "player_name", "team_name", "competition_name", "mapped_position", "overall_score"]
+
+_STRING_INFO = ["player_name", "team_name", "competition_name", "mapped_position"]
+
+
+def position_weights(weights_dict: Dict[str, Dict[str, float]], position: str,
+                     indicadores: Iterable[str]) -> Dict[str, float]:
+    """Indicadores com peso > 0 na posição (na ordem de indicadores) → peso"""
+    weights = {}
+    for indicador in indicadores:
+        weight = float(weights_dict.get(indicador, {}).get(position, 0) or 0)
+        if weight > 0:
+            weights[indicador] = weight
+    return weights
+
+
+class SimilarityIndex:
+    """
+    Índice de similaridade por posição.
+
+    Os registros ficam ordenados por posição; a posição i ocupa as linhas
+    offsets[i]:offsets[i + 1] de keys/info e tem sua própria matriz
+    (registros x indicadores ponderados da posição).
+    """
+
+    def __init__(self, keys: np.ndarray, info: pd.DataFrame, positions: List[str], offsets: np.ndarray,
+                 matrices: List[np.ndarray], indicators: List[List[str]], source: Optional[Dict] = None):
+        self.keys = keys
+        self.info = info
+        self.positions = positions
+        self.offsets = offsets
+        self.matrices = matrices
+        self.indicators = indicators
+        self.source = source or {}
+        self._row_of = {key: i for i, key in enumerate(keys)}
+
+        # Pré-calculados para as consultas: linhas unitárias (cosseno) e ||x||² (euclidiana)
+        self._norms = [np.linalg.norm(m, axis=1) for m in matrices]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._units = [np.where(n[:, np.newaxis] > 0, m / n[:, np.newaxis], 0).astype(np.float32)
+                           for m, n in zip(matrices, self._norms)]
+        self._squares = [(n.astype(np.float64) ** 2) for n in self._norms]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, weights_dict: Dict[str, Dict[str, float]],
+              indicadores: Optional[List[str]] = None, source: Optional[Dict] = None) -> "SimilarityIndex":
+        """
+        Monta o índice a partir da base com colunas _norm.
+
+        Args:
+            df: base com unique_key, mapped_position, v_current e <indicador>_norm
+            weights_dict: indicador → {posição: peso} (_temp_weights_map.json)
+            indicadores: indicadores considerados (None = todos de weights_dict)
+            source: identificação da base de origem, gravada junto do índice
+        """
+        if indicadores is None:
+            indicadores = list(weights_dict)
+        indicadores = [ind for ind in indicadores if f"{ind}_norm" in df.columns]
+
+        current = df
+        if "v_current" in df.columns:
+            current = df[df["v_current"].fillna(False).astype(bool)]
+        current = current[current["mapped_position"].notna()]
+        current = current.drop_duplicates("unique_key").sort_values(["mapped_position", "unique_key"])
+
+        positions, offsets, matrices, position_indicators = [], [0], [], []
+        for position, group in current.groupby("mapped_position", sort=True):
+            weights = position_weights(weights_dict, position, indicadores)
+            cols = list(weights)
+            values = group[[f"{ind}_norm" for ind in cols]].to_numpy(dtype=np.float64)
+
+            # Centrar na média da posição; nulo = média (0 depois de centrar)
+            with np.errstate(invalid="ignore"):
+                means = np.nanmean(values, axis=0) if len(cols) else np.zeros(0)
+            means = np.nan_to_num(means, nan=0.0)
+            centered = np.nan_to_num(values - means, nan=0.0)
+            scale = np.sqrt(np.array([weights[ind] for ind in cols], dtype=np.float64))
+
+            positions.append(str(position))
+            offsets.append(offsets[-1] + len(group))
+            matrices.append((centered * scale).astype(np.float32))
+            position_indicators.append(cols)
+
+        info = current.reindex(columns=INFO_COLUMNS).reset_index(drop=True)
+        keys = current["unique_key"].astype(str).to_numpy(dtype=str)
+        return cls(keys, info, positions, np.array(offsets, dtype=np.int64), matrices,
+                   position_indicators, source)
+
+    def save(self, path: Path):
+        """Grava o índice em .npz (sem pickle), com troca atômica"""
+        path = Path(path)
+        arrays = {
+            "keys": self.keys.astype(str),
+            "positions": np.array(self.positions, dtype=str),
+            "offsets": self.offsets,
+            "source": np.array(json.dumps(self.source)),
+        }
+        for col in INFO_COLUMNS:
+            values = self.info[col]
+            if col in _STRING_INFO:
+                arrays[f"info_{col}"] = values.fillna("").astype(str).to_numpy(dtype=str)
+            else:
+                arrays[f"info_{col}"] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+        for i, (matrix, cols) in enumerate(zip(self.matrices, self.indicators)):
+            arrays[f"matrix_{i}"] = matrix
+            arrays[f"indicators_{i}"] = np.array(cols, dtype=str)
+
+        tmp_file = path.with_name(f".{path.name}.tmp")
+        with open(tmp_file, "wb") as f:
+            np.savez(f, **arrays)
+        tmp_file.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SimilarityIndex":
+        """Carrega um índice gravado por save()"""
+        with np.load(path, allow_pickle=False) as data:
+            positions = [str(p) for p in data["positions"]]
+            info = pd.DataFrame({col: data[f"info_{col}"] for col in INFO_COLUMNS})
+            for col in _STRING_INFO:
+                info[col] = info[col].replace("", None)
+            info["player_id"] = info["player_id"].astype("Int64")
+            return cls(
+                data["keys"],
+                info,
+                positions,
+                data["offsets"],
+                [data[f"matrix_{i}"] for i in range(len(positions))],
+                [[str(c) for c in data[f"indicators_{i}"]] for i in range(len(positions))],
+                json.loads(str(data["source"])),
+            )
+
+    def _locate(self, unique_key: str):
+        """Posição (índice em self.positions) e linha local de um registro"""
+        row = self._row_of.get(str(unique_key))
+        if row is None:
+            raise KeyError(f"unique_key não encontrado no índice (apenas registros atuais): {unique_key}")
+        p = int(np.searchsorted(self.offsets, row, side="right") - 1)
+        return p, row - int(self.offsets[p])
+
+    def find(self, text: str) -> pd.DataFrame:
+        """Registros cujo nome contém o texto (sem diferenciar maiúsculas)"""
+        mask = self.info["player_name"].fillna("").str.contains(text, case=False, regex=False)
+        return self.info[mask].assign(unique_key=self.keys[mask.to_numpy()])
+
+    def query_many(self, unique_keys: Iterable[str], k: int = 10, metric: str = "cosine") -> pd.DataFrame:
+        """
+        Top-k similares de vários registros (mesma posição), em lote por posição.
+
+        Returns:
+            DataFrame com query_key, rank, unique_key, similarity (cosseno) ou
+            distance (euclidiana) e as colunas de INFO_COLUMNS
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrica inválida: {metric} (opções: {', '.join(METRICS)})")
+
+        by_position: Dict[int, List] = {}
+        for key in unique_keys:
+            p, local = self._locate(key)
+            by_position.setdefault(p, []).append((str(key), local))
+
+        frames = []
+        for p, queries in by_position.items():
+            local_rows = np.array([local for _, local in queries])
+            frames.append(self._top_k(p, local_rows, [key for key, _ in queries], k, metric))
+
+        if not frames:
+            return pd.DataFrame(columns=["query_key", "rank", "unique_key", "similarity"] + INFO_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def query(self, unique_key: str, k: int = 10, metric: str = "cosine") -> pd.DataFrame:
+        """Top-k similares de um registro (ver query_many)"""
+        return self.query_many([unique_key], k, metric).drop(columns="query_key")
+
+    def top_k_all(self, k: int = 10, metric: str = "cosine", block_size: int = 2048) -> pd.DataFrame:
+        """
+        Top-k similares de todos os registros do índice.
+
+        Posição a posição, em blocos de block_size consultas: a memória de
+        cada passo fica limitada a block_size x registros da posição.
+
+        Returns:
+            mesmo formato de query_many
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrica inválida: {metric} (opções: {', '.join(METRICS)})")
+        block_size = max(1, int(block_size))
+
+        frames = []
+        for p in range(len(self.positions)):
+            start, n = int(self.offsets[p]), len(self.matrices[p])
+            for block_start in range(0, n, block_size):
+                local_rows = np.arange(block_start, min(block_start + block_size, n))
+                frame = self._top_k(p, local_rows, list(self.keys[start + local_rows]), k, metric)
+                if not frame.empty:
+                    frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=["query_key", "rank", "unique_key", "similarity"] + INFO_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def _top_k(self, p: int, local_rows: np.ndarray, query_keys: List[str], k: int,
+               metric: str) -> pd.DataFrame:
+        """Consulta em lote dentro de uma posição (uma multiplicação de matrizes)"""
+        n = len(self.matrices[p])
+        if metric == "cosine":
+            units = self._units[p]
+            scores = units[local_rows] @ units.T  # maior = mais similar
+            order_sign = -1.0
+        else:
+            matrix = self.matrices[p].astype(np.float64)
+            squares = self._squares[p]
+            dots = matrix[local_rows] @ matrix.T
+            scores = np.sqrt(np.maximum(squares[local_rows, np.newaxis] + squares[np.newaxis, :] - 2 * dots, 0))
+            order_sign = 1.0
+
+        # O próprio registro não entra no resultado
+        scores = scores.astype(np.float64)
+        scores[np.arange(len(local_rows)), local_rows] = np.nan
+        ranked = np.where(np.isnan(scores), np.inf, order_sign * scores)
+
+        k = max(0, min(k, n - 1))
+        if k == 0:
+            return pd.DataFrame()
+        top = np.argpartition(ranked, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(np.take_along_axis(ranked, top, axis=1), axis=1,
+                                                 kind="stable"), axis=1)
+
+        rows = self.offsets[p] + top.ravel()
+        result = self.info.iloc[rows].reset_index(drop=True)
+        value_col = "similarity" if metric == "cosine" else "distance"
+        result.insert(0, value_col, np.take_along_axis(scores, top, axis=1).ravel())
+        result.insert(0, "unique_key", self.keys[rows])
+        result.insert(0, "rank", np.tile(np.arange(1, k + 1), len(local_rows)))
+        result.insert(0, "query_key", np.repeat(query_keys, k))
+        return result
+
+
+def source_signature(path: Path) -> Dict:
+    """Identificação da base de origem (tamanho + mtime) para saber se o índice está atualizado"""
+    stat = Path(path).stat()
+    return {"file": Path(path).name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_from_outputs(output_dir: Path) -> SimilarityIndex:
+    """Monta o índice a partir dos checkpoints da última execução (_temp_scouts_scored + pesos)"""
+    output_dir = Path(output_dir)
+    source = output_dir / SOURCE_FILE
+    with open(output_dir / WEIGHTS_MAP_FILE, "r") as f:
+        weights_dict = json.load(f)
+
+    norm_cols = [f"{ind}_norm" for ind in weights_dict]
+    import pyarrow.parquet as pq
+    names = pq.read_schema(source).names
+    columns = [c for c in dict.fromkeys(["unique_key", "v_current"] + INFO_COLUMNS + norm_cols) if c in names]
+    df = pd.read_parquet(source, columns=columns)
+    return SimilarityIndex.build(df, weights_dict, source=source_signature(source))
+
+
+def load_index(output_dir: Optional[Path] = None, rebuild: bool = False) -> SimilarityIndex:
+    """
+    Carrega o índice de bases/outputs/, remontando-o se não existir ou se a
+    base de origem mudou desde que foi gravado.
+    """
+    output_dir = Path(output_dir) if output_dir else get_base_dir() / "bases" / "outputs"
+    index_file = output_dir / INDEX_FILE
+
+    if not rebuild and index_file.exists():
+        index = SimilarityIndex.load(index_file)
+        source = output_dir / SOURCE_FILE
+        if not source.exists() or index.source == source_signature(source):
+            return index
+
+    index = build_from_outputs(output_dir)
+    index.save(index_file)
+    return index
+
+
+def get_similarity_settings() -> Dict:
+    """Seção similarity do config.yaml, validada"""
+    settings = load_settings("similarity", DEFAULT_SIMILARITY_SETTINGS)
+    if settings["metric"] not in METRICS:
+        raise ValueError(f"similarity.metric inválida: {settings['metric']} (opções: {', '.join(METRICS)})")
+    if int(settings["k"]) < 1:
+        raise ValueError("similarity.k deve ser maior que zero")
+    return settings
+
+
+def build_similar_table(top_k: pd.DataFrame, metric: str) -> pd.DataFrame:
+    """
+    Formata o resultado de top_k_all para consolidated_similar.
+
+    Colunas: unique_key (jogador de referência), mapped_position, rank,
+    similar_* (jogador similar), score e metric. score é a similaridade de
+    cosseno (maior = mais parecido) ou a distância euclidiana (menor = mais
+    parecido), conforme metric.
+    """
+    value_col = "similarity" if metric == "cosine" else "distance"
+    return pd.DataFrame({
+        "unique_key": top_k["query_key"].to_numpy(),
+        "mapped_position": top_k["mapped_position"].to_numpy(),
+        "rank": top_k["rank"].astype("int32").to_numpy(),
+        "similar_unique_key": top_k["unique_key"].to_numpy(),
+        "similar_player_id": top_k["player_id"].to_numpy(),
+        "similar_player_name": top_k["player_name"].to_numpy(),
+        "similar_team_name": top_k["team_name"].to_numpy(),
+        "similar_competition_name": top_k["competition_name"].to_numpy(),
+        "similar_overall_score": top_k["overall_score"].to_numpy(),
+        "score": top_k[value_col].to_numpy(dtype=np.float64),
+        "metric": pd.Categorical([metric] * len(top_k)),
+    })
+
+
+def run() -> bool:
+    """
+    Executa o estágio de jogadores similares.
+
+    Returns:
+        bool: True se sucesso, False se erro
+    """
+    try:
+        from .parquet_io import write_parquet
+        from .publish import RUN_ID_KEY, staging_dir
+
+        print("=" * 70)
+        print("JOGADORES SIMILARES")
+        print("=" * 70)
+        print()
+
+        OUTPUT_DIR = get_base_dir() / "bases" / "outputs"
+        settings = get_similarity_settings()
+
+        print("[1/3] Montando índice de similaridade...")
+        index = build_from_outputs(OUTPUT_DIR)
+        index.save(OUTPUT_DIR / INDEX_FILE)
+        print(f"  ✓ {len(index)} registros atuais em {len(index.positions)} posições")
+        print(f"  ✓ Índice salvo: {INDEX_FILE}")
+
+        target = staging_dir(OUTPUT_DIR) / SIMILAR_FILE
+        if not settings["enabled"]:
+            # Não deixar uma versão antiga para a publicação
+            if target.exists():
+                target.unlink()
+            print("\n  ⚠ similarity.enabled = false: consolidated_similar não será gerado")
+            print()
+            return True
+
+        k, metric, block_size = int(settings["k"]), settings["metric"], int(settings["block_size"])
+        print(f"\n[2/3] Calculando top-{k} similares ({metric}, blocos de {block_size})...")
+        df_similar = build_similar_table(index.top_k_all(k, metric, block_size), metric)
+        print(f"  ✓ {len(df_similar)} pares")
+
+        print(f"\n[3/3] Gravando {SIMILAR_FILE} (publicação pendente)...")
+        stats = write_parquet(df_similar, target, metadata={RUN_ID_KEY: get_run_id()})
+        print(f"  ✓ {SIMILAR_FILE}: {stats.rows} linhas, {stats.columns} colunas ({stats.describe()})")
+        print()
+
+        return True
+
+    except Exception as e:
+        print(f"\n✗ ERRO no cálculo de similares: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    run()
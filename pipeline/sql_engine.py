@@ -0,0 +1,221 @@
+"""
+Engine "duckdb": operações agrupadas em SQL (DuckDB embarcado)
+
+Com performance.engine = "duckdb", as estatísticas por grupo das etapas
+pesadas são executadas pelo DuckDB (agregações e funções de janela em
+várias threads, com spill em disco quando passam de duckdb_memory_limit_mb):
+
+- normalize_indicators: mínimo/máximo (ou média/desvio) de cada indicador
+  por (mapped_position, competition_id) e, na normalização global, por
+  mapped_position, lidos direto de _temp_scouts_consolidated.parquet
+- calculate_overall: rank_position, rank_overall e rank_global
+  (rank() = method="min" do pandas)
+- export: máximos por (competition_id, position_group) de highlight_color
+  e max_categories
+
+As fórmulas sobre essas estatísticas continuam em numpy (as mesmas da
+engine "fast"), de modo que as saídas são as mesmas das engines pandas
+(validado por scripts/tests/check_equivalence.py --candidate duckdb).
+
+O pacote duckdb é opcional: só é importado quando a engine é usada.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from . import get_base_dir, load_settings
+
+
+DEFAULT_DUCKDB_SETTINGS = {
+    "duckdb_threads": 0,
+    "duckdb_memory_limit_mb": 0,
+}
+
+# Pasta (em bases/outputs) para o spill em disco do DuckDB
+TEMP_DIR = "_duckdb_tmp"
+
+ROW_ID = "_row_id"
+
+# Estatística → função de agregação SQL (desvio populacional, como ddof=0)
+AGGREGATES = {
+    "min": "min",
+    "max": "max",
+    "mean": "avg",
+    "std": "stddev_pop",
+}
+
+
+def connect():
+    """
+    Conexão DuckDB em memória configurada pela seção performance do
+    config.yaml (duckdb_threads: 0 = todos os núcleos; duckdb_memory_limit_mb:
+    0 = padrão do DuckDB).
+    """
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("A engine duckdb requer o pacote duckdb (pip install duckdb)") from e
+
+    settings = load_settings("performance", DEFAULT_DUCKDB_SETTINGS)
+    con = duckdb.connect()
+    if int(settings["duckdb_threads"] or 0) > 0:
+        con.execute(f"SET threads = {int(settings['duckdb_threads'])}")
+    if float(settings["duckdb_memory_limit_mb"] or 0) > 0:
+        con.execute(f"SET memory_limit = '{int(settings['duckdb_memory_limit_mb'])}MB'")
+    temp_dir = get_base_dir() / "bases" / "outputs" / TEMP_DIR
+    con.execute(f"SET temp_directory = {literal(str(temp_dir))}")
+    return con
+
+
+def quote(name: str) -> str:
+    """Identificador SQL entre aspas"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def literal(value: str) -> str:
+    """Texto SQL entre aspas simples"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def parquet_source(path: Path) -> str:
+    """Relação SQL do parquet com a posição de cada linha no arquivo (_row_id)"""
+    return (f"(SELECT *, file_row_number AS {ROW_ID} "
+            f"FROM read_parquet({literal(Path(path).as_posix())}, file_row_number = true))")
+
+
+def register_frame(con, name: str, df: pd.DataFrame, columns: Sequence[str]) -> str:
+    """Registra as colunas do DataFrame (Arrow) com a posição de cada linha (_row_id)"""
+    table = pa.Table.from_pandas(df[list(dict.fromkeys(columns))], preserve_index=False)
+    con.register(name, table.append_column(ROW_ID, pa.array(np.arange(len(df), dtype=np.int64))))
+    return name
+
+
+def _fetch(con, sql: str) -> pa.Table:
+    return con.execute(sql).fetch_arrow_table()
+
+
+def _column(table: pa.Table, name: str, dtype=np.float64) -> np.ndarray:
+    return table.column(name).to_numpy(zero_copy_only=False).astype(dtype)
+
+
+def group_stats(con, source: str, partition: Sequence[str], expressions: Sequence[str],
+                stats: Sequence[str] = ("min", "max"), reference: Optional[str] = None,
+                joins: str = "") -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Estatísticas por grupo e o grupo de cada linha, uma coluna por expressão.
+
+    Equivale a min(...) OVER (PARTITION BY ...), mas as agregações saem de um
+    GROUP BY (uma linha por grupo) e só o código do grupo de cada linha volta
+    do DuckDB: estatística[codes] dá o valor por linha, montado só quando
+    usado.
+
+    Com reference (condição SQL), as estatísticas vêm só das linhas da
+    referência quando o grupo tem algum valor de referência para a
+    expressão; senão, do grupo inteiro (mesmo critério de
+    normalize_indicators._reference_values). Valores nulos são ignorados.
+
+    Args:
+        source: relação SQL com a coluna _row_id (parquet_source/register_frame)
+        partition: colunas do grupo (nulo forma um grupo próprio)
+        expressions: expressões SQL dos valores sobre o alias s
+            (ex: TRY_CAST(s."col" AS DOUBLE))
+        stats: estatísticas de AGGREGATES
+        reference: condição SQL das linhas de referência (None = todas)
+        joins: JOINs extras sobre source (alias s)
+
+    Returns:
+        (codes, stats): código do grupo de cada linha (na ordem de _row_id) e
+        dict estatística → np.ndarray (grupos x expressões)
+    """
+    keys = [f"s.{quote(c)}" for c in partition]
+    selects = []
+    for name in stats:
+        func = AGGREGATES[name]
+        for j, expr in enumerate(expressions):
+            column = quote(f"{name}_{j}")
+            if reference is None:
+                selects.append(f"{func}({expr}) AS {column}")
+            else:
+                selects.append(f"CASE WHEN count({expr}) FILTER (WHERE {reference}) > 0 "
+                               f"THEN {func}({expr}) FILTER (WHERE {reference}) ELSE {func}({expr}) END AS {column}")
+
+    key_names = [quote(f"_key_{i}") for i in range(len(keys))]
+    con.execute(
+        f"CREATE OR REPLACE TEMP TABLE _group_stats AS "
+        f"SELECT {', '.join(f'{k} AS {n}' for k, n in zip(keys, key_names))}, "
+        f"row_number() OVER () - 1 AS _group, {', '.join(selects) or 'NULL AS _none'} "
+        f"FROM {source} s {joins} GROUP BY ALL"
+    )
+    try:
+        on = " AND ".join(f"{k} IS NOT DISTINCT FROM g.{n}" for k, n in zip(keys, key_names))
+        codes = _column(_fetch(con, f"SELECT g._group FROM {source} s JOIN _group_stats g ON {on} "
+                                    f"ORDER BY s.{ROW_ID}"), "_group", np.int64)
+        table = _fetch(con, "SELECT * FROM _group_stats ORDER BY _group")
+    finally:
+        con.execute("DROP TABLE IF EXISTS _group_stats")
+
+    per_group = {}
+    for name in stats:
+        per_group[name] = np.empty((table.num_rows, len(expressions)))
+        for j in range(len(expressions)):
+            per_group[name][:, j] = _column(table, f"{name}_{j}")
+    return codes, per_group
+
+
+def window_ranks(con, df: pd.DataFrame, ranks: Dict[str, Tuple[List[str], str]],
+                 ascending: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Rankings dentro de grupos, equivalentes a
+    df.groupby(keys)[score].rank(ascending=..., method="min").
+
+    Args:
+        df: DataFrame com as chaves e os scores
+        ranks: nome do ranking → (colunas do grupo, coluna do score)
+
+    Returns:
+        dict nome → np.ndarray float64 (NaN para score nulo ou chave nula)
+    """
+    columns = [c for keys, score in ranks.values() for c in list(keys) + [score]]
+    source = register_frame(con, "_ranked", df, columns)
+    order = "ASC" if ascending else "DESC"
+    selects = []
+    for name, (keys, score) in ranks.items():
+        missing = " OR ".join(f"{quote(c)} IS NULL" for c in list(keys) + [score])
+        partition = ", ".join(quote(c) for c in keys)
+        selects.append(
+            f"CASE WHEN {missing} THEN NULL ELSE CAST(rank() OVER "
+            f"(PARTITION BY {partition} ORDER BY {quote(score)} {order} NULLS LAST) AS DOUBLE) END "
+            f"AS {quote(name)}"
+        )
+    try:
+        table = _fetch(con, f"SELECT {', '.join(selects)} FROM {source} ORDER BY {ROW_ID}")
+    finally:
+        con.unregister(source)
+    return {name: _column(table, name) for name in ranks}
+
+
+def window_max_flags(con, df: pd.DataFrame, keys: List[str], scores: List[str]) -> Dict[str, np.ndarray]:
+    """
+    True onde o score (não nulo) é o máximo do seu grupo
+    (mesmo resultado de GroupIndex.is_max).
+
+    Returns:
+        dict score → np.ndarray bool
+    """
+    source = register_frame(con, "_flagged", df, list(keys) + list(scores))
+    partition = ", ".join(quote(c) for c in keys)
+    no_null_key = " AND ".join(f"{quote(c)} IS NOT NULL" for c in keys)
+    selects = [
+        f"COALESCE({no_null_key} AND {quote(score)} = max({quote(score)}) OVER (PARTITION BY {partition}), false) "
+        f"AS {quote(score)}"
+        for score in scores
+    ]
+    try:
+        table = _fetch(con, f"SELECT {', '.join(selects)} FROM {source} ORDER BY {ROW_ID}")
+    finally:
+        con.unregister(source)
+    return {score: _column(table, score, bool) for score in scores}
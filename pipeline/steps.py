@@ -0,0 +1,272 @@
+"""
+Definição das etapas da pipeline
+
+Lista única usada pelo main.py e pelos scripts de benchmark, com o
+identificador estável de cada estágio, os arquivos que ele lê e os
+arquivos que ele gera.
+
+- inputs: padrões glob relativos ao diretório base (entradas e checkpoints
+  dos estágios anteriores), usados para validar se um checkpoint está
+  atualizado e para montar o grafo de dependências
+- outputs: arquivos gerados em bases/outputs/ (os estágios de exportação
+  gravam em _staging/<run id>/, uma pasta por execução; o estágio publish
+  publica os consolidated_*.parquet).
+  Arquivos opcionais (normalized_long, similares, leaderboards) só são
+  declarados quando habilitados no config.yaml
+- group: etapa da pipeline à qual o estágio pertence (ex: os quatro
+  estágios de exportação pertencem à etapa "export")
+
+As dependências não são declaradas à mão: um estágio depende de outro
+quando uma de suas entradas é um arquivo gerado por ele.
+"""
+
+import importlib
+from collections import namedtuple
+from fnmatch import fnmatch
+from typing import Dict, Iterable, List, Optional, Set
+
+from . import get_run_id, load_settings
+
+
+Step = namedtuple("Step", ["id", "name", "run", "inputs", "outputs", "group"])
+
+OUTPUTS = "bases/outputs"
+CONFIG_FILE = "config/config.yaml"
+STAGING = "_staging"
+
+# Arquivos dos estágios citados nas entradas/saídas. Ficam aqui (e os módulos
+# dos estágios os importam) para montar o grafo sem importar esses módulos.
+PROFILES_DIR = "bases/inputs/business/profiles"
+SIMILARITY_INDEX_FILE = "_similarity_index.npz"
+LONG_FILE = "consolidated_normalized_long.parquet"
+SIMILAR_FILE = "consolidated_similar.parquet"
+LEADERBOARDS_FILE = "consolidated_leaderboards.parquet"
+CUTOFFS_FILE = "consolidated_percentile_cutoffs.parquet"
+MANIFEST_FILE = "_manifest.json"
+
+
+class StageFunction:
+    """
+    Função run de um estágio, importada só quando é chamada: listar os
+    estágios e planejar a execução não importa pandas/numpy, e cada
+    módulo só é carregado se o seu estágio for executado.
+    """
+
+    def __init__(self, module: str, function: str = "run"):
+        self.module = module
+        self.function = function
+
+    @property
+    def module_name(self) -> str:
+        return f"{__package__}.{self.module}"
+
+    def __call__(self):
+        return getattr(importlib.import_module(self.module_name), self.function)()
+
+    def __repr__(self) -> str:
+        return f"StageFunction({self.module}.{self.function})"
+
+
+def staging_path(run_id: Optional[str] = None) -> str:
+    """Pasta de staging da execução, relativa a bases/outputs (_staging/<run id>)"""
+    return f"{STAGING}/{run_id or get_run_id()}"
+
+
+def stage_modules(steps: List[Step]) -> List[str]:
+    """Módulos dos estágios (nome completo), na ordem dos estágios"""
+    return list(dict.fromkeys(step.run.module_name for step in steps if isinstance(step.run, StageFunction)))
+
+
+def get_steps() -> List[Step]:
+    """
+    Retorna os estágios da pipeline em uma ordem topológica válida.
+
+    Returns:
+        Lista de Step (id, nome, função run, entradas, arquivos gerados, etapa)
+    """
+    with_trends = f"{OUTPUTS}/_temp_scouts_with_trends.parquet"
+    staging = staging_path()
+
+    # Arquivos opcionais, conforme o config.yaml (mesmos padrões dos módulos)
+    long_files = [LONG_FILE] if (load_settings("export", {}).get("normalized_long") or {}).get("enabled") else []
+    similar_files = [SIMILAR_FILE] if load_settings("similarity", {"enabled": True})["enabled"] else []
+    leaderboard_files = ([LEADERBOARDS_FILE, CUTOFFS_FILE]
+                         if load_settings("leaderboards", {"enabled": True})["enabled"] else [])
+
+    published = [f"consolidated_{name}.parquet" for name in ("overall", "weights", "context", "normalized")]
+    published += long_files + similar_files + leaderboard_files
+
+    return [
+        Step("load_scouts", "Carregamento de Scouts", StageFunction("load_data", "run_scouts"),
+             ["bases/inputs/scouts_base/*.xlsx", "bases/inputs/scouts_base/*.parquet",
+              "bases/inputs/business/nacionalidades.xlsx", CONFIG_FILE],
+             ["_temp_scouts_raw.parquet"],
+             "load_data"),
+        Step("load_weights", "Carregamento de Pesos", StageFunction("load_data", "run_weights"),
+             ["bases/inputs/business/base_peso.xlsx"],
+             ["_temp_weights_active.parquet"],
+             "load_data"),
+        Step("prepare_positions", "Mapeamento de Posições", StageFunction("prepare_positions"),
+             [f"{OUTPUTS}/_temp_scouts_raw.parquet", CONFIG_FILE, "config/positions.yaml"],
+             ["_temp_scouts_positions.parquet"],
+             "prepare_positions"),
+        Step("consolidate_players", "Consolidação de Jogadores", StageFunction("consolidate_players"),
+             [f"{OUTPUTS}/_temp_scouts_positions.parquet", CONFIG_FILE],
+             ["_temp_scouts_consolidated.parquet"],
+             "consolidate_players"),
+        Step("normalize_indicators", "Normalização de Indicadores", StageFunction("normalize_indicators"),
+             [f"{OUTPUTS}/_temp_scouts_consolidated.parquet", f"{OUTPUTS}/_temp_weights_active.parquet",
+              CONFIG_FILE],
+             ["_temp_scouts_normalized.parquet", "_temp_weights_map.json", "_temp_indicators_available.json"],
+             "normalize_indicators"),
+        Step("calculate_overall", "Cálculo de Scores", StageFunction("calculate_overall"),
+             [f"{OUTPUTS}/_temp_scouts_normalized.parquet", f"{OUTPUTS}/_temp_weights_map.json",
+              f"{OUTPUTS}/_temp_indicators_available.json", f"{OUTPUTS}/_temp_weights_active.parquet",
+              f"{PROFILES_DIR}/*.xlsx", CONFIG_FILE],
+             ["_temp_scouts_scored.parquet"],
+             "calculate_overall"),
+        Step("calculate_trends", "Cálculo de Tendências", StageFunction("calculate_trends"),
+             [f"{OUTPUTS}/_temp_scouts_scored.parquet", CONFIG_FILE],
+             ["_temp_scouts_with_trends.parquet"],
+             "calculate_trends"),
+        Step("export_overall", "Exportação - Overall", StageFunction("export", "run_overall"),
+             [with_trends, CONFIG_FILE],
+             [f"{staging}/consolidated_overall.parquet"],
+             "export"),
+        Step("export_weights", "Exportação - Pesos", StageFunction("export", "run_weights"),
+             [f"{OUTPUTS}/_temp_weights_active.parquet", CONFIG_FILE],
+             [f"{staging}/consolidated_weights.parquet"],
+             "export"),
+        Step("export_context", "Exportação - Contexto", StageFunction("export", "run_context"),
+             [with_trends, CONFIG_FILE],
+             [f"{staging}/consolidated_context.parquet"],
+             "export"),
+        Step("export_normalized", "Exportação - Normalizados", StageFunction("export", "run_normalized"),
+             [with_trends, CONFIG_FILE],
+             [f"{staging}/consolidated_normalized.parquet"] + [f"{staging}/{f}" for f in long_files],
+             "export"),
+        Step("similar_players", "Jogadores Similares", StageFunction("similarity"),
+             [f"{OUTPUTS}/_temp_scouts_scored.parquet", f"{OUTPUTS}/_temp_weights_map.json", CONFIG_FILE],
+             [f"{staging}/{f}" for f in similar_files] + [SIMILARITY_INDEX_FILE],
+             "similarity"),
+        Step("leaderboards", "Leaderboards", StageFunction("leaderboards"),
+             [f"{OUTPUTS}/_temp_scouts_scored.parquet", CONFIG_FILE],
+             [f"{staging}/{f}" for f in leaderboard_files],
+             "leaderboards"),
+        Step("publish", "Publicação", StageFunction("publish"),
+             [f"{OUTPUTS}/{staging}/consolidated_*.parquet", with_trends],
+             published + [MANIFEST_FILE],
+             "export"),
+    ]
+
+
+def build_dependencies(steps: List[Step]) -> Dict[str, List[str]]:
+    """
+    Monta o grafo de dependências a partir das entradas/saídas declaradas.
+
+    Returns:
+        dict id → ids dos estágios dos quais ele depende
+    """
+    producers = {}
+    for step in steps:
+        for output in step.outputs:
+            producers[f"{OUTPUTS}/{output}"] = step.id
+
+    dependencies = {}
+    for step in steps:
+        deps = []
+        for pattern in step.inputs:
+            for path, producer in producers.items():
+                if producer != step.id and producer not in deps and fnmatch(path, pattern):
+                    deps.append(producer)
+        dependencies[step.id] = deps
+
+    return dependencies
+
+
+def ancestors(dependencies: Dict[str, List[str]], step_ids: Iterable[str]) -> Set[str]:
+    """Estágios dos quais os estágios informados dependem (direta ou indiretamente)"""
+    found = set()
+    pending = list(step_ids)
+    while pending:
+        for dep in dependencies[pending.pop()]:
+            if dep not in found:
+                found.add(dep)
+                pending.append(dep)
+    return found
+
+
+def descendants(dependencies: Dict[str, List[str]], step_ids: Iterable[str]) -> Set[str]:
+    """Estágios que dependem (direta ou indiretamente) dos estágios informados"""
+    dependents = {step_id: [] for step_id in dependencies}
+    for step_id, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(step_id)
+
+    found = set()
+    pending = list(step_ids)
+    while pending:
+        for child in dependents[pending.pop()]:
+            if child not in found:
+                found.add(child)
+                pending.append(child)
+    return found
+
+
+def resolve_steps(steps: List[Step], identifier: str) -> List[Step]:
+    """
+    Encontra estágios pelo id ("load_scouts"), pela etapa ("export") ou pelo
+    número da etapa ("6" / "06", na ordem em que as etapas aparecem).
+
+    Raises:
+        ValueError: se não houver estágio correspondente
+    """
+    for step in steps:
+        if step.id == identifier:
+            return [step]
+
+    groups = list(dict.fromkeys(step.group for step in steps))
+    if identifier.isdigit() and 1 <= int(identifier) <= len(groups):
+        identifier = groups[int(identifier) - 1]
+
+    matches = [step for step in steps if step.group == identifier]
+    if matches:
+        return matches
+
+    valid = ", ".join(f"{i}={group}" for i, group in enumerate(groups, 1))
+    raise ValueError(f"Etapa inválida: {identifier} (etapas: {valid}; ou o id de um estágio)")
+
+
+def select_steps(steps: List[Step], from_step: Optional[str] = None,
+                 to_step: Optional[str] = None, only_step: Optional[str] = None) -> Set[str]:
+    """
+    Resolve --from/--to/--only para o conjunto de ids selecionados.
+
+    - --only: somente os estágios indicados
+    - --from: os estágios indicados e tudo que depende deles
+    - --to: os estágios indicados e tudo de que eles dependem
+    - sem argumentos: todos os estágios
+
+    Raises:
+        ValueError: se a combinação for inválida ou não selecionar nada
+    """
+    if only_step:
+        if from_step or to_step:
+            raise ValueError("--only não pode ser combinado com --from/--to")
+        return {step.id for step in resolve_steps(steps, only_step)}
+
+    dependencies = build_dependencies(steps)
+    selected = {step.id for step in steps}
+
+    if from_step:
+        start = {step.id for step in resolve_steps(steps, from_step)}
+        selected &= start | descendants(dependencies, start)
+
+    if to_step:
+        end = {step.id for step in resolve_steps(steps, to_step)}
+        selected &= end | ancestors(dependencies, end)
+
+    if not selected:
+        raise ValueError(f"Nenhum estágio entre --from {from_step} e --to {to_step}")
+
+    return selected
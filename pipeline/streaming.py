@@ -0,0 +1,290 @@
+"""
+Execução em Lotes (streaming) para Bases Grandes
+
+Com streaming.enabled no config.yaml (ou SCOUTS_STREAMING=1), as etapas
+que são locais por linha não carregam a base inteira:
+
+- load_scouts (em memória) grava _temp_scouts_raw em row groups do tamanho
+  de um lote, para a leitura em lotes das etapas seguintes
+- prepare_positions: mapeamento de posições lote a lote
+- consolidate_players: chave única e nome lote a lote; v_current e a ordem
+  final (mais recente primeiro) saem de uma primeira passada só com as
+  colunas de chave e data
+- normalize_indicators: duas passadas, a primeira acumulando as
+  estatísticas de cada grupo (mínimo/máximo, média/desvio) e a segunda
+  normalizando lote a lote
+- calculate_overall: scores lote a lote; os rankings saem de uma leitura
+  só das colunas de grupo e score
+
+O tamanho do lote sai de streaming.memory_budget_mb e do tamanho médio de
+uma linha no parquet de entrada (ou de streaming.batch_rows, se definido).
+As saídas são as mesmas da execução em memória (validado por
+scripts/tests/check_equivalence.py --compare-dirs).
+
+Este módulo reúne o que as etapas compartilham: leitura em lotes com os
+mesmos tipos da leitura do arquivo inteiro, escrita incremental e
+estatísticas agrupadas combináveis entre lotes.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import load_settings
+
+
+# Variável de ambiente que sobrescreve streaming.enabled do config.yaml
+STREAMING_ENV = "SCOUTS_STREAMING"
+
+DEFAULT_STREAMING_SETTINGS = {
+    "enabled": False,
+    "memory_budget_mb": 512,
+    "batch_rows": None,
+}
+
+# Memória de um lote no pandas em relação ao tamanho descomprimido no parquet
+# (strings como objetos Python, cópias intermediárias das etapas)
+MEMORY_FACTOR = 8
+MIN_BATCH_ROWS = 1000
+
+
+def get_streaming_settings() -> dict:
+    """Seção streaming do config.yaml; SCOUTS_STREAMING (0/1) tem prioridade sobre enabled"""
+    settings = load_settings("streaming", DEFAULT_STREAMING_SETTINGS)
+    if os.environ.get(STREAMING_ENV):
+        settings["enabled"] = os.environ[STREAMING_ENV].strip().lower() not in ("0", "false", "no", "")
+    if float(settings["memory_budget_mb"] or 0) <= 0:
+        raise ValueError("streaming.memory_budget_mb deve ser maior que zero")
+    return settings
+
+
+def streaming_enabled() -> bool:
+    return bool(get_streaming_settings()["enabled"])
+
+
+def batch_rows(path: Path, settings: Optional[dict] = None) -> int:
+    """
+    Linhas por lote para ler o parquet dentro do orçamento de memória.
+
+    Usa o tamanho descomprimido médio de uma linha (metadados dos row groups)
+    vezes MEMORY_FACTOR; streaming.batch_rows, se definido, tem prioridade.
+    """
+    settings = settings or get_streaming_settings()
+    if settings.get("batch_rows"):
+        return max(1, int(settings["batch_rows"]))
+
+    metadata = pq.ParquetFile(path).metadata
+    uncompressed = sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+    bytes_per_row = max(uncompressed / max(metadata.num_rows, 1), 1.0)
+    budget = float(settings["memory_budget_mb"]) * 1024 ** 2
+    return max(MIN_BATCH_ROWS, int(budget / (bytes_per_row * MEMORY_FACTOR)))
+
+
+def row_group_rows(df: pd.DataFrame, settings: Optional[dict] = None) -> int:
+    """
+    Linhas por row group ao gravar, em memória, uma base que as etapas
+    seguintes vão ler em lotes (lote = row group: um row group maior que o
+    orçamento teria de ser descomprimido inteiro).
+    """
+    settings = settings or get_streaming_settings()
+    if settings.get("batch_rows"):
+        return max(1, int(settings["batch_rows"]))
+
+    bytes_per_row = max(df.memory_usage(index=False, deep=True).sum() / max(len(df), 1), 1.0)
+    budget = float(settings["memory_budget_mb"]) * 1024 ** 2
+    return max(MIN_BATCH_ROWS, int(budget / bytes_per_row))
+
+
+def _columns_with_nulls(parquet_file: pq.ParquetFile) -> set:
+    """Colunas com algum nulo no arquivo (estatísticas dos row groups; sem estatística = pode ter)"""
+    metadata = parquet_file.metadata
+    with_nulls = set()
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        for j in range(row_group.num_columns):
+            column = row_group.column(j)
+            stats = column.statistics
+            if stats is None or not stats.has_null_count or stats.null_count > 0:
+                with_nulls.add(column.path_in_schema)
+    return with_nulls
+
+
+def read_batches(path: Path, rows: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê o parquet em lotes de até rows linhas.
+
+    Cada lote tem os mesmos tipos que pd.read_parquet do arquivo inteiro daria
+    (inteiro/booleano com nulo em qualquer parte do arquivo vira float/object
+    em todos os lotes) e índice contínuo com a posição da linha no arquivo.
+    """
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    with_nulls = _columns_with_nulls(parquet_file)
+    names = columns or schema.names
+    to_float = [c for c in names if c in with_nulls and pa.types.is_integer(schema.field(c).type)]
+    to_object = [c for c in names if c in with_nulls and pa.types.is_boolean(schema.field(c).type)]
+
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=rows, columns=columns):
+        df = batch.to_pandas()
+        for col in to_float:
+            df[col] = df[col].astype("float64")
+        for col in to_object:
+            df[col] = df[col].astype(object)
+        df.index = pd.RangeIndex(start, start + len(df))
+        start += len(df)
+        yield df
+
+
+class ChunkWriter:
+    """
+    Escrita incremental de lotes em um único arquivo (parquet ou Arrow IPC).
+
+    O esquema é fixado no primeiro lote; colunas sem nenhum valor nesse lote
+    recebem o tipo de base_schema (ou string). O arquivo é gravado com nome
+    temporário e só substitui o destino em close() (sem arquivo pela metade
+    se a etapa falhar).
+    """
+
+    def __init__(self, path: Path, base_schema: Optional[pa.Schema] = None, fmt: str = "parquet"):
+        self.path = Path(path)
+        self.base_schema = base_schema
+        self.fmt = fmt
+        self.rows = 0
+        self.schema = None
+        self._writer = None
+        self._sink = None
+        self._tmp = self.path.parent / f".{self.path.name}.{os.getpid()}.tmp"
+
+    def _resolve_schema(self, table: pa.Table) -> pa.Schema:
+        fields = []
+        for field in table.schema:
+            if pa.types.is_null(field.type):
+                base = self.base_schema
+                type_ = (base.field(field.name).type
+                         if base is not None and field.name in base.names
+                         and not pa.types.is_null(base.field(field.name).type) else pa.string())
+                field = field.with_type(type_)
+            fields.append(field)
+        return pa.schema(fields, metadata=table.schema.metadata)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.schema is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.schema = self._resolve_schema(table)
+            table = table.cast(self.schema)
+            if self.fmt == "ipc":
+                self._sink = pa.OSFile(str(self._tmp), "wb")
+                self._writer = pa.ipc.new_file(self._sink, self.schema)
+            else:
+                self._writer = pq.ParquetWriter(str(self._tmp), self.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self.write_table(table)
+
+    def write_table(self, table: pa.Table) -> None:
+        if self._writer is None:
+            self.schema = table.schema
+            self._writer = pq.ParquetWriter(str(self._tmp), self.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        if self._writer is None:
+            raise ValueError(f"Nenhum lote gravado em {self.path.name}")
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            finally:
+                if self._sink is not None:
+                    self._sink.close()
+        if self._tmp.exists():
+            self._tmp.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class GroupStats:
+    """
+    Estatísticas por grupo e coluna acumuladas lote a lote: contagem,
+    mínimo, máximo, média e soma dos quadrados dos desvios (M2), combinadas
+    entre lotes pela fórmula de Chan et al. (estável, sem somar quadrados).
+    """
+
+    def __init__(self, n_columns: int):
+        self.n_columns = n_columns
+        self.keys = pd.Index([], dtype=object)
+        self.count = np.zeros((0, n_columns))
+        self.min = np.zeros((0, n_columns))
+        self.max = np.zeros((0, n_columns))
+        self.mean = np.zeros((0, n_columns))
+        self.m2 = np.zeros((0, n_columns))
+
+    def _grow(self, keys) -> None:
+        new_keys = pd.Index(pd.unique(np.asarray(keys, dtype=object))).difference(self.keys, sort=False)
+        if len(new_keys) == 0:
+            return
+        extra = len(new_keys)
+        self.keys = self.keys.append(new_keys)
+        self.count = np.vstack([self.count, np.zeros((extra, self.n_columns))])
+        for name in ("min", "max", "mean", "m2"):
+            setattr(self, name, np.vstack([getattr(self, name), np.full((extra, self.n_columns), np.nan)]))
+
+    def update(self, groups: pd.Series, values: np.ndarray) -> None:
+        """Acumula um lote (values: linhas x colunas, NaN ignorado)"""
+        groups = pd.Series(np.asarray(groups, dtype=object))
+        self._grow(groups.unique())
+        codes = self.keys.get_indexer(groups)
+
+        frame = pd.DataFrame(values)
+        grouped = frame.groupby(codes, sort=False)
+        ids = grouped.size().index.to_numpy()
+        count_b = grouped.count().to_numpy(dtype=float)
+        min_b = grouped.min().to_numpy(dtype=float)
+        max_b = grouped.max().to_numpy(dtype=float)
+        mean_b = grouped.mean().to_numpy(dtype=float)
+        m2_b = grouped.var(ddof=0).to_numpy(dtype=float) * count_b
+
+        count_a, mean_a, m2_a = self.count[ids], self.mean[ids], self.m2[ids]
+        total = count_a + count_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean_b - mean_a
+            merged_mean = mean_a + delta * count_b / total
+            merged_m2 = m2_a + m2_b + delta ** 2 * count_a * count_b / total
+        # Um dos lados vazio: fica o outro
+        merged_mean = np.where(count_a == 0, mean_b, np.where(count_b == 0, mean_a, merged_mean))
+        merged_m2 = np.where(count_a == 0, m2_b, np.where(count_b == 0, m2_a, merged_m2))
+
+        self.count[ids] = total
+        self.mean[ids] = merged_mean
+        self.m2[ids] = merged_m2
+        self.min[ids] = np.fmin(self.min[ids], min_b)
+        self.max[ids] = np.fmax(self.max[ids], max_b)
+
+    def rows_of(self, groups) -> np.ndarray:
+        """Índice das estatísticas de cada linha (-1 para grupo não visto)"""
+        return self.keys.get_indexer(pd.Index(np.asarray(groups, dtype=object)))
+
+    def std(self) -> np.ndarray:
+        """Desvio populacional (ddof=0)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.m2 / self.count)
@@ -0,0 +1,171 @@
+"""
+Modo Watch (main.py --watch)
+
+Observa as entradas da pipeline por polling (sem serviços externos) e
+reexecuta só os estágios afetados por cada mudança:
+
+1. Instantâneo (tamanho + mtime) dos arquivos que casam com as entradas
+   declaradas em steps.py, fora de bases/outputs (scouts, tabelas de
+   negócio, perfis de peso e configurações)
+2. Uma mudança só dispara a execução depois de watch.debounce_s sem novas
+   mudanças (Excel salvando, vários arquivos sendo copiados)
+3. Estágios afetados = os que leem um arquivo alterado e cujo checkpoint
+   ficou desatualizado (o conteúdo mudou), mais os que dependem deles
+
+Entre as execuções o processo continua aberto: os módulos das etapas
+seguem importados e as planilhas já lidas ficam em memória
+(load_data.enable_warm_cache), de modo que só os arquivos alterados são
+relidos.
+"""
+
+import glob
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from . import load_settings
+from .steps import OUTPUTS, build_dependencies, descendants
+
+
+DEFAULT_WATCH_SETTINGS = {
+    "poll_interval_s": 2.0,
+    "debounce_s": 3.0,
+}
+
+# Arquivos temporários do Excel enquanto uma planilha está aberta (~$base_peso.xlsx)
+LOCK_FILE_PREFIX = "~$"
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def get_watch_settings() -> dict:
+    """Seção watch do config.yaml"""
+    settings = load_settings("watch", DEFAULT_WATCH_SETTINGS)
+    for key in ("poll_interval_s", "debounce_s"):
+        settings[key] = float(settings[key])
+    if settings["poll_interval_s"] <= 0:
+        raise ValueError("watch.poll_interval_s deve ser maior que zero")
+    return settings
+
+
+def watched_patterns(steps: List) -> List[str]:
+    """Padrões de entrada dos estágios que não são gerados pela pipeline"""
+    patterns = [pattern for step in steps for pattern in step.inputs if not pattern.startswith(OUTPUTS)]
+    return list(dict.fromkeys(patterns))
+
+
+def snapshot(base_dir: Path, patterns: List[str]) -> Snapshot:
+    """Caminho relativo → (tamanho, mtime) dos arquivos que casam com os padrões"""
+    files = {}
+    for pattern in patterns:
+        for match in glob.glob(str(Path(base_dir) / pattern)):
+            path = Path(match)
+            if path.name.startswith(LOCK_FILE_PREFIX):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files[path.relative_to(base_dir).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def changed_files(before: Snapshot, after: Snapshot) -> List[str]:
+    """Arquivos criados, removidos ou modificados entre dois instantâneos"""
+    changed = set(before) ^ set(after)
+    changed.update(path for path in set(before) & set(after) if before[path] != after[path])
+    return sorted(changed)
+
+
+def affected_steps(steps: List, changed: List[str], store) -> Tuple[Set[str], Set[str]]:
+    """
+    Estágios a reexecutar após a mudança dos arquivos.
+
+    Args:
+        steps: lista de Step (get_steps)
+        changed: caminhos relativos ao diretório base (changed_files)
+        store: CheckpointStore (o checkpoint decide se o conteúdo mudou)
+
+    Returns:
+        (estágios que leem um arquivo alterado cujas entradas diferem das do
+         checkpoint, esses estágios mais os que dependem deles)
+    """
+    direct = [step for step in steps
+              if any(fnmatch(path, pattern) for pattern in step.inputs for path in changed)]
+    stale = {step.id for step in direct if store.inputs_changed(step)}
+    return stale, stale | descendants(build_dependencies(steps), stale)
+
+
+class InputWatcher:
+    """
+    Polling dos arquivos de entrada com debounce.
+
+    Uso:
+        watcher = InputWatcher(base_dir, steps, poll_interval_s=2, debounce_s=3)
+        ... executa a pipeline ...
+        watcher.settle(store)                 # ignora o que a própria execução gravou
+        changed = watcher.wait_for_change()   # bloqueia até haver mudanças estáveis
+    """
+
+    def __init__(self, base_dir: Path, steps: List, poll_interval_s: float = 2.0, debounce_s: float = 3.0):
+        self.base_dir = Path(base_dir)
+        self.steps = steps
+        self.patterns = watched_patterns(steps)
+        self.poll_interval_s = poll_interval_s
+        self.debounce_s = debounce_s
+        self.current = snapshot(self.base_dir, self.patterns)
+
+    def settle(self, store) -> List[str]:
+        """
+        Depois de uma execução, separa o que a própria execução gravou do que
+        foi editado enquanto ela rodava.
+
+        Se nenhuma mudança deixou um checkpoint desatualizado (ex:
+        nacionalidades.xlsx atualizado por load_scouts, ou uma planilha salva
+        antes de a etapa lê-la), o instantâneo de referência é atualizado.
+        Senão o instantâneo anterior à execução é mantido e wait_for_change()
+        devolve essas mudanças.
+
+        Args:
+            store: CheckpointStore
+
+        Returns:
+            arquivos editados durante a execução que afetam etapas
+        """
+        latest = snapshot(self.base_dir, self.patterns)
+        changed = changed_files(self.current, latest)
+        _, selected = affected_steps(self.steps, changed, store)
+        if not selected:
+            self.current = latest
+            return []
+        return changed
+
+    def wait_for_change(self) -> List[str]:
+        """
+        Aguarda uma mudança e mais debounce_s sem novas mudanças.
+
+        Returns:
+            arquivos alterados em relação ao último instantâneo de referência
+        """
+        while True:
+            time.sleep(self.poll_interval_s)
+            latest = snapshot(self.base_dir, self.patterns)
+            if latest == self.current:
+                continue
+
+            last_change = time.monotonic()
+            while True:
+                remaining = self.debounce_s - (time.monotonic() - last_change)
+                if remaining <= 0:
+                    break
+                time.sleep(min(self.poll_interval_s, remaining))
+                newer = snapshot(self.base_dir, self.patterns)
+                if newer != latest:
+                    latest = newer
+                    last_change = time.monotonic()
+
+            changed = changed_files(self.current, latest)
+            self.current = latest
+            if changed:
+                return changed
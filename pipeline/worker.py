@@ -0,0 +1,476 @@
+"""
+Worker Local da Pipeline (main.py --worker)
+
+Processo persistente que mantém em memória o que cada execução do main.py
+relê do disco: os módulos das etapas já importados, as planilhas de
+entrada (load_data.enable_warm_cache), a matriz normalizada (colunas _norm)
+e as tabelas de pesos. Atende comandos JSON por HTTP, só em 127.0.0.1
+(porta worker.port do config.yaml ou SCOUTS_WORKER_PORT):
+
+- GET  /status    dados carregados e execuções feitas
+- POST /rescore   scores e rankings recalculados em memória para uma tabela
+                  de pesos (a do corpo, no layout de base_peso.xlsx, ou a
+                  base_peso.xlsx atual), sem gravar arquivos
+- POST /reload    um arquivo de entrada mudou: reexecuta as etapas afetadas
+                  (mesma regra do modo --watch)
+- POST /export    executa a exportação e a publicação (etapas anteriores
+                  desatualizadas são reexecutadas antes)
+- POST /shutdown  encerra o worker
+
+Os comandos são atendidos um por vez (HTTPServer sem threads), então uma
+execução nunca concorre com outra sobre os mesmos arquivos. call() é o
+cliente usado por scripts/utils/worker_client.py.
+
+Toda requisição precisa do token da sessão no cabeçalho X-Scouts-Worker-Token
+e os POST precisam de Content-Type: application/json (uma página aberta no
+navegador não consegue enviar nenhum dos dois sem um preflight CORS, que o
+worker não atende). O token é gerado a cada início, exibido no console e
+gravado em bases/outputs/_worker_session.json, de onde os clientes o leem.
+"""
+
+import contextlib
+import hmac
+import importlib
+import io
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from . import get_base_dir, load_settings
+
+
+# Variável de ambiente que sobrescreve worker.port do config.yaml
+WORKER_PORT_ENV = "SCOUTS_WORKER_PORT"
+
+DEFAULT_WORKER_SETTINGS = {
+    "port": 8765,
+}
+
+# Só conexões locais
+HOST = "127.0.0.1"
+
+# Colunas de identificação mantidas em memória junto com as colunas _norm
+ID_COLUMNS = [
+    "unique_key", "player_name", "team_name", "competition_id", "competition_name",
+    "mapped_position", "position_group", "v_current",
+]
+
+# Linhas finais da saída das etapas devolvidas por /reload e /export
+LOG_TAIL_LINES = 40
+
+# Token da sessão: cabeçalho exigido em toda requisição e arquivo de onde os clientes o leem
+TOKEN_HEADER = "X-Scouts-Worker-Token"
+SESSION_FILE = "_worker_session.json"
+
+logger = logging.getLogger(__name__)
+
+
+def get_worker_port() -> int:
+    """worker.port do config.yaml; SCOUTS_WORKER_PORT tem prioridade"""
+    if os.environ.get(WORKER_PORT_ENV):
+        return int(os.environ[WORKER_PORT_ENV])
+    return int(load_settings("worker", DEFAULT_WORKER_SETTINGS)["port"])
+
+
+class WorkerState:
+    """Estado mantido entre os comandos e a execução de cada um"""
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = Path(base_dir) if base_dir else get_base_dir()
+        self.output_dir = self.base_dir / "bases" / "outputs"
+        self.weights_file = self.base_dir / "bases" / "inputs" / "business" / "base_peso.xlsx"
+        self.started_at = datetime.now()
+        self.commands = 0
+        self.runs: List[Dict[str, Any]] = []
+        self._normalized = None
+        self._normalized_signature = None
+
+    def warm_up(self) -> None:
+        """Importa os módulos das etapas e carrega a matriz normalizada (se já existir)"""
+        from . import load_data
+        from .steps import get_steps, stage_modules
+
+        load_data.enable_warm_cache()
+        for module in stage_modules(get_steps()):
+            importlib.import_module(module)
+        if (self.output_dir / "_temp_scouts_normalized.parquet").exists():
+            self.normalized()
+
+    def normalized(self):
+        """
+        Colunas de identificação e _norm de _temp_scouts_normalized.parquet,
+        relidas só quando o arquivo muda (ex: após /reload).
+        """
+        import pyarrow.parquet as pq
+        from .load_data import file_signature
+
+        path = self.output_dir / "_temp_scouts_normalized.parquet"
+        if not path.exists():
+            raise FileNotFoundError("_temp_scouts_normalized.parquet não encontrado: execute a pipeline (ou /reload)")
+
+        signature = file_signature(path)
+        if signature != self._normalized_signature:
+            names = pq.read_schema(path).names
+            columns = [c for c in names if c in ID_COLUMNS or c.endswith("_norm")]
+            self._normalized = pq.read_table(path, columns=columns).to_pandas()
+            self._normalized_signature = signature
+            logger.info(f"Matriz normalizada carregada: {self._normalized.shape}")
+        return self._normalized
+
+    def weights_table(self, records: Optional[List[dict]] = None):
+        """
+        Indicadores ativos (CONSIDERAR? = SIM) da tabela de pesos, com os
+        mesmos tipos que as etapas leem de _temp_weights_active.parquet.
+        """
+        import pandas as pd
+        from .load_data import WEIGHTS_SCHEMA, read_input_table, to_arrow_table
+
+        df_weights = pd.DataFrame(records) if records is not None else read_input_table(self.weights_file)
+        if "INDICADOR" not in df_weights.columns or "CONSIDERAR?" not in df_weights.columns:
+            raise ValueError("Tabela de pesos sem as colunas INDICADOR e CONSIDERAR?")
+        df_active = df_weights[df_weights["CONSIDERAR?"] == "SIM"]
+        return to_arrow_table(df_active, WEIGHTS_SCHEMA).to_pandas()
+
+    # ------------------------------------------------------------------
+    # Comandos
+    # ------------------------------------------------------------------
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "base_dir": str(self.base_dir),
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "commands": self.commands,
+            "normalized_rows": None if self._normalized is None else len(self._normalized),
+            "normalized_columns": None if self._normalized is None else len(self._normalized.columns),
+            "runs": self.runs[-10:],
+        }
+
+    def rescore(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Scores com a tabela de pesos informada, sobre a matriz normalizada em
+        memória (mesmas fórmulas de calculate_overall).
+
+        payload:
+            weights: linhas da tabela de pesos (padrão: base_peso.xlsx atual)
+            position / position_group / competition_id: filtros da resposta
+            current_only: só v_current (padrão: true)
+            limit: jogadores na resposta, por overall_score (padrão: 20; 0 = todos)
+        """
+        import numpy as np
+        import pandas as pd
+        from .calculate_overall import calculate_scores_fast, group_indicators
+        from .groups import GroupIndex
+        from .normalize_indicators import build_weights_map
+
+        start = time.perf_counter()
+        df = self.normalized()
+        df_weights = self.weights_table(payload.get("weights"))
+
+        indicadores = df_weights["INDICADOR"].str.strip().tolist()
+        disponiveis = [ind for ind in indicadores if f"{ind}_norm" in df.columns]
+        weights_dict = build_weights_map(df_weights, disponiveis)
+
+        warnings = []
+        missing = [ind for ind in indicadores if ind not in disponiveis]
+        if missing:
+            warnings.append(f"{len(missing)} indicador(es) ativo(s) sem valor normalizado ignorado(s) "
+                            f"(normalize com /reload): {', '.join(missing[:10])}")
+        used_file = self.output_dir / "_temp_weights_active.parquet"
+        if used_file.exists():
+            used = pd.read_parquet(used_file, columns=["INDICADOR", "Melhor para"])
+            used_direction = dict(zip(used["INDICADOR"].str.strip(), used["Melhor para"]))
+            changed = [ind for ind, direction in zip(indicadores, df_weights["Melhor para"])
+                       if ind in disponiveis and used_direction.get(ind, direction) != direction]
+            if changed:
+                warnings.append(f"{len(changed)} indicador(es) com 'Melhor para' diferente do usado na "
+                                f"normalização (vale o anterior até /reload): {', '.join(changed[:10])}")
+
+        scores = pd.DataFrame(index=df.index)
+        scores["overall_score"] = calculate_scores_fast(df, list(weights_dict), weights_dict)
+        categorias, _ = group_indicators(df_weights, disponiveis)
+        for categoria, inds in categorias.items():
+            scores[f"score_{categoria}"] = calculate_scores_fast(df, inds, weights_dict)
+        overall = scores["overall_score"].to_numpy(dtype=float)
+        scores["rank_position"] = GroupIndex(df, "mapped_position").rank(overall, ascending=False)
+        scores["rank_overall"] = GroupIndex(df, ["competition_id", "position_group"]).rank(overall, ascending=False)
+
+        ids = [c for c in ID_COLUMNS if c in df.columns]
+        result = pd.concat([df[ids], scores], axis=1)
+        mask = np.ones(len(result), dtype=bool)
+        if payload.get("current_only", True) and "v_current" in result.columns:
+            mask &= result["v_current"].fillna(False).astype(bool).to_numpy()
+        for key, column in (("position", "mapped_position"), ("position_group", "position_group"),
+                            ("competition_id", "competition_id")):
+            if payload.get(key) is not None:
+                mask &= (result[column].astype(str) == str(payload[key])).to_numpy()
+        result = result[mask].sort_values("overall_score", ascending=False, na_position="last")
+        limit = int(payload.get("limit", 20) or 0)
+        if limit > 0:
+            result = result.head(limit)
+
+        return {
+            "rows": len(df),
+            "scored": int(np.isfinite(overall).sum()),
+            "indicators": len(weights_dict),
+            "categories": list(categorias),
+            "warnings": warnings,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            "players": json.loads(result.to_json(orient="records")),
+        }
+
+    def reload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        payload:
+            file: caminho (relativo ao diretório base) do arquivo alterado;
+                  sem file, todos os arquivos de entrada são verificados
+        """
+        from .checkpoints import CheckpointStore
+        from .steps import get_steps
+        from .watch import affected_steps, snapshot, watched_patterns
+
+        steps = get_steps()
+        if payload.get("file"):
+            changed = [Path(payload["file"]).as_posix()]
+        else:
+            changed = sorted(snapshot(self.base_dir, watched_patterns(steps)))
+
+        stale, selected = affected_steps(steps, changed, CheckpointStore(self.base_dir))
+        if not selected:
+            return {"affected": [], "message": "Checkpoints atualizados: nada a reexecutar"}
+        return {"affected": sorted(stale), **self.run_steps(selected, "reload")}
+
+    def export(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        from .steps import get_steps
+
+        steps = get_steps()
+        selected = {step.id for step in steps if step.group == "export"}
+        run = self.run_steps(selected, "export")
+        run["published"] = [output for step in steps if step.id == "publish" for output in step.outputs]
+        return run
+
+    def run_steps(self, selected: Set[str], command: str) -> Dict[str, Any]:
+        """Executa os estágios (e os desatualizados dos quais dependem) neste processo"""
+        from . import new_run_id
+        from .checkpoints import CheckpointStore, plan_steps
+        from .dag import run_dag
+        from .profiling import PipelineProfiler
+        from .publish import discard_staging
+        from .steps import build_dependencies, get_steps
+
+        # Cada comando é uma execução nova (rodapés, manifesto, relatório, staging)
+        run_id = new_run_id()
+        steps = get_steps()
+        store = CheckpointStore(self.base_dir)
+        plan = plan_steps(steps, selected, store)
+        to_run = [step for step, action, _ in plan if action == "run"]
+
+        def execute(step):
+            with profiler.stage(step.id, step.name) as stage:
+                result = step.run()
+                stage.record_outputs(self.output_dir / f for f in step.outputs)
+            return result
+
+        buffer = io.StringIO()
+        status, error, failed = "failed", None, None
+        with contextlib.redirect_stdout(buffer), PipelineProfiler(self.output_dir) as profiler:
+            try:
+                result = run_dag(to_run, build_dependencies(steps), execute, on_success=store.record)
+                if result.success:
+                    status = "success"
+                    if not any(step.id == "publish" for step in to_run):
+                        discard_staging(self.output_dir)
+                else:
+                    failed = result.failed_step.id
+                    store.invalidate(result.failed_step)
+                    error = (f"{type(result.error).__name__}: {result.error}"
+                             if result.error is not None else f"Etapa '{failed}' retornou False")
+            finally:
+                profiler.write_report(status)
+                report = profiler.to_dict(status)
+
+        output = buffer.getvalue().splitlines()
+        for line in output:
+            if line.strip():
+                logger.info(line.split("\r")[-1].rstrip())
+
+        run = {
+            "command": command,
+            "run_id": run_id,
+            "status": status,
+            "error": error,
+            "failed_step": failed,
+            "wall_s": report["total"]["wall_s"],
+            "plan": [{"id": step.id, "action": action, "reason": reason} for step, action, reason in plan],
+            "steps": [{"id": s["id"], "status": s["status"], "wall_s": s["wall_s"]} for s in report["steps"]],
+        }
+        self.runs.append({k: run[k] for k in ("command", "run_id", "status", "wall_s")})
+        return {**run, "log": [line for line in output if line.strip()][-LOG_TAIL_LINES:]}
+
+
+def session_file(base_dir: Optional[Path] = None) -> Path:
+    """bases/outputs/_worker_session.json (porta, token e pid do worker em execução)"""
+    return Path(base_dir or get_base_dir()) / "bases" / "outputs" / SESSION_FILE
+
+
+def read_session(base_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Sessão do worker em execução (vazio se não houver)"""
+    try:
+        with open(session_file(base_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_session(path: Path, session: Dict[str, Any]) -> None:
+    """Grava a sessão legível só pelo usuário (o token dá acesso aos comandos)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(session, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Requisições JSON → comandos do WorkerState"""
+
+    server_version = "ScoutsWorker/1.0"
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        """Confere o token da sessão (responde 403 se ausente ou diferente)"""
+        token = self.headers.get(TOKEN_HEADER, "")
+        if hmac.compare_digest(token.encode("utf-8"), self.server.token.encode("utf-8")):
+            return True
+        self._reply(403, {"error": f"Token ausente ou inválido (cabeçalho {TOKEN_HEADER}; "
+                                   f"ver bases/outputs/{SESSION_FILE})"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path.rstrip("/") == "/status":
+            self._reply(200, self.server.state.status())
+        else:
+            self._reply(404, {"error": f"Caminho desconhecido: {self.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._reply(415, {"error": "Content-Type deve ser application/json"})
+            return
+
+        state = self.server.state
+        commands = {"rescore": state.rescore, "reload": state.reload, "export": state.export}
+        command = self.path.strip("/")
+
+        if command == "shutdown":
+            self._reply(200, {"message": "Worker encerrado"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        if command not in commands:
+            self._reply(404, {"error": f"Comando desconhecido: {command}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("O corpo deve ser um objeto JSON")
+        except ValueError as e:
+            self._reply(400, {"error": f"JSON inválido: {e}"})
+            return
+
+        state.commands += 1
+        try:
+            self._reply(200, commands[command](payload))
+        except (ValueError, KeyError, FileNotFoundError) as e:
+            self._reply(400, {"error": f"{type(e).__name__}: {e}"})
+        except Exception as e:
+            logger.error(f"Erro no comando {command}: {e}", exc_info=True)
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+
+def serve(port: Optional[int] = None, base_dir: Optional[Path] = None) -> None:
+    """Inicia o worker e atende comandos até /shutdown ou Ctrl+C"""
+    port = port or get_worker_port()
+    state = WorkerState(base_dir)
+    print("Carregando módulos e dados em memória...")
+    state.warm_up()
+
+    server = HTTPServer((HOST, port), _Handler)
+    server.state = state
+    server.token = secrets.token_urlsafe(24)
+    path = session_file(state.base_dir)
+    _write_session(path, {
+        "port": port,
+        "token": server.token,
+        "pid": os.getpid(),
+        "started_at": state.started_at.isoformat(timespec="seconds"),
+    })
+    print(f"✓ Worker ouvindo em http://{HOST}:{port} (Ctrl+C para encerrar)")
+    print("  Comandos: GET /status; POST /rescore, /reload, /export, /shutdown")
+    print(f"  Token da sessão ({TOKEN_HEADER}): {server.token} (também em bases/outputs/{SESSION_FILE})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if read_session(state.base_dir).get("token") == server.token:
+            path.unlink()
+    print("✓ Worker encerrado")
+
+
+def call(command: str, payload: Optional[Dict[str, Any]] = None, port: Optional[int] = None,
+         timeout: float = 3600, token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Envia um comando ao worker e retorna a resposta.
+
+    O token (e, sem port, a porta) vem de bases/outputs/_worker_session.json.
+
+    Raises:
+        ConnectionError: worker fora do ar
+        RuntimeError: o worker respondeu com erro
+    """
+    session = read_session()
+    port = port or session.get("port") or get_worker_port()
+    headers = {TOKEN_HEADER: token or session.get("token", "")}
+    url = f"http://{HOST}:{port}/{command}"
+    if command == "status":
+        request = urllib.request.Request(url, headers=headers)
+    else:
+        data = json.dumps(payload or {}, default=str).encode("utf-8")
+        request = urllib.request.Request(url, data=data, headers={**headers, "Content-Type": "application/json"})
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", str(e))
+        except ValueError:
+            message = str(e)
+        raise RuntimeError(message) from e
+    except urllib.error.URLError as e:
+        raise ConnectionError(f"Worker não encontrado em {url} (inicie com: python main.py --worker)") from e
@@ -0,0 +1,221 @@
+"""
+Benchmark da pipeline sobre uma base sintética
+
+Este script:
+1. Gera uma base sintética (scripts/utils/generate_synthetic_scouts.py)
+2. Executa cada etapa da pipeline sobre ela (via SCOUTS_BASE_DIR)
+3. Mede tempo/CPU/memória por etapa com pipeline.profiling
+4. Compara com o baseline salvo e aponta regressões
+
+Uso:
+    # Rodar a escala "small" e comparar com o baseline
+    python scripts/benchmark/run_benchmark.py --scale small
+
+    # Gravar/atualizar o baseline desta máquina
+    python scripts/benchmark/run_benchmark.py --scale small --update-baseline
+
+    # Escala customizada
+    python scripts/benchmark/run_benchmark.py --players 5000 --competitions 8 --indicators 150 --snapshots 6
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+# Mesmos filtros de warnings do main.py
+warnings.filterwarnings("ignore", category=UserWarning)
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+# Configurar encoding UTF-8 para stdout
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "scripts" / "utils"))
+
+# Escalas pré-definidas (jogadores por competição, competições, indicadores, snapshots)
+SCALES = {
+    "tiny": {"players": 200, "competitions": 2, "indicators": 30, "snapshots": 2},
+    "small": {"players": 1000, "competitions": 4, "indicators": 100, "snapshots": 3},
+    "medium": {"players": 3000, "competitions": 6, "indicators": 150, "snapshots": 4},
+    "large": {"players": 6000, "competitions": 10, "indicators": 200, "snapshots": 6},
+}
+
+# Diferença absoluta mínima (s / MB) para considerar regressão - evita ruído
+MIN_TIME_DELTA_S = 0.5
+MIN_MEMORY_DELTA_MB = 50
+
+
+def run_pipeline(workdir: Path, cprofile: bool = False, verbose: bool = False) -> dict:
+    """
+    Executa todas as etapas sobre a base em workdir.
+
+    Returns:
+        dict do relatório de execução (mesmo formato de _run_report.json)
+    """
+    from pipeline.profiling import PipelineProfiler
+    from pipeline.steps import get_steps
+
+    os.environ["SCOUTS_BASE_DIR"] = str(workdir)
+    output_dir = workdir / "bases" / "outputs"
+    console = sys.stdout
+    status = "failed"
+
+    # A saída das etapas vai para um buffer (a menos que --verbose), mas
+    # continua passando pelo profiler para a detecção de sub-fases
+    with redirect_stdout(console if verbose else io.StringIO()):
+        with PipelineProfiler(output_dir, cprofile=cprofile) as profiler:
+            try:
+                for step in get_steps():
+                    print(f"  - {step.name}...", end=" ", flush=True, file=console)
+                    with profiler.stage(step.id, step.name) as stage:
+                        step.run()
+                        stage.record_outputs(output_dir / f for f in step.outputs)
+                    print(f"{stage.wall_s:.2f}s", file=console)
+                status = "success"
+            finally:
+                profiler.write_report(status)
+
+    return profiler.to_dict(status)
+
+
+def compare_with_baseline(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compara tempo e memória por etapa com o baseline.
+
+    Returns:
+        lista de mensagens de regressão (vazia se nenhuma)
+    """
+    regressions = []
+    baseline_steps = {step["id"]: step for step in baseline.get("steps", [])}
+
+    print(f"\n  {'Etapa':<24} {'Tempo':>9} {'Base':>9} {'Δ%':>7} {'RSS':>9} {'Base':>9}")
+    for step in report["steps"]:
+        base = baseline_steps.get(step["id"])
+        if base is None:
+            print(f"  {step['id']:<24} {step['wall_s']:>8.2f}s {'-':>9}")
+            continue
+
+        delta_pct = (step["wall_s"] / base["wall_s"] - 1) * 100 if base["wall_s"] else 0.0
+        print(
+            f"  {step['id']:<24} {step['wall_s']:>8.2f}s {base['wall_s']:>8.2f}s {delta_pct:>6.0f}% "
+            f"{step['peak_rss_mb'] or 0:>7.0f}MB {base['peak_rss_mb'] or 0:>7.0f}MB"
+        )
+
+        time_limit = base["wall_s"] * (1 + tolerance)
+        if step["wall_s"] > time_limit and step["wall_s"] - base["wall_s"] > MIN_TIME_DELTA_S:
+            regressions.append(
+                f"{step['id']}: tempo {step['wall_s']:.2f}s > {base['wall_s']:.2f}s (+{delta_pct:.0f}%)"
+            )
+
+        # Pico de etapas que rodaram em paralelo é do processo inteiro: não comparável
+        shared = step.get("rss_shared") or base.get("rss_shared")
+        if step.get("peak_rss_mb") and base.get("peak_rss_mb") and not shared:
+            memory_limit = base["peak_rss_mb"] * (1 + tolerance)
+            if (step["peak_rss_mb"] > memory_limit
+                    and step["peak_rss_mb"] - base["peak_rss_mb"] > MIN_MEMORY_DELTA_MB):
+                regressions.append(
+                    f"{step['id']}: pico RSS {step['peak_rss_mb']:.0f}MB > {base['peak_rss_mb']:.0f}MB"
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark da pipeline com base sintética",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Escala pré-definida")
+    parser.add_argument("--players", type=int, help="Jogadores por competição (sobrescreve a escala)")
+    parser.add_argument("--competitions", type=int, help="Número de competições")
+    parser.add_argument("--indicators", type=int, help="Número de indicadores")
+    parser.add_argument("--snapshots", type=int, help="Snapshots históricos por competição")
+    parser.add_argument("--format", choices=["xlsx", "parquet"], default="parquet",
+                        help="Formato dos arquivos de scouts gerados (xlsx inclui o custo de leitura do Excel)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente aleatória")
+    parser.add_argument("--workdir", help="Diretório de trabalho (padrão: temporário)")
+    parser.add_argument("--keep", action="store_true", help="Não apagar o diretório de trabalho")
+    parser.add_argument("--baseline", help="Arquivo de baseline (padrão: baselines/<escala>.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Gravar o resultado como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Tolerância relativa antes de acusar regressão (padrão: 0.25 = 25%%)")
+    parser.add_argument("--profile", action="store_true", help="Gravar dumps cProfile por etapa")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar a saída das etapas")
+    args = parser.parse_args()
+
+    from generate_synthetic_scouts import generate
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    custom = params != SCALES[args.scale]
+    label = "custom" if custom else args.scale
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="scouts_bench_"))
+
+    print("=" * 70)
+    print("BENCHMARK DA PIPELINE - BASE SINTÉTICA")
+    print("=" * 70)
+    print(f"Início: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Escala: {label} {params}")
+    print(f"Diretório: {workdir}\n")
+
+    try:
+        print("[1/3] Gerando base sintética...")
+        summary = generate(workdir, file_format=args.format, seed=args.seed, **params)
+        print(f"  ✓ {summary['total_rows']} linhas de scouts geradas")
+
+        print("\n[2/3] Executando pipeline...")
+        report = run_pipeline(workdir, cprofile=args.profile, verbose=args.verbose)
+        report["benchmark"] = {"scale": label, "format": args.format, **summary}
+
+        print(f"  ✓ Total: {report['total']['wall_s']:.2f}s, pico RSS {report['total']['peak_rss_mb']} MB")
+
+        print("\n[3/3] Comparando com baseline...")
+        baseline_file = Path(args.baseline) if args.baseline else BASELINE_DIR / f"{label}.json"
+        regressions = []
+
+        if baseline_file.exists():
+            with open(baseline_file, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressions = compare_with_baseline(report, baseline, args.tolerance)
+        else:
+            print(f"  ⚠ Baseline não encontrado: {baseline_file}")
+
+        if args.update_baseline:
+            baseline_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(baseline_file, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"\n  ✓ Baseline atualizado: {baseline_file}")
+
+        print("\n" + "=" * 70)
+        if regressions:
+            print("✗ REGRESSÕES DETECTADAS")
+            print("=" * 70)
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+
+        print("✓ BENCHMARK CONCLUÍDO SEM REGRESSÕES")
+        print("=" * 70)
+        return 0
+
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
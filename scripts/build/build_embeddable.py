@@ -6,6 +6,7 @@ Este script:
 2. Instala dependências em libs/
 3. Configura sys.path
 4. Cria estrutura final para distribuição
+5. Pré-compila o bytecode (.pyc) da pipeline e das dependências
 
 Resultado: dist/BotafogoScouts/ pronto para uso
 """
@@ -30,7 +31,7 @@ LIBS_DIR = DIST_DIR / "libs"
 
 def download_python_embeddable():
     """Baixa Python Embeddable"""
-    print("\n[1/6] Baixando Python Embeddable...")
+    print("\n[1/7] Baixando Python Embeddable...")
     print(f"  URL: {PYTHON_URL}")
 
     zip_path = BASE_DIR / "python-embed.zip"
@@ -47,7 +48,7 @@ def download_python_embeddable():
 
 def extract_python_embeddable(zip_path):
     """Extrai Python Embeddable"""
-    print("\n[2/6] Extraindo Python Embeddable...")
+    print("\n[2/7] Extraindo Python Embeddable...")
 
     # Limpar pasta anterior
     if PYTHON_EMBED_DIR.exists():
@@ -63,7 +64,7 @@ def extract_python_embeddable(zip_path):
 
 def configure_sys_path():
     """Configura python311._pth para incluir libs/"""
-    print("\n[3/6] Configurando sys.path...")
+    print("\n[3/7] Configurando sys.path...")
 
     # Python 3.11 -> python311._pth
     pth_file = PYTHON_EMBED_DIR / "python311._pth"
@@ -94,7 +95,7 @@ def configure_sys_path():
 
 def install_get_pip():
     """Instala get-pip.py no Python Embeddable"""
-    print("\n[4/6] Instalando pip...")
+    print("\n[4/7] Instalando pip...")
 
     # Baixar get-pip.py
     get_pip_url = "https://bootstrap.pypa.io/get-pip.py"
@@ -126,7 +127,7 @@ def install_get_pip():
 
 def install_dependencies():
     """Instala dependências do projeto"""
-    print("\n[5/6] Instalando dependências...")
+    print("\n[5/7] Instalando dependências...")
 
     python_exe = PYTHON_EMBED_DIR / "python.exe"
     requirements = BASE_DIR / "requirements.txt"
@@ -161,7 +162,7 @@ def install_dependencies():
 
 def copy_project_files():
     """Copia arquivos do projeto para dist/"""
-    print("\n[6/6] Copiando arquivos do projeto...")
+    print("\n[6/7] Copiando arquivos do projeto...")
 
     # Arquivos e pastas a copiar
     items_to_copy = [
@@ -194,6 +195,34 @@ def copy_project_files():
     print("\n  [OK] Arquivos copiados")
 
 
+def compile_bytecode():
+    """
+    Pré-compila os .pyc com o Python Embeddable (mesma versão que vai
+    executá-los): a primeira execução não compila pipeline/ e libs/
+    """
+    print("\n[7/7] Pré-compilando bytecode...")
+
+    python_exe = PYTHON_EMBED_DIR / "python.exe"
+    cmd = [
+        str(python_exe),
+        "-m", "compileall",
+        "-q",
+        "-j", "0",
+        str(DIST_DIR / "pipeline"),
+        str(LIBS_DIR),
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        # Arquivos que não compilam (ex: testes de dependências) não impedem o uso
+        print("  [AVISO] Alguns arquivos não foram compilados:")
+        print(result.stdout[-2000:])
+        return
+
+    print("  [OK] Bytecode compilado")
+
+
 def cleanup():
     """Remove arquivos temporários"""
     print("\nLimpando arquivos temporários...")
@@ -235,6 +264,9 @@ def main():
         # Copiar arquivos do projeto
         copy_project_files()
 
+        # Pré-compilar bytecode
+        compile_bytecode()
+
         # Limpar temporários
         cleanup()
 
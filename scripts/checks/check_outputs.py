@@ -0,0 +1,54 @@
+"""
+Verifica se os arquivos publicados em bases/outputs/ formam um conjunto consistente.
+
+Compara o run id gravado no rodapé de cada consolidated_*.parquet e o número
+de linhas com o _manifest.json gravado pela publicação. Retorna código 1 se
+houver divergência (útil antes de um refresh do Power BI).
+
+Uso:
+    python scripts/checks/check_outputs.py
+    python scripts/checks/check_outputs.py --hash
+    python scripts/checks/check_outputs.py --output-dir outra/pasta/outputs
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from pipeline import get_base_dir  # noqa: E402
+from pipeline.publish import read_manifest, verify_outputs  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere os arquivos publicados com o _manifest.json")
+    parser.add_argument("--output-dir", help="Pasta de saída (padrão: bases/outputs do projeto)")
+    parser.add_argument("--hash", action="store_true", help="Também recalcular o hash de cada arquivo")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir) if args.output_dir else get_base_dir() / "bases" / "outputs"
+    problems = verify_outputs(output_dir, check_hash=args.hash)
+
+    manifest = read_manifest(output_dir)
+    if manifest:
+        print(f"Manifesto: run {manifest['run_id']}, publicado em {manifest['published_at']}")
+        for filename, info in manifest["files"].items():
+            print(f"  - {filename}: {info['rows']} linhas (run {info['run_id']})")
+
+    if problems:
+        print("\n✗ Conjunto inconsistente:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+
+    print("\n✓ Arquivos consistentes com o manifesto")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
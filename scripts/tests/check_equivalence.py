@@ -0,0 +1,96 @@
+"""
+Verifica se a engine vetorizada produz as mesmas saídas da referência.
+
+Executa as etapas (a partir de normalize_indicators, por padrão) com as
+duas engines sobre os mesmos checkpoints de bases/outputs/ e compara
+coluna a coluna cada parquet gerado, listando as divergências por unique_key.
+
+Uso:
+    # Comparar engines usando os checkpoints da última execução do main.py
+    python scripts/tests/check_equivalence.py
+
+    # Comparar dois diretórios de saída já gerados
+    python scripts/tests/check_equivalence.py --compare-dirs saidas_ref/ saidas_fast/
+
+    # Salvar o relatório em JSON
+    python scripts/tests/check_equivalence.py --json equivalence.json
+"""
+
+import argparse
+import io
+import json
+import sys
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from pipeline import get_base_dir  # noqa: E402
+from pipeline.equivalence import compare_engines, compare_output_dirs  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica equivalência entre engines da pipeline")
+    parser.add_argument("--base-dir", help="Diretório base com config/ e bases/outputs/_temp_* (padrão: projeto)")
+    parser.add_argument("--reference", default="reference", help="Engine de referência")
+    parser.add_argument("--candidate", default="fast", help="Engine candidata")
+    parser.add_argument("--from", dest="from_step", default="normalize_indicators",
+                        help="Primeira etapa a executar (padrão: normalize_indicators)")
+    parser.add_argument("--compare-dirs", nargs=2, metavar=("REF_DIR", "CAND_DIR"),
+                        help="Apenas comparar dois diretórios de saída existentes")
+    parser.add_argument("--workdir", help="Manter as saídas de cada engine neste diretório")
+    parser.add_argument("--json", help="Gravar o relatório completo em JSON")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar a saída das etapas")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("VERIFICAÇÃO DE EQUIVALÊNCIA ENTRE ENGINES")
+    print("=" * 70)
+
+    if args.compare_dirs:
+        ref_dir, cand_dir = (Path(d) for d in args.compare_dirs)
+        print(f"Referência: {ref_dir}")
+        print(f"Candidata: {cand_dir}\n")
+        reports = compare_output_dirs(ref_dir, cand_dir)
+    else:
+        base_dir = Path(args.base_dir) if args.base_dir else get_base_dir()
+        print(f"Base: {base_dir}")
+        print(f"Engines: {args.reference} x {args.candidate} (a partir de {args.from_step})\n")
+        reports = compare_engines(
+            base_dir,
+            reference_engine=args.reference,
+            candidate_engine=args.candidate,
+            from_step=args.from_step,
+            workdir=Path(args.workdir) if args.workdir else None,
+            verbose=args.verbose,
+        )
+
+    if not reports:
+        print("✗ Nenhum arquivo comparado - verifique os diretórios")
+        return 1
+
+    for report in reports:
+        report.print_summary()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in reports], f, indent=2, ensure_ascii=False)
+        print(f"\nRelatório salvo em: {args.json}")
+
+    print("\n" + "=" * 70)
+    if all(r.ok for r in reports):
+        print("✓ SAÍDAS EQUIVALENTES")
+        print("=" * 70)
+        return 0
+
+    print("✗ DIVERGÊNCIAS ENCONTRADAS")
+    print("=" * 70)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
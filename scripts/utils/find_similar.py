@@ -0,0 +1,84 @@
+"""
+Busca jogadores similares a partir do índice de similaridade.
+
+Usa bases/outputs/_similarity_index.npz (remontado automaticamente se a
+última execução da pipeline for mais recente que o índice).
+
+Uso:
+    # Por unique_key
+    python scripts/utils/find_similar.py 11000_11_8
+
+    # Por nome (se houver mais de um registro, lista as opções)
+    python scripts/utils/find_similar.py --name "Silva" --k 15 --metric euclidean
+
+    # Forçar a remontagem do índice
+    python scripts/utils/find_similar.py 11000_11_8 --rebuild
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd  # noqa: E402
+
+from pipeline.similarity import METRICS, load_index  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca jogadores similares (mesma posição, registros atuais)")
+    parser.add_argument("unique_key", nargs="?", help="unique_key do jogador de referência")
+    parser.add_argument("--name", help="Buscar o jogador pelo nome (parte do nome)")
+    parser.add_argument("--k", type=int, default=10, help="Quantidade de similares (padrão: 10)")
+    parser.add_argument("--metric", choices=METRICS, default="cosine", help="Métrica (padrão: cosine)")
+    parser.add_argument("--output-dir", help="Pasta de saída (padrão: bases/outputs do projeto)")
+    parser.add_argument("--rebuild", action="store_true", help="Remontar o índice")
+    args = parser.parse_args()
+
+    if not args.unique_key and not args.name:
+        parser.error("informe um unique_key ou --name")
+
+    start = time.perf_counter()
+    index = load_index(Path(args.output_dir) if args.output_dir else None, rebuild=args.rebuild)
+    load_seconds = time.perf_counter() - start
+
+    unique_key = args.unique_key
+    if args.name:
+        matches = index.find(args.name)
+        if matches.empty:
+            print(f"✗ Nenhum jogador atual com '{args.name}' no nome")
+            return 1
+        if len(matches) > 1:
+            print(f"Mais de um jogador com '{args.name}' no nome; use o unique_key:")
+            print(matches[["unique_key", "player_name", "team_name", "competition_name", "mapped_position"]]
+                  .to_string(index=False))
+            return 1
+        unique_key = matches["unique_key"].iloc[0]
+
+    start = time.perf_counter()
+    try:
+        result = index.query(unique_key, k=args.k, metric=args.metric)
+    except KeyError as e:
+        print(f"✗ {e.args[0]}")
+        return 1
+    query_seconds = time.perf_counter() - start
+
+    reference = index.info.iloc[index._row_of[str(unique_key)]]
+    print(f"Referência: {reference['player_name']} ({reference['team_name']}, {reference['competition_name']}, "
+          f"{reference['mapped_position']})")
+    print(f"Índice: {len(index)} registros (carregado em {load_seconds * 1000:.0f} ms, "
+          f"consulta em {query_seconds * 1000:.1f} ms)\n")
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(result.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Gera uma base sintética de scouts para benchmarks da pipeline.
+
+Cria, dentro de um diretório base (estrutura igual à do projeto):
+- bases/inputs/scouts_base/synthetic_<competição>_<snapshot>.xlsx|.parquet
+- bases/inputs/business/base_peso.xlsx
+- bases/inputs/business/nacionalidades.xlsx
+- config/ (cópia de config.yaml e positions.yaml do projeto)
+
+Os snapshots históricos seguem a mesma progressão usada em
+generate_historical_argentina_data.py (minutos -10% e data -1 mês por
+snapshot, demais métricas com variação aleatória de +-5%).
+
+Uso:
+    python scripts/utils/generate_synthetic_scouts.py --output /tmp/scouts_bench \\
+        --players 2000 --competitions 6 --indicators 120 --snapshots 4 --format parquet
+"""
+
+import argparse
+import shutil
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_historical_argentina_data import (  # noqa: E402
+    DATE_COLUMN,
+    MINUTES_COLUMN,
+    MINUTES_DECREASE_FACTOR,
+    NINETY_S_COLUMN,
+    RANDOM_VARIATION_MAX,
+    RANDOM_VARIATION_MIN,
+    format_date,
+)
+
+POSITION_COLUMNS = ["GK", "RCB", "LCB", "CB", "RB", "LB", "DM", "CM", "AM", "LW", "RW", "CF"]
+CATEGORIES = ["PASS", "DEFENSIVE", "OFFENSIVE", "DGP", "GK"]
+SUBCATEGORIES = ["Progressive Passing", "Defending", "Shooting", "Carrying", "Goalkeeping", None]
+LATEST_MATCH = datetime(2025, 6, 1, 20, 0)
+
+
+def build_weights(n_indicators: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Gera uma tabela de pesos no formato de base_peso.xlsx.
+
+    ~90% dos indicadores ficam ativos (CONSIDERAR? = SIM) e ~20% são "BAIXO".
+    """
+    indicators = [f"player_season_synthetic_{i:03d}_90" for i in range(n_indicators)]
+
+    weights = pd.DataFrame({
+        "INDICADOR": indicators,
+        "CLASSIFICACAO RANKING": [CATEGORIES[i % len(CATEGORIES)] for i in range(n_indicators)],
+        "SUBCLASSIFICACAO RANKING": [SUBCATEGORIES[i % len(SUBCATEGORIES)] for i in range(n_indicators)],
+        "CONSIDERAR?": np.where(rng.random(n_indicators) < 0.9, "SIM", "NÃO"),
+        "ESPECIAL?": "",
+        "Melhor para": np.where(rng.random(n_indicators) < 0.8, "CIMA", "BAIXO"),
+        "tipo_agreg": "sum",
+        "Explicação indicador": "Indicador sintético",
+    })
+
+    for pos in POSITION_COLUMNS:
+        # Parte dos pesos zerados, como na base real
+        pos_weights = rng.integers(0, 101, n_indicators)
+        pos_weights[rng.random(n_indicators) < 0.3] = 0
+        weights[pos] = pos_weights
+
+    return weights
+
+
+def build_competition(competition_id: int, n_players: int, indicators: list,
+                      position_names: list, rng: np.random.Generator) -> pd.DataFrame:
+    """Gera o snapshot mais recente de uma competição"""
+    player_ids = competition_id * 100_000 + np.arange(n_players)
+    minutes = rng.uniform(5, 3200, n_players)
+
+    df = pd.DataFrame({
+        "account_id": 1,
+        "player_id": player_ids,
+        "player_name": [f"Player {pid}" for pid in player_ids],
+        "team_id": competition_id * 100 + rng.integers(0, 20, n_players),
+        "competition_id": competition_id,
+        "competition_name": f"Synthetic League {competition_id}",
+        "season_id": 300,
+        "season_name": "2025",
+        "country_id": rng.integers(1, 250, n_players),
+        "birth_date": [
+            (datetime(1990, 1, 1) + timedelta(days=int(d))).strftime("%Y-%m-%d")
+            for d in rng.integers(0, 5000, n_players)
+        ],
+        "player_female": False,
+        "player_first_name": [f"First{pid}" for pid in player_ids],
+        "player_last_name": [f"Last{pid}" for pid in player_ids],
+        "player_known_name": [f"Known {pid}" if pid % 4 == 0 else None for pid in player_ids],
+        "player_weight": rng.uniform(60, 95, n_players).round(1),
+        "player_height": rng.uniform(165, 200, n_players).round(1),
+        "primary_position": rng.choice(position_names, n_players),
+        "secondary_position": rng.choice(position_names, n_players),
+        MINUTES_COLUMN: minutes,
+        "player_season_appearances": (minutes / 80).round(),
+        "player_season_starting_appearances": (minutes / 95).round(),
+        "player_season_average_minutes": rng.uniform(20, 90, n_players),
+        DATE_COLUMN: format_date(LATEST_MATCH),
+        NINETY_S_COLUMN: minutes / 90,
+        "player_season_360_minutes": minutes * rng.uniform(0, 1, n_players),
+    })
+
+    # Indicadores: mistura de taxas (0-1) e contagens por 90 minutos
+    values = np.where(
+        rng.random(len(indicators)) < 0.3,
+        rng.random((n_players, len(indicators))),
+        rng.gamma(2.0, 1.5, (n_players, len(indicators))),
+    )
+    values[rng.random(values.shape) < 0.02] = np.nan
+    df = pd.concat([df, pd.DataFrame(values, columns=indicators)], axis=1)
+
+    return df
+
+
+def previous_snapshot(df: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Gera o snapshot anterior (vetorizado), seguindo as regras do
+    generate_historical_argentina_data.py.
+    """
+    df = df.copy()
+
+    df[MINUTES_COLUMN] = df[MINUTES_COLUMN] * MINUTES_DECREASE_FACTOR
+    previous_date = datetime.fromisoformat(df[DATE_COLUMN].iloc[0]) - timedelta(days=30)
+    df[DATE_COLUMN] = format_date(previous_date)
+    df[NINETY_S_COLUMN] = df[MINUTES_COLUMN] / 90
+
+    varied_cols = [
+        c for c in df.columns
+        if c.startswith("player_season_") and c not in [MINUTES_COLUMN, DATE_COLUMN, NINETY_S_COLUMN]
+    ]
+    values = df[varied_cols].to_numpy(dtype=float)
+    new_values = values * rng.uniform(RANDOM_VARIATION_MIN, RANDOM_VARIATION_MAX, values.shape)
+
+    # Taxas continuam no intervalo [0, 1]
+    is_ratio = (values > 0) & (values <= 1)
+    new_values = np.where(is_ratio, np.clip(new_values, 0, 1), new_values)
+    df[varied_cols] = new_values
+
+    return df
+
+
+def generate(output: Path, players: int = 1000, competitions: int = 4, indicators: int = 100,
+             snapshots: int = 3, file_format: str = "xlsx", seed: int = 42,
+             history_fraction: float = 0.5) -> dict:
+    """
+    Gera a base sintética completa.
+
+    Args:
+        output: diretório base de destino
+        players: jogadores por competição
+        competitions: número de competições
+        indicators: número de indicadores (colunas player_season_*)
+        snapshots: snapshots por competição (1 = apenas atual)
+        file_format: "xlsx" ou "parquet" para os arquivos de scouts
+        seed: semente do gerador aleatório
+        history_fraction: fração dos jogadores presentes nos snapshots históricos
+
+    Returns:
+        dict com o resumo do que foi gerado
+    """
+    rng = np.random.default_rng(seed)
+    output = Path(output)
+    scouts_dir = output / "bases" / "inputs" / "scouts_base"
+    business_dir = output / "bases" / "inputs" / "business"
+    config_dir = output / "config"
+
+    for directory in [scouts_dir, business_dir, config_dir]:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # Remover arquivos sintéticos de execuções anteriores
+    for old_file in list(scouts_dir.glob("synthetic_*.xlsx")) + list(scouts_dir.glob("synthetic_*.parquet")):
+        old_file.unlink()
+
+    for config_file in ["config.yaml", "positions.yaml"]:
+        shutil.copy2(BASE_DIR / "config" / config_file, config_dir / config_file)
+
+    with open(config_dir / "positions.yaml", "r", encoding="utf-8") as f:
+        position_names = [p for p in yaml.safe_load(f)["position_mapping"] if p]
+
+    weights = build_weights(indicators, rng)
+    weights.to_excel(business_dir / "base_peso.xlsx", index=False)
+
+    total_rows = 0
+    for c in range(competitions):
+        competition_id = 1000 + c
+        df = build_competition(competition_id, players, weights["INDICADOR"].tolist(), position_names, rng)
+
+        for snapshot in range(snapshots):
+            file_path = scouts_dir / f"synthetic_{competition_id}_{snapshot}.{file_format}"
+            if file_format == "parquet":
+                df.to_parquet(file_path, index=False)
+            else:
+                df.to_excel(file_path, index=False)
+            total_rows += len(df)
+
+            if snapshot == 0:
+                # Históricos apenas para parte dos jogadores
+                df = df[rng.random(len(df)) < history_fraction]
+            df = previous_snapshot(df, rng)
+
+    # Nacionalidades: metade dos códigos já mapeados
+    country_ids = np.arange(1, 250)
+    pd.DataFrame({
+        "country_id": country_ids[::2],
+        "nationality": [f"Country {cid}" for cid in country_ids[::2]],
+        "player_example": "",
+        "team_example": "",
+    }).to_excel(business_dir / "nacionalidades.xlsx", index=False)
+
+    return {
+        "output": str(output),
+        "players": players,
+        "competitions": competitions,
+        "indicators": indicators,
+        "snapshots": snapshots,
+        "format": file_format,
+        "seed": seed,
+        "total_rows": total_rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera base sintética de scouts para benchmarks")
+    parser.add_argument("--output", required=True, help="Diretório base de destino")
+    parser.add_argument("--players", type=int, default=1000, help="Jogadores por competição")
+    parser.add_argument("--competitions", type=int, default=4, help="Número de competições")
+    parser.add_argument("--indicators", type=int, default=100, help="Número de indicadores")
+    parser.add_argument("--snapshots", type=int, default=3, help="Snapshots históricos por competição")
+    parser.add_argument("--format", choices=["xlsx", "parquet"], default="xlsx", help="Formato dos scouts")
+    parser.add_argument("--seed", type=int, default=42, help="Semente aleatória")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Gerando base sintética de scouts")
+    print("=" * 60)
+
+    summary = generate(
+        Path(args.output),
+        players=args.players,
+        competitions=args.competitions,
+        indicators=args.indicators,
+        snapshots=args.snapshots,
+        file_format=args.format,
+        seed=args.seed,
+    )
+
+    for key, value in summary.items():
+        print(f"  {key}: {value}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Consulta os leaderboards pré-calculados (consolidated_leaderboards.parquet).
+
+Lê apenas os row groups do filtro pedido, sem varrer consolidated_overall.
+
+Uso:
+    # Top 10 de cada posição de uma competição
+    python scripts/utils/leaderboard.py --competition 43
+
+    # Top 5 zagueiros (CB) de todas as competições por score ofensivo
+    python scripts/utils/leaderboard.py --position CB --score score_OFFENSIVE --top 5
+
+    # Cortes de percentil em vez do top-N
+    python scripts/utils/leaderboard.py --competition 43 --position CB --cutoffs
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd  # noqa: E402
+
+from pipeline import get_base_dir  # noqa: E402
+from pipeline.leaderboards import CUTOFFS_FILE, LEADERBOARDS_FILE, read_leaderboard  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-N por competição e posição (leaderboards pré-calculados)")
+    parser.add_argument("--competition", type=int, help="competition_id (padrão: todas)")
+    parser.add_argument("--position", help="mapped_position, ex: CB (padrão: todas)")
+    parser.add_argument("--score", default="overall_score", help="Coluna de score (padrão: overall_score)")
+    parser.add_argument("--top", type=int, help="Limitar a rank <= N (padrão: top_n gravado)")
+    parser.add_argument("--cutoffs", action="store_true", help="Mostrar os cortes de percentil")
+    parser.add_argument("--output-dir", help="Pasta de saída (padrão: bases/outputs do projeto)")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir) if args.output_dir else get_base_dir() / "bases" / "outputs"
+
+    path = output_dir / (CUTOFFS_FILE if args.cutoffs else LEADERBOARDS_FILE)
+    if not path.exists():
+        print(f"✗ Arquivo não encontrado: {path} (rode a pipeline com leaderboards.enabled)")
+        return 1
+
+    if args.cutoffs:
+        filters = [("score_column", "==", args.score)]
+        if args.competition is not None:
+            filters.append(("competition_id", "==", args.competition))
+        if args.position:
+            filters.append(("mapped_position", "==", args.position))
+        df = pd.read_parquet(path, filters=filters)
+    else:
+        df = read_leaderboard(output_dir, args.competition, args.position, args.score, args.top)
+
+    if df.empty:
+        print("✗ Nenhuma linha para o filtro informado")
+        return 1
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(df.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
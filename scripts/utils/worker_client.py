@@ -0,0 +1,124 @@
+"""
+Cliente do worker local (python main.py --worker).
+
+O worker mantém os scouts normalizados e os pesos em memória: o rescore com
+uma tabela de pesos nova responde em milissegundos, sem regravar parquets.
+
+Uso:
+    # Estado do worker (dados carregados, últimas execuções)
+    python scripts/utils/worker_client.py status
+
+    # Top 20 atuais com os pesos de uma planilha ainda não publicada
+    python scripts/utils/worker_client.py rescore --weights C:/temp/base_peso_teste.xlsx --position CB
+
+    # Reprocessar as etapas afetadas por um arquivo alterado (sem arquivo: verifica todos)
+    python scripts/utils/worker_client.py reload bases/inputs/business/base_peso.xlsx
+
+    # Regravar os consolidated_*.parquet e encerrar o worker
+    python scripts/utils/worker_client.py export
+    python scripts/utils/worker_client.py stop
+"""
+
+import argparse
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from pipeline.worker import call  # noqa: E402
+
+
+def print_players(players):
+    import pandas as pd
+
+    if not players:
+        print("✗ Nenhum jogador para o filtro informado")
+        return
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(pd.DataFrame(players).to_string(index=False))
+
+
+def print_run(response):
+    for line in response.get("log", []):
+        print(f"  {line}")
+    print(f"Status: {response.get('status')} ({response.get('wall_s')}s)")
+    if response.get("error"):
+        print(f"✗ {response.get('failed_step') or ''}: {response['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comandos para o worker local (main.py --worker)")
+    parser.add_argument("--port", type=int, help="Porta do worker (padrão: worker.port do config.yaml)")
+    parser.add_argument("--json", action="store_true", help="Imprimir a resposta JSON completa")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="Estado do worker")
+
+    rescore = commands.add_parser("rescore", help="Scores com outra tabela de pesos, em memória")
+    rescore.add_argument("--weights", help="Planilha de pesos (padrão: base_peso.xlsx atual)")
+    rescore.add_argument("--position", help="mapped_position, ex: CB")
+    rescore.add_argument("--position-group", help="position_group")
+    rescore.add_argument("--competition", type=int, help="competition_id")
+    rescore.add_argument("--limit", type=int, default=20, help="Jogadores na resposta (0 = todos)")
+    rescore.add_argument("--all-history", action="store_true", help="Incluir registros não atuais (v_current)")
+
+    reload = commands.add_parser("reload", help="Reexecutar as etapas afetadas por um arquivo alterado")
+    reload.add_argument("file", nargs="?", help="Caminho relativo ao diretório base (padrão: todas as entradas)")
+
+    commands.add_parser("export", help="Regravar os arquivos consolidated_*.parquet")
+    commands.add_parser("stop", help="Encerrar o worker")
+    args = parser.parse_args()
+
+    payload = {}
+    if args.command == "rescore":
+        payload = {
+            "position": args.position,
+            "position_group": args.position_group,
+            "competition_id": args.competition,
+            "limit": args.limit,
+            "current_only": not args.all_history,
+        }
+        if args.weights:
+            import pandas as pd
+
+            if not Path(args.weights).exists():
+                print(f"✗ Arquivo não encontrado: {args.weights}")
+                return 1
+
+            df_weights = pd.read_excel(args.weights)
+            payload["weights"] = json.loads(df_weights.to_json(orient="records"))
+    elif args.command == "reload" and args.file:
+        payload = {"file": args.file}
+
+    try:
+        response = call("shutdown" if args.command == "stop" else args.command, payload, port=args.port)
+    except ConnectionError as e:
+        print(f"✗ {e}")
+        return 2
+    except RuntimeError as e:
+        print(f"✗ Erro no worker: {e}")
+        return 1
+
+    if args.json or args.command in ("status", "stop"):
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    elif args.command == "rescore":
+        for warning in response["warnings"]:
+            print(f"⚠ {warning}")
+        print(f"{response['scored']}/{response['rows']} registros, {response['indicators']} indicadores "
+              f"({response['elapsed_ms']} ms)")
+        print_players(response["players"])
+    elif args.command == "reload" and not response.get("affected"):
+        print(response.get("message", "Nada a reexecutar"))
+    else:
+        print_run(response)
+
+    return 1 if response.get("status") == "failed" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
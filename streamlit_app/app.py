@@ -6,6 +6,7 @@ Interface Streamlit para editar base_peso.xlsx
 import streamlit as st
 import pandas as pd
 from components.data_loader import DataLoader
+from components.worker_client import WorkerClient
 from utils.constants import (
     POSITIONS,
     POSITION_LIST,
@@ -87,6 +88,10 @@ st.markdown("""
 if 'loader' not in st.session_state:
     st.session_state.loader = DataLoader()
 
+# Inicializar cliente do worker da pipeline (python main.py --worker)
+if 'worker' not in st.session_state:
+    st.session_state.worker = WorkerClient()
+
 # Inicializar DataFrame
 if 'df' not in st.session_state:
     st.session_state.df = None
@@ -187,6 +192,34 @@ with st.sidebar:
                 if st.button("↩️ Descartar", use_container_width=True):
                     reset_changes()
 
+        # Worker da pipeline: scores com os pesos ainda não salvos
+        st.divider()
+        st.markdown("### 🚀 Worker")
+        if st.session_state.worker.is_available():
+            preview_position = st.selectbox("Posição", ["Todas"] + POSITION_LIST, key="preview_position")
+            if st.button("🔎 Pré-visualizar scores", use_container_width=True):
+                try:
+                    st.session_state.preview = st.session_state.worker.rescore(
+                        st.session_state.df,
+                        position=None if preview_position == "Todas" else preview_position,
+                        limit=20
+                    )
+                except (ConnectionError, RuntimeError) as e:
+                    st.error(f"❌ {e}")
+            if st.button("🔄 Reprocessar pipeline", use_container_width=True,
+                         help="Reexecuta as etapas afetadas pelo base_peso.xlsx salvo"):
+                try:
+                    with st.spinner("Reprocessando..."):
+                        result = st.session_state.worker.reload("bases/inputs/business/base_peso.xlsx")
+                    if result.get("status", "success") == "success":
+                        st.success(f"✅ {result.get('message', 'Pipeline atualizada')}")
+                    else:
+                        st.error(f"❌ {result.get('failed_step')}: {result.get('error')}")
+                except (ConnectionError, RuntimeError) as e:
+                    st.error(f"❌ {e}")
+        else:
+            st.caption("Worker não iniciado (python main.py --worker)")
+
         # Backups
         st.divider()
         st.markdown("### 📦 Backups")
@@ -214,6 +247,16 @@ if st.session_state.df is None:
     st.warning("⚠️ Carregue os dados primeiro usando o botão na barra lateral")
     st.stop()
 
+# Pré-visualização de scores (worker)
+if st.session_state.get('preview'):
+    preview = st.session_state.preview
+    with st.expander(f"🔎 Pré-visualização de scores ({preview['elapsed_ms']} ms)", expanded=True):
+        for warning in preview["warnings"]:
+            st.warning(f"⚠️ {warning}")
+        st.caption(f"{preview['scored']}/{preview['rows']} registros pontuados com "
+                   f"{preview['indicators']} indicadores (pesos da tela, ainda não salvos)")
+        st.dataframe(pd.DataFrame(preview["players"]), use_container_width=True, hide_index=True)
+
 df = st.session_state.df
 
 # ============================================================================
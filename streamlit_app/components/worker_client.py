@@ -0,0 +1,104 @@
+"""
+Worker Client Component
+Talks to the local pipeline worker (python main.py --worker) over HTTP
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+
+DEFAULT_PORT = 8765
+
+# Written by the worker on startup (port, session token); see pipeline/worker.py
+SESSION_FILE = Path(__file__).parent.parent.parent / "bases" / "outputs" / "_worker_session.json"
+TOKEN_HEADER = "X-Scouts-Worker-Token"
+
+
+class WorkerClient:
+    """Sends rescore/reload commands to the pipeline worker, if it is running"""
+
+    def __init__(self, port: Optional[int] = None):
+        """Initialize worker URL (SCOUTS_WORKER_PORT overrides the default port)"""
+        self.port = port or int(os.environ.get("SCOUTS_WORKER_PORT", 0))
+
+    def _session(self) -> Dict[str, Any]:
+        """Port and token of the running worker (empty if it is not running)"""
+        try:
+            with open(SESSION_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port or self._session().get('port') or DEFAULT_PORT}"
+
+    def _request(self, command: str, payload: Optional[Dict[str, Any]] = None,
+                 timeout: float = 60) -> Dict[str, Any]:
+        """
+        Send a command to the worker
+
+        Raises:
+            ConnectionError: worker is not running
+            RuntimeError: worker answered with an error
+        """
+        url = f"{self.url}/{command}"
+        headers = {TOKEN_HEADER: self._session().get("token", "")}
+        if payload is None:
+            request = urllib.request.Request(url, headers=headers)
+        else:
+            request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                             headers={**headers, "Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise RuntimeError(message) from e
+        except urllib.error.URLError as e:
+            raise ConnectionError(f"Worker não encontrado em {self.url}") from e
+
+    def is_available(self) -> bool:
+        """
+        Check whether the worker is running
+
+        Returns:
+            True if the worker answered /status
+        """
+        try:
+            self._request("status", timeout=1)
+            return True
+        except (ConnectionError, RuntimeError, OSError):
+            return False
+
+    def rescore(self, df: pd.DataFrame, **filters) -> Dict[str, Any]:
+        """
+        Score the players with the (unsaved) weights table
+
+        Args:
+            df: weights table as edited in the app
+            **filters: position, position_group, competition_id, current_only, limit
+
+        Returns:
+            Worker response (players, warnings, elapsed_ms...)
+        """
+        payload = {"weights": json.loads(df.to_json(orient="records")), **filters}
+        return self._request("rescore", payload)
+
+    def reload(self, file: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Re-run the pipeline stages affected by a changed input file
+
+        Args:
+            file: path relative to the project root (None = check every input)
+        """
+        return self._request("reload", {"file": file} if file else {}, timeout=3600)